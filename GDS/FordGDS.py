@@ -2,11 +2,17 @@
 # Licensed under the MIT License
 
 import time
+from contextlib import nullcontext
 import can
 from .definitions import GDS_MODULE_ID
+from . import codec
+from .scheduler import PRIORITY_INTERACTIVE, PRIORITY_FLOW_CONTROL
 
 GDS_IDS = {mod['req_id'] for mod in GDS_MODULE_ID.values()} | {mod['resp_id'] for mod in GDS_MODULE_ID.values()} # cache IDs for faster lookup
 
+_PADDING = bytes(8)
+_FLOW_CONTROL = bytes([0x30, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00])  # continue to send, no block size, no STmin
+
 from .definitions import GDS_MODULE_ID, GDS_SERVICE_ID, GDSResult, GDSSession
 from .services import (
     start_session,
@@ -31,13 +37,41 @@ from .security_access import (
     security_access_send_key
 )
 
+class _SchedulerTransaction:
+    __slots__ = ("core", "transaction")
+
+    def __init__(self, core):
+        self.core = core
+        self.transaction = core.scheduler.transaction(core.module, core.priority)
+
+    def __enter__(self):
+        self.transaction.__enter__()
+        self.core._drain()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.transaction.__exit__(exc_type, exc, tb)
+
+
 class FordGDS:
-    def __init__(self, bus):
+    def __init__(self, bus, log=True, scheduler=None, priority=PRIORITY_INTERACTIVE):
         if bus is None:
             raise ValueError("GDS: A valid CAN bus instance must be provided.")
         self.bus = bus
+        self.module = None
         self.req_id = None
         self.resp_id = None
+        self.metrics = None  # GDSMetrics, see enable_metrics()
+        self._observers = ()  # GDSObserver instances, a tuple so the hot path only checks truthiness
+        self._request_sid = None
+        self.scheduler = scheduler  # TxScheduler shared with other FordGDS instances, or None to send directly
+        self.priority = priority
+        self.templates = codec.request_templates()  # {SID: padded request frame}, patched in place by the services
+        self._tx_messages = {}  # module -> reused can.Message for frames sent to that module
+        self._tx_msg = None
+        if log:
+            from .logger import LoggerObserver
+            self.add_observer(LoggerObserver())
 
     @staticmethod
     def is_gds_message(msg: can.Message) -> bool:
@@ -52,39 +86,86 @@ class FordGDS:
     def set_module(self, module_name):
         if module_name not in GDS_MODULE_ID:
             raise ValueError(f"GDS: Unknown module: {module_name}")
+        self.module = module_name
         self.req_id = GDS_MODULE_ID[module_name]['req_id']
         self.resp_id = GDS_MODULE_ID[module_name]['resp_id']
+        self._tx_msg = self._tx_messages.get(module_name)
+        if self._tx_msg is None or self._tx_msg.arbitration_id != self.req_id:
+            self._tx_msg = self._tx_messages[module_name] = can.Message(arbitration_id=self.req_id, data=bytearray(8), is_extended_id=False)
+
+    def add_observer(self, observer):
+        if observer not in self._observers:
+            self._observers = self._observers + (observer,)
+
+    def remove_observer(self, observer):
+        self._observers = tuple(o for o in self._observers if o is not observer)
+
+    def enable_metrics(self, metrics=None):
+        """Starts recording request latency / outcome metrics, returns the GDSMetrics instance."""
+        from .metrics import GDSMetrics
+        self.disable_metrics()
+        self.metrics = metrics or GDSMetrics()
+        self.add_observer(self.metrics)
+        return self.metrics
+
+    def disable_metrics(self):
+        if self.metrics is not None:
+            self.remove_observer(self.metrics)
+        self.metrics = None
 
     def send(self, data):
-        from . import logger
         if self.req_id is None:
             raise ValueError("GDS: Request ID not set. Call set_module() first.")
+        if self._observers:
+            self._request_sid = data[1] if len(data) > 1 else None
+            for observer in self._observers:
+                observer.on_request_start(self, self._request_sid, data)
         if len(data) <= 8:
-            msg = can.Message(arbitration_id=self.req_id, data=data + [0x00] * (8 - len(data)), is_extended_id=False)
-            self.bus.send(msg)
-            logger.log(msg, "TX")
+            self._send_frame(data)
         else:
             return self.send_multiframe(data)
 
+    def _send_frame(self, data, priority=None):
+        # The message object is reused for every frame to this module, bus.send() and observers must not keep it
+        msg = self._tx_msg
+        length = len(data)
+        msg.data[:length] = data
+        if length < 8:
+            msg.data[length:] = _PADDING[length:]
+        if self.scheduler is None:
+            self.bus.send(msg)
+        else:
+            self.scheduler.send(self.bus, msg, self.priority if priority is None else priority)
+        if self._observers:
+            for observer in self._observers:
+                observer.on_frame_tx(self, msg)
+
+    def _isotp_error(self, error, text):
+        for observer in self._observers:
+            observer.on_isotp_error(self, error, text)
+
     def receive(self, timeout=1.0):
         if self.resp_id is None:
             raise ValueError("GDS: Response ID not set. Call set_module() first.")
         return self.receive_multiframe(timeout)
     
     def receive_raw(self, timeout=1.0):
-        from . import logger
         start_time = time.time()
         while time.time() - start_time < timeout:
             msg = self.bus.recv(timeout=0.05)
             if msg and msg.arbitration_id == self.resp_id:
-                logger.log(msg, "RX")
+                if self._observers:
+                    for observer in self._observers:
+                        observer.on_frame_rx(self, msg)
                 return msg
         return None
     
     def send_multiframe(self, data):
-        total_len = len(data)
-        first_frame = [0x10 | ((total_len >> 8) & 0x0F), total_len & 0xFF] + data[:6]
-        self.send(first_frame)
+        # data has the same [length, SID, ...] layout as a single frame, the length byte is replaced by the ISO-TP header
+        payload = data[1:]
+        total_len = len(payload)
+        first_frame = [0x10 | ((total_len >> 8) & 0x0F), total_len & 0xFF] + payload[:6]
+        self._send_frame(first_frame)
 
         flow = None
         flow_timeout = time.time() + 1.0  # 1 second max wait for flow control
@@ -94,6 +175,8 @@ class FordGDS:
                 flow = candidate.data
                 break
         if not flow:
+            if self._observers:
+                self._isotp_error("flow_control_timeout", "No flow control frame received")
             return GDSResult.NO_RESPONSE
         
         block_size = flow[1]
@@ -109,7 +192,7 @@ class FordGDS:
 
         seq = 1
         frames_sent = 0
-        remaining = data[6:]
+        remaining = payload[6:]
 
         time.sleep(stmin)
 
@@ -121,9 +204,7 @@ class FordGDS:
                 chunk = remaining[:7]
                 remaining = remaining[7:]
 
-                frame = [0x20 | (seq & 0x0F)] + chunk
-                frame += [0x00] * (8 - len(frame))  # pad to 8 bytes
-                self.send(frame)
+                self._send_frame([0x20 | (seq & 0x0F)] + chunk)  # padded to 8 bytes by _send_frame
                 time.sleep(stmin)
 
                 seq = (seq + 1) % 0x10
@@ -140,6 +221,8 @@ class FordGDS:
                         break
 
                 if not flow:
+                    if self._observers:
+                        self._isotp_error("flow_control_timeout", "No flow control frame received")
                     return GDSResult.NO_RESPONSE
 
                 # Update STmin and BlockSize again in case they change
@@ -152,10 +235,16 @@ class FordGDS:
                     stmin = (stmin_raw - 0xF0) / 10000.0
                 else:
                     stmin = 0
-        GDSResult.SUCCESS
+        return GDSResult.SUCCESS
 
     def receive_multiframe(self, timeout=1.0):
-        from . import logger
+        response = self._receive_multiframe(timeout)
+        if self._observers:
+            for observer in self._observers:
+                observer.on_response(self, response)
+        return response
+
+    def _receive_multiframe(self, timeout):
         start_time = time.time()
         full_data = []
         expected_len = None
@@ -166,7 +255,9 @@ class FordGDS:
             if not msg or msg.arbitration_id != self.resp_id:
                 continue
 
-            logger.log(msg, "RX")
+            if self._observers:
+                for observer in self._observers:
+                    observer.on_frame_rx(self, msg)
             data = list(msg.data)
             pci = data[0]
 
@@ -176,11 +267,12 @@ class FordGDS:
             elif pci >> 4 == 0x1:
                 expected_len = ((pci & 0x0F) << 8) | data[1]
                 full_data = data[2:]
-                self.send([0x30, 0x00, 0x00] + [0x00] * 5)
+                self._send_frame(_FLOW_CONTROL, PRIORITY_FLOW_CONTROL)
 
             elif pci >> 4 == 0x2:
                 if (pci & 0x0F) != seq:
-                    logger.log(f"Unexpected sequence number: expected {seq}, got {(pci & 0x0F)}")
+                    if self._observers:
+                        self._isotp_error("sequence", f"Unexpected sequence number: expected {seq}, got {(pci & 0x0F)}")
                     break
                 seq = (seq + 1) % 0x10
                 full_data += data[1:]
@@ -190,63 +282,93 @@ class FordGDS:
 
         return None
 
+    def transaction(self):
+        """
+        Holds this module's scheduler transaction lock, for scripts that use send() / receive() directly:
+            with gds.transaction():
+                gds.send(request)
+                response = gds.receive()
+        """
+        if self.scheduler is None:
+            return nullcontext()
+        return _SchedulerTransaction(self)
+
+    def _drain(self):
+        # Responses to other users of the scheduler (or late ones) queued before our transaction started
+        while self.bus.recv(timeout=0) is not None:
+            pass
+
+    def _call(self, service, *args):
+        if self.scheduler is None:
+            return self._result(service(self, *args))
+        with _SchedulerTransaction(self):
+            return self._result(service(self, *args))
+
+    def _result(self, result):
+        # Service wrappers pass their GDSResult through here so observers see the outcome of each request
+        if self._observers:
+            for observer in self._observers:
+                observer.on_request_complete(self, self._request_sid, result)
+            self._request_sid = None  # Calls rejected before sending anything are reported with sid None
+        return result
+
     def start_session(self, session_id):
-        return start_session(self, session_id)
+        return self._call(start_session, session_id)
     
     def ecu_reset(self):
-        return ecu_reset(self)
+        return self._call(ecu_reset)
     
     def clear_dtc(self):
-        return clear_dtc(self)
+        return self._call(clear_dtc)
     
-    def read_dtc_by_status(core, status=0x00, group=0xFF00, out_data=None):
-        return read_dtc_by_status(core, status=0x00, group=0xFF00, out_data=None)
+    def read_dtc_by_status(self, status=0x00, group=0xFF00, out_data=None):
+        return self._call(read_dtc_by_status, status, group, out_data)
 
     def read_data_by_identifier(self, did, out_data):
-        return read_data_by_identifier(self, did, out_data)
+        return self._call(read_data_by_identifier, did, out_data)
 
     def write_data_by_identifier(self, did, value_bytes):
-        return write_data_by_identifier(self, did, value_bytes)
+        return self._call(write_data_by_identifier, did, value_bytes)
 
     def read_data_by_local_identifier(self, local_id, out_data):
-        return read_data_by_local_identifier(self, local_id, out_data)
+        return self._call(read_data_by_local_identifier, local_id, out_data)
     
     def write_data_by_local_identifier(self, did, value_bytes):
-        return write_data_by_local_identifier(self, did, value_bytes)
+        return self._call(write_data_by_local_identifier, did, value_bytes)
     
-    def input_output_control_by_identifier(core, did, control_type, control_data):
-        return input_output_control_by_identifier(core, did, control_type, control_data)
+    def input_output_control_by_identifier(self, did, control_type, control_data):
+        return self._call(input_output_control_by_identifier, did, control_type, control_data)
     
-    def read_memory_by_address(core, address, length, out_data):
-        return read_memory_by_address(core, address, length, out_data)
+    def read_memory_by_address(self, address, length, out_data):
+        return self._call(read_memory_by_address, address, length, out_data)
     
-    def write_memory_by_address(core, address, values):
-        return write_memory_by_address(core, address, values)
+    def write_memory_by_address(self, address, values):
+        return self._call(write_memory_by_address, address, values)
 
     def security_access_request_seed(self, out_data):
-        return security_access_request_seed(self, out_data)
+        return self._call(security_access_request_seed, out_data)
 
     def security_access_send_key(self, key_bytes):
-        return security_access_send_key(self, key_bytes)
+        return self._call(security_access_send_key, key_bytes)
     
-    def tester_present(core, response_required=True):
-        return tester_present(core, response_required)
+    def tester_present(self, response_required=True):
+        return self._call(tester_present, response_required)
 
-    def request_download(core, address, size):
-        return request_download(core, address, size)
+    def request_download(self, address, size):
+        return self._call(request_download, address, size)
     
-    def request_upload(core, address, size):
-        return request_upload(core, address, size)
+    def request_upload(self, address, size):
+        return self._call(request_upload, address, size)
     
-    def transfer_data(core, block_number, out_data):
-        return transfer_data(core, block_number, out_data)
+    def transfer_data(self, block_number, out_data):
+        return self._call(transfer_data, block_number, out_data)
     
-    def request_transfer_exit(core):
-        return request_transfer_exit(core)
+    def request_transfer_exit(self):
+        return self._call(request_transfer_exit)
 
     def close(self):
-        from . import logger
         self.bus.shutdown()
-        logger.end()
+        for observer in self._observers:
+            observer.on_close(self)
 
 
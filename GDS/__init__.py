@@ -1,3 +1,7 @@
 # GDS/__init__.py
 from .FordGDS import FordGDS
-from .definitions import GDSResult, GDSSession
\ No newline at end of file
+from .definitions import GDSResult, GDSSession
+from .change_filter import ChangeFilter
+from .ring_buffer import FrameRingBuffer
+from .hooks import GDSObserver
+from .scheduler import TxScheduler
\ No newline at end of file
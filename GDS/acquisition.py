@@ -0,0 +1,243 @@
+# Copyright (c) 2025 MR MODULE PTY LTD
+# Licensed under the MIT License
+
+"""
+Live data logging by polling DIDs (0x22) and RAM addresses (0x23) at per-signal rates:
+
+    signals = [
+        Signal("rpm", 50, did=0x1234, scale=0.25),
+        Signal("ect", 1, address=0x00FF8010, length=1, offset=-40),
+    ]
+    engine = AcquisitionEngine(gds, signals, path="logs/live.csv")
+    engine.run(duration=30)
+    engine.print_report()
+
+Requests are issued back to back, always for the signal whose deadline is earliest, so the rate is
+limited only by the ECU's response latency. Memory signals that fall due before the current request
+would complete and lie within `max_merge` bytes of each other are read with a single 0x23 request.
+
+Samples go into a SampleBuffer (one array per column) and are appended to `path` as CSV every
+`chunk_rows` samples. The DIDs / addresses above are placeholders, they are module specific.
+"""
+
+import csv
+import math
+import threading
+import time
+from array import array
+
+from .definitions import GDSResult
+
+
+class Signal:
+    """
+    One polled value: either a DID (read with 0x22) or `length` bytes of memory at `address` (0x23).
+    Raw bytes are converted big-endian: value = raw * scale + offset.
+    """
+    __slots__ = ("name", "rate", "did", "address", "length", "scale", "offset", "signed")
+
+    def __init__(self, name, rate, did=None, address=None, length=None, scale=1.0, offset=0.0, signed=False):
+        if (did is None) == (address is None):
+            raise ValueError(f"Acquisition: signal {name} needs exactly one of did or address")
+        if address is not None and not length:
+            raise ValueError(f"Acquisition: memory signal {name} needs a length")
+        if rate <= 0:
+            raise ValueError(f"Acquisition: signal {name} needs a positive rate")
+        self.name = name
+        self.rate = rate
+        self.did = did
+        self.address = address
+        self.length = length
+        self.scale = scale
+        self.offset = offset
+        self.signed = signed
+
+    def value(self, raw):
+        if not raw:
+            return math.nan
+        return int.from_bytes(raw, 'big', signed=self.signed) * self.scale + self.offset
+
+
+class SampleBuffer:
+    """
+    Columnar sample store: time, signal index, physical value and raw bytes.
+    With a path, full chunks are appended to a CSV and dropped from memory, otherwise everything is kept.
+    """
+    def __init__(self, names, path=None, chunk_rows=4096):
+        self.names = names
+        self.path = path
+        self.chunk_rows = chunk_rows
+        self.time = array('d')
+        self.signal = array('H')
+        self.value = array('d')
+        self.raw = bytearray()
+        self.raw_end = array('I')  # end offset of each sample's raw bytes in self.raw
+        self.rows_flushed = 0
+        if path:
+            with open(path, "w", newline="") as f:
+                csv.writer(f).writerow(["Timestamp", "Signal", "Value", "Raw"])
+
+    def __len__(self):
+        return len(self.time)
+
+    def append(self, timestamp, index, value, raw):
+        self.time.append(timestamp)
+        self.signal.append(index)
+        self.value.append(value)
+        self.raw += raw
+        self.raw_end.append(len(self.raw))
+        if self.path and len(self.time) >= self.chunk_rows:
+            self.flush()
+
+    def rows(self):
+        start = 0
+        for i in range(len(self.time)):
+            end = self.raw_end[i]
+            yield self.time[i], self.names[self.signal[i]], self.value[i], self.raw[start:end]
+            start = end
+
+    def flush(self):
+        if not self.path or not self.time:
+            return
+        with open(self.path, "a", newline="") as f:
+            csv.writer(f).writerows(
+                [f"{t:.6f}", name, f"{value:g}", raw.hex().upper()] for t, name, value, raw in self.rows()
+            )
+        self.rows_flushed += len(self.time)
+        self.time = array('d')
+        self.signal = array('H')
+        self.value = array('d')
+        self.raw = bytearray()
+        self.raw_end = array('I')
+
+    def series(self, name):
+        """(times, values) arrays of one signal, from the samples still in memory."""
+        index = self.names.index(name)
+        times, values = array('d'), array('d')
+        for i, signal in enumerate(self.signal):
+            if signal == index:
+                times.append(self.time[i])
+                values.append(self.value[i])
+        return times, values
+
+
+class AcquisitionEngine:
+    def __init__(self, gds, signals, path=None, chunk_rows=4096, max_merge=32):
+        self.gds = gds
+        self.signals = list(signals)
+        self.max_merge = max_merge
+        self.buffer = SampleBuffer([s.name for s in self.signals], path, chunk_rows)
+        n = len(self.signals)
+        self.samples = [0] * n
+        self.errors = [0] * n  # negative / no response
+        self.missed = [0] * n  # deadlines skipped because the schedule fell behind
+        self.requests = 0
+        self.latency = 0.0  # moving average seconds per request
+        self.elapsed = 0.0
+        self.running = False
+        self._thread = None
+
+    def run(self, duration=None):
+        signals = self.signals
+        periods = [1.0 / s.rate for s in signals]
+        start = time.perf_counter()
+        due = [start] * len(signals)
+        end = start + duration if duration else None
+        self.running = True
+        try:
+            while self.running:
+                now = time.perf_counter()
+                if end is not None and now >= end:
+                    break
+                # Earliest deadline first
+                first = min(range(len(signals)), key=due.__getitem__)
+                if due[first] > now:
+                    time.sleep(min(due[first] - now, 0.01))
+                    continue
+                group = [first]
+                if signals[first].address is not None:
+                    group = self._merge(first, due, now + self.latency)
+                sent = time.perf_counter()
+                self._read(group, sent)
+                done = time.perf_counter()
+                self.latency = (done - sent) if not self.requests else self.latency * 0.9 + (done - sent) * 0.1
+                self.requests += 1
+                for i in group:
+                    due[i] += periods[i]
+                    if due[i] < done:
+                        skipped = int((done - due[i]) / periods[i])
+                        self.missed[i] += skipped
+                        due[i] += skipped * periods[i]
+        finally:
+            self.elapsed += time.perf_counter() - start
+            self.running = False
+            self.buffer.flush()
+
+    def _merge(self, first, due, horizon):
+        # Memory signals due by the time this request completes, read together if they fit in max_merge bytes
+        signals = self.signals
+        lo = signals[first].address
+        hi = lo + signals[first].length
+        group = [first]
+        candidates = [i for i, s in enumerate(signals)
+                      if i != first and s.address is not None and due[i] <= horizon]
+        for i in sorted(candidates, key=lambda i: abs(signals[i].address - lo)):
+            s = signals[i]
+            new_lo, new_hi = min(lo, s.address), max(hi, s.address + s.length)
+            if new_hi - new_lo <= self.max_merge:
+                lo, hi = new_lo, new_hi
+                group.append(i)
+        return group
+
+    def _read(self, group, sent):
+        signals = self.signals
+        out = []
+        first = signals[group[0]]
+        if first.did is not None:
+            result = self.gds.read_data_by_identifier(first.did, out)
+            base = None
+        else:
+            base = min(signals[i].address for i in group)
+            size = max(signals[i].address + signals[i].length for i in group) - base
+            result = self.gds.read_memory_by_address(base, size, out)
+        timestamp = time.time() - (time.perf_counter() - sent) / 2  # middle of the request / response
+        if result != GDSResult.SUCCESS:
+            for i in group:
+                self.errors[i] += 1
+            return
+        for i in group:
+            s = signals[i]
+            raw = bytes(out) if base is None else bytes(out[s.address - base:s.address - base + s.length])
+            self.buffer.append(timestamp, i, s.value(raw), raw)
+            self.samples[i] += 1
+
+    def start(self, duration=None):
+        self._thread = threading.Thread(target=self.run, args=(duration,), daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self.running = False
+        self.join()
+
+    def join(self, timeout=None):
+        if self._thread:
+            self._thread.join(timeout)
+
+    def report(self):
+        """Requested vs achieved rate per signal."""
+        elapsed = self.elapsed or 1e-9
+        return [{
+            "signal": s.name,
+            "requested_hz": s.rate,
+            "achieved_hz": self.samples[i] / elapsed,
+            "samples": self.samples[i],
+            "errors": self.errors[i],
+            "missed": self.missed[i],
+        } for i, s in enumerate(self.signals)]
+
+    def print_report(self):
+        print(f"{'Signal':20s} {'Requested':>10s} {'Achieved':>10s} {'Samples':>8s} {'Errors':>7s} {'Missed':>7s}")
+        for row in self.report():
+            print(f"{row['signal']:20s} {row['requested_hz']:10.1f} {row['achieved_hz']:10.1f} "
+                  f"{row['samples']:8d} {row['errors']:7d} {row['missed']:7d}")
+        print(f"{self.requests} requests in {self.elapsed:.1f} s, average latency {self.latency * 1000:.1f} ms")
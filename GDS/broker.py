@@ -0,0 +1,461 @@
+# Copyright (c) 2025 MR MODULE PTY LTD
+# Licensed under the MIT License
+
+"""
+Shares one CAN adapter between several local processes. Most adapters (eg. csscan_serial) can only
+be opened once, so the broker owns the bus and clients connect to it over a Unix socket, or TCP on
+localhost where Unix sockets are not available (Windows):
+
+    python -m GDS.broker --interface csscan_serial --channel COM10 --bitrate 500000
+
+then in each script use a BrokerBus instead of opening the adapter:
+
+    bus = BrokerBus()
+    gds = FordGDS(bus)
+
+- Subscriptions use the normal python-can can_filters / set_filters(). Filtering happens in the
+  broker, so frames a client did not ask for never cross the socket.
+- Frames sent by one client go out on the bus and are also delivered to every other client
+  (is_rx=False), so a monitor sees a flash or scan that another tool is running.
+- Transmit is arbitrated by a single writer thread, frames from all clients are sent in arrival
+  order. A client can claim an arbitration ID (eg. the request ID of the module it is flashing),
+  frames other clients send on a claimed ID are rejected. The broker tells every client which IDs
+  are claimed by someone else, so BrokerBus.send() refuses those frames straight away.
+- Each client has a bounded receive queue. A client that stops reading loses frames (counted in
+  dropped) instead of stalling the bus or the other clients.
+"""
+
+import os
+import queue
+import socket
+import struct
+import tempfile
+import threading
+import time
+
+import can
+
+DEFAULT_PORT = 29536  # TCP fallback, localhost only
+
+# Records are a type byte followed by a fixed or length prefixed payload, little endian
+MSG_FRAME = 0x01    # both directions: timestamp, arbitration id, flags, dlc, 8 data bytes
+MSG_FILTERS = 0x02  # client -> broker: count, then (can_id, can_mask, extended) per filter, count 0 = everything
+MSG_CLAIM = 0x03    # client -> broker: arbitration id, 1 = claim / 0 = release
+                    # broker -> client: arbitration id, 1 = claimed by another client / 0 = released
+MSG_ERROR = 0x04    # broker -> client: text length, utf-8 text
+
+FLAG_EXTENDED = 0x01
+FLAG_RX = 0x02
+FLAG_REMOTE = 0x04
+FLAG_ERROR = 0x08
+
+EXTENDED_ANY = 2  # filter matches standard and extended IDs
+
+_FRAME = struct.Struct("<BdIBB8s")
+_FILTER = struct.Struct("<IIB")
+_CLAIM = struct.Struct("<BIB")
+_COUNT = struct.Struct("<BH")
+
+
+def default_address():
+    """Unix socket path where supported, otherwise (host, port) on localhost."""
+    if hasattr(socket, "AF_UNIX") and os.name != "nt":
+        return os.path.join(tempfile.gettempdir(), "fordgds-broker.sock")
+    return ("127.0.0.1", DEFAULT_PORT)
+
+
+def _socket_for(address):
+    if isinstance(address, str):
+        return socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+    return sock
+
+
+def encode_frame(msg):
+    flags = ((FLAG_EXTENDED if msg.is_extended_id else 0) | (FLAG_RX if msg.is_rx else 0)
+             | (FLAG_REMOTE if msg.is_remote_frame else 0) | (FLAG_ERROR if msg.is_error_frame else 0))
+    return _FRAME.pack(MSG_FRAME, msg.timestamp, msg.arbitration_id, flags, msg.dlc, bytes(msg.data))
+
+
+def _decode_frame(record):
+    _, timestamp, can_id, flags, dlc, data = _FRAME.unpack(record)
+    return can.Message(timestamp=timestamp, arbitration_id=can_id, is_extended_id=bool(flags & FLAG_EXTENDED),
+                       is_rx=bool(flags & FLAG_RX), is_remote_frame=bool(flags & FLAG_REMOTE),
+                       is_error_frame=bool(flags & FLAG_ERROR), dlc=dlc, data=data[:dlc])
+
+
+def encode_filters(filters):
+    filters = filters or ()
+    record = _COUNT.pack(MSG_FILTERS, len(filters))
+    for f in filters:
+        extended = f.get("extended")
+        record += _FILTER.pack(f["can_id"], f["can_mask"], EXTENDED_ANY if extended is None else int(extended))
+    return record
+
+
+def encode_error(text):
+    data = text.encode("utf-8")[:0xFFFF]
+    return _COUNT.pack(MSG_ERROR, len(data)) + data
+
+
+class _RecordReader:
+    """Splits a byte stream into records, returns [(type, record bytes)] for each chunk fed in."""
+    def __init__(self):
+        self._buffer = bytearray()
+
+    def feed(self, data):
+        buffer = self._buffer
+        buffer += data
+        records = []
+        pos = 0
+        while pos < len(buffer):
+            kind = buffer[pos]
+            if kind == MSG_FRAME:
+                size = _FRAME.size
+            elif kind == MSG_CLAIM:
+                size = _CLAIM.size
+            elif kind in (MSG_FILTERS, MSG_ERROR):
+                if len(buffer) - pos < _COUNT.size:
+                    break
+                count = _COUNT.unpack_from(buffer, pos)[1]
+                size = _COUNT.size + count * (_FILTER.size if kind == MSG_FILTERS else 1)
+            else:
+                raise ValueError(f"Broker: unknown record type 0x{kind:02X}")
+            if len(buffer) - pos < size:
+                break
+            records.append((kind, bytes(buffer[pos:pos + size])))
+            pos += size
+        del buffer[:pos]
+        return records
+
+
+class _Client:
+    def __init__(self, sock, queue_size):
+        self.sock = sock
+        self.filters = None  # None = everything, else [(can_id, can_mask, extended)]
+        self.queue = queue.Queue(queue_size)
+        self.dropped = 0
+
+    def matches(self, msg):
+        if self.filters is None:
+            return True
+        for can_id, can_mask, extended in self.filters:
+            if extended != EXTENDED_ANY and extended != msg.is_extended_id:
+                continue
+            if (can_id ^ msg.arbitration_id) & can_mask == 0:
+                return True
+        return False
+
+    def put(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+    def close(self):
+        # Wakes the writer thread with None, making room if the client had stopped reading
+        while True:
+            try:
+                self.queue.put_nowait(None)
+                return
+            except queue.Full:
+                try:
+                    self.queue.get_nowait()
+                except queue.Empty:
+                    pass
+
+
+class BusBroker:
+    def __init__(self, bus, address=None, queue_size=10000):
+        self.bus = bus
+        self.address = address or default_address()
+        self.queue_size = queue_size
+        self.frames_rx = 0  # received from the bus
+        self.frames_tx = 0  # sent to the bus for clients
+        self._clients = ()  # tuple, replaced on connect / disconnect so the bus thread iterates without a lock
+        self._claims = {}  # arbitration id -> _Client
+        self._lock = threading.Lock()
+        self._tx_queue = queue.Queue()
+        self._server = None
+        self._running = False
+        self._threads = []
+
+    def start(self):
+        if isinstance(self.address, str):
+            if os.path.exists(self.address):
+                probe = _socket_for(self.address)
+                try:
+                    probe.connect(self.address)
+                    raise RuntimeError(f"Broker: already running on {self.address}")
+                except OSError:
+                    os.unlink(self.address)  # stale socket from a broker that did not shut down
+                finally:
+                    probe.close()
+        self._server = _socket_for(self.address)
+        if not isinstance(self.address, str):
+            self._server.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self._server.bind(self.address)
+        self._server.listen()
+        self._server.settimeout(0.2)
+        self._running = True
+        for target in (self._accept_loop, self._bus_loop, self._tx_loop):
+            thread = threading.Thread(target=target, daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def serve_forever(self):
+        self.start()
+        try:
+            while self._running:
+                time.sleep(0.5)
+        finally:
+            self.stop()
+
+    def stop(self):
+        self._running = False
+        for thread in self._threads:
+            thread.join(timeout=1.0)
+        self._threads = []
+        for client in self._clients:
+            self._disconnect(client)
+        if self._server:
+            self._server.close()
+            self._server = None
+            if isinstance(self.address, str) and os.path.exists(self.address):
+                os.unlink(self.address)
+
+    @property
+    def clients(self):
+        return len(self._clients)
+
+    def _accept_loop(self):
+        while self._running:
+            try:
+                sock, _ = self._server.accept()
+            except socket.timeout:
+                continue
+            except OSError:
+                break
+            sock.settimeout(None)
+            client = _Client(sock, self.queue_size)
+            with self._lock:
+                self._clients = self._clients + (client,)
+                for can_id in self._claims:
+                    client.put(_CLAIM.pack(MSG_CLAIM, can_id, 1))
+            threading.Thread(target=self._client_reader, args=(client,), daemon=True).start()
+            threading.Thread(target=self._client_writer, args=(client,), daemon=True).start()
+
+    def _disconnect(self, client):
+        with self._lock:
+            if client not in self._clients:
+                return
+            self._clients = tuple(c for c in self._clients if c is not client)
+            released = [can_id for can_id, owner in self._claims.items() if owner is client]
+            for can_id in released:
+                del self._claims[can_id]
+                self._announce_claim(can_id, client, False)
+        client.close()  # stops the writer thread, which closes the socket
+
+    def _announce_claim(self, can_id, owner, claimed):
+        # Lets the other clients refuse sends on can_id locally, call with the lock held
+        record = _CLAIM.pack(MSG_CLAIM, can_id, 1 if claimed else 0)
+        for client in self._clients:
+            if client is not owner:
+                client.put(record)
+
+    def _deliver(self, msg, source):
+        record = encode_frame(msg)
+        for client in self._clients:
+            if client is not source and client.matches(msg):
+                client.put(record)
+
+    def _bus_loop(self):
+        while self._running:
+            msg = self.bus.recv(timeout=0.1)
+            if msg is not None:
+                self.frames_rx += 1
+                self._deliver(msg, None)
+
+    def _tx_loop(self):
+        while self._running:
+            try:
+                client, msg = self._tx_queue.get(timeout=0.1)
+            except queue.Empty:
+                continue
+            owner = self._claims.get(msg.arbitration_id)
+            if owner is not None and owner is not client:
+                client.put(encode_error(f"0x{msg.arbitration_id:03X} is claimed by another client"))
+                continue
+            try:
+                self.bus.send(msg)
+            except can.CanError as e:
+                client.put(encode_error(str(e)))
+                continue
+            self.frames_tx += 1
+            msg.is_rx = False
+            if not msg.timestamp:
+                msg.timestamp = time.time()
+            self._deliver(msg, client)
+
+    def _client_reader(self, client):
+        reader = _RecordReader()
+        try:
+            while self._running:
+                data = client.sock.recv(65536)
+                if not data:
+                    break
+                for kind, record in reader.feed(data):
+                    if kind == MSG_FRAME:
+                        self._tx_queue.put((client, _decode_frame(record)))
+                    elif kind == MSG_FILTERS:
+                        count = _COUNT.unpack_from(record)[1]
+                        client.filters = [_FILTER.unpack_from(record, _COUNT.size + i * _FILTER.size) for i in range(count)] or None
+                    elif kind == MSG_CLAIM:
+                        _, can_id, claim = _CLAIM.unpack(record)
+                        with self._lock:
+                            owner = self._claims.get(can_id)
+                            if claim and owner is None:
+                                self._claims[can_id] = client
+                                self._announce_claim(can_id, client, True)
+                            elif claim and owner is not client:
+                                client.put(encode_error(f"0x{can_id:03X} is claimed by another client"))
+                            elif not claim and owner is client:
+                                del self._claims[can_id]
+                                self._announce_claim(can_id, client, False)
+        except (OSError, ValueError):
+            pass
+        self._disconnect(client)
+
+    def _client_writer(self, client):
+        try:
+            record = b""
+            while record is not None:
+                # Send everything queued in one write
+                record = client.queue.get()
+                batch = []
+                while record is not None:
+                    batch.append(record)
+                    if len(batch) >= 256:
+                        break
+                    try:
+                        record = client.queue.get_nowait()
+                    except queue.Empty:
+                        break
+                if batch:
+                    client.sock.sendall(b"".join(batch))
+        except OSError:
+            pass
+        finally:
+            client.sock.close()
+        self._disconnect(client)
+
+
+class BrokerBus(can.BusABC):
+    """
+    python-can bus that talks to a running BusBroker, use in place of can.Bus(...).
+    Sends on an ID another client has claimed raise from send(). Other errors reported by the broker
+    (eg. the adapter refusing a frame) are raised from the next send().
+    """
+    def __init__(self, channel=None, can_filters=None, address=None, **kwargs):
+        self.address = address or default_address()
+        self._sock = _socket_for(self.address)
+        try:
+            self._sock.connect(self.address)
+        except OSError as e:
+            raise can.CanInitializationError(f"Broker: cannot connect to {self.address}: {e}") from e
+        self._send_lock = threading.Lock()
+        self._rx = queue.Queue()
+        self._errors = queue.Queue()
+        self._claimed = set()  # arbitration ids claimed by other clients, kept up to date by the broker
+        self._closed = False
+        self.channel_info = f"FordGDS broker {self.address}"
+        super().__init__(channel=channel, can_filters=can_filters, **kwargs)
+        self._reader = threading.Thread(target=self._read_loop, daemon=True)
+        self._reader.start()
+
+    def _write(self, record):
+        with self._send_lock:
+            self._sock.sendall(record)
+
+    def _apply_filters(self, filters):
+        self._write(encode_filters(filters))
+
+    def claim(self, can_id, claim=True):
+        """Reserves transmit on can_id for this client, claim=False releases it."""
+        self._write(_CLAIM.pack(MSG_CLAIM, can_id, 1 if claim else 0))
+
+    def send(self, msg, timeout=None):
+        try:
+            error = self._errors.get_nowait()
+        except queue.Empty:
+            error = None
+        if error is not None:
+            raise can.CanOperationError(f"Broker: {error}")
+        if msg.arbitration_id in self._claimed:
+            raise can.CanOperationError(f"Broker: 0x{msg.arbitration_id:03X} is claimed by another client")
+        try:
+            self._write(encode_frame(msg))
+        except OSError as e:
+            raise can.CanOperationError(f"Broker: connection lost: {e}") from e
+
+    def _recv_internal(self, timeout):
+        try:
+            return self._rx.get(timeout=timeout), True  # already filtered by the broker
+        except queue.Empty:
+            return None, True
+
+    def _read_loop(self):
+        reader = _RecordReader()
+        try:
+            while not self._closed:
+                data = self._sock.recv(65536)
+                if not data:
+                    break
+                for kind, record in reader.feed(data):
+                    if kind == MSG_FRAME:
+                        self._rx.put(_decode_frame(record))
+                    elif kind == MSG_CLAIM:
+                        _, can_id, claimed = _CLAIM.unpack(record)
+                        if claimed:
+                            self._claimed.add(can_id)
+                        else:
+                            self._claimed.discard(can_id)
+                    elif kind == MSG_ERROR:
+                        self._errors.put(record[_COUNT.size:].decode("utf-8", "replace"))
+        except (OSError, ValueError):
+            pass
+
+    def shutdown(self):
+        super().shutdown()
+        if not self._closed:
+            self._closed = True
+            try:
+                self._sock.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+            self._sock.close()
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Share one CAN adapter between several local FordGDS tools")
+    parser.add_argument("--interface", default="csscan_serial")
+    parser.add_argument("--channel", default="COM10")
+    parser.add_argument("--bitrate", type=int, default=500000)
+    parser.add_argument("--socket", help="Unix socket path (default: temp directory)")
+    parser.add_argument("--port", type=int, help="serve on TCP localhost:PORT instead of a Unix socket")
+    args = parser.parse_args()
+
+    address = ("127.0.0.1", args.port) if args.port else args.socket
+    bus = can.Bus(interface=args.interface, channel=args.channel, bitrate=args.bitrate)
+    broker = BusBroker(bus, address)
+    print(f"Broker serving {args.interface} {args.channel} on {broker.address}, Ctrl+C to stop")
+    try:
+        broker.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        bus.shutdown()
+        print(f"Broker stopped: {broker.frames_rx} frames received, {broker.frames_tx} frames sent")
@@ -0,0 +1,74 @@
+# Copyright (c) 2025 MR MODULE PTY LTD
+# Licensed under the MIT License
+
+class ChangeFilter:
+    """
+    Passes a frame only when the bits selected by its ID mask differ from the last passed frame.
+    Masks are given per arbitration ID as bytes (eg. b'\\xFF\\xFF\\xFF\\xFF\\x00\\x00\\x00\\xFF'), a
+    missing entry means every bit matters. Payloads are compared as integers: (new ^ last) & mask.
+    """
+    def __init__(self, id_masks=None):
+        self.masks = {}  # arbitration ID -> integer mask
+        self.last_seen = {}  # arbitration ID -> (last passed payload as integer, length)
+        self.changes = {}  # arbitration ID -> number of frames passed
+        self.suppressed = {}  # arbitration ID -> number of frames filtered out
+        for can_id, mask in (id_masks or {}).items():
+            self.set_mask(can_id, mask)
+
+    def set_mask(self, can_id, mask):
+        # Masks are left aligned like the payload, so shorter frames compare against the leading mask bytes
+        self.masks[can_id] = (int.from_bytes(mask, 'big'), len(mask))
+
+    def is_changed(self, msg):
+        return self.check(msg.arbitration_id, msg.data)
+
+    def check(self, can_id, data):
+        value = int.from_bytes(data, 'big')
+        length = len(data)
+        last = self.last_seen.get(can_id)
+        if last is not None:
+            last_value, last_len = last
+            diff = value ^ last_value
+            if last_len != length:
+                # Only the leading bytes both frames share are compared
+                n = min(length, last_len)
+                diff = (value >> 8 * (length - n)) ^ (last_value >> 8 * (last_len - n))
+            else:
+                n = length
+            mask = self.masks.get(can_id)
+            if mask is not None:
+                mask_value, mask_len = mask
+                shift = 8 * (mask_len - n)
+                diff &= mask_value >> shift if shift >= 0 else mask_value << -shift
+            if not diff:
+                self.suppressed[can_id] = self.suppressed.get(can_id, 0) + 1
+                return False
+        self.last_seen[can_id] = (value, length)
+        self.changes[can_id] = self.changes.get(can_id, 0) + 1
+        return True
+
+    def filter_batch(self, frames):
+        """
+        Filters a whole batch, eg. a replayed capture. frames is an iterable of can.Message or
+        (arbitration_id, data) tuples, returns the list of frames that passed.
+        """
+        check = self.check
+        passed = []
+        for frame in frames:
+            if isinstance(frame, tuple):
+                can_id, data = frame[0], frame[1]
+            else:
+                can_id, data = frame.arbitration_id, frame.data
+            if check(can_id, data):
+                passed.append(frame)
+        return passed
+
+    def reset(self):
+        self.last_seen.clear()
+        self.changes.clear()
+        self.suppressed.clear()
+
+    def stats(self):
+        """Returns {arbitration_id: (changes, suppressed)}."""
+        return {can_id: (self.changes.get(can_id, 0), self.suppressed.get(can_id, 0))
+                for can_id in sorted(self.changes.keys() | self.suppressed.keys())}
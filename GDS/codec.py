@@ -0,0 +1,304 @@
+# Copyright (c) 2025 MR MODULE PTY LTD
+# Licensed under the MIT License
+
+"""
+Request / response codec shared by services, security_access and the logger.
+
+SERVICES is indexed by request SID. Each entry holds:
+    encode            - builds the request frame ([length, SID, params...]) from the service arguments
+    echo              - number of request parameter bytes the ECU echoes after the positive response SID
+    decode            - builds a typed response object from a validated positive response
+    describe_request  - text for the logger when a request frame is seen
+    describe_response - text for the logger when a positive response frame is seen
+"""
+
+from collections import namedtuple
+
+from .definitions import GDS_SERVICE_ID, GDSResult, GDSSession
+
+Service = namedtuple("Service", "sid name encode echo decode describe_request min_request_len describe_response")
+
+# Typed responses
+PositiveResponse = namedtuple("PositiveResponse", "sid data")
+NegativeResponse = namedtuple("NegativeResponse", "sid nrc result")
+SessionResponse = namedtuple("SessionResponse", "session")
+DidResponse = namedtuple("DidResponse", "did data")
+LocalIdResponse = namedtuple("LocalIdResponse", "local_id data")
+MemoryResponse = namedtuple("MemoryResponse", "data")
+SecurityAccessResponse = namedtuple("SecurityAccessResponse", "subfunction seed")
+DtcResponse = namedtuple("DtcResponse", "data dtcs")  # dtcs = [(dtc, status), ...]
+TransferResponse = namedtuple("TransferResponse", "block_number data")
+
+
+def _u16(value):
+    return [(value >> 8) & 0xFF, value & 0xFF]
+
+def _u24(value):
+    return [(value >> 16) & 0xFF, (value >> 8) & 0xFF, value & 0xFF]
+
+def _u32(value):
+    return [(value >> 24) & 0xFF, (value >> 16) & 0xFF, (value >> 8) & 0xFF, value & 0xFF]
+
+def _hex(data):
+    return ' '.join(f"{b:02X}" for b in data)
+
+
+# Decoders: (response, data) -> typed response. data = parameter bytes after the SID and echoed bytes.
+
+def _decode_generic(response, data):
+    return PositiveResponse(response[1] - 0x40, data)
+
+def _decode_session(response, data):
+    return SessionResponse(response[2])
+
+def _decode_did(response, data):
+    return DidResponse((response[2] << 8) | response[3], data)
+
+def _decode_local_id(response, data):
+    return LocalIdResponse(response[2], data)
+
+def _decode_memory(response, data):
+    return MemoryResponse(data)
+
+def _decode_security_access(response, data):
+    return SecurityAccessResponse(response[2], data)
+
+def _decode_dtcs(response, data):
+    # KWP: number of DTCs, then 2 byte DTC + status byte each
+    dtcs = []
+    if data and len(data) >= 1 + data[0] * 3:
+        dtcs = [((data[i] << 8) | data[i + 1], data[i + 2]) for i in range(1, 1 + data[0] * 3, 3)]
+    return DtcResponse(data, dtcs)
+
+def _decode_transfer(response, data):
+    return TransferResponse(response[2], data)
+
+
+# Logger descriptions of single CAN frames (d = frame data bytes)
+
+def _describe_io_control(d):
+    cid = f"0x{d[2]:02X}{d[3]:02X}"
+    control_option = d[4]
+    control_text = {
+        0x00: "Return Control to ECU",
+        0x05: "Freeze Current State",
+        0x07: "Short Term Adjustment"
+    }.get(control_option, f"Unknown (0x{control_option:02X}) Control Type")
+
+    expected_param_bytes = d[0] - 4  # subtract header bytes: SID, DID high/low, control_type
+    param_bytes = bytes(d[5:5 + expected_param_bytes])
+    params = param_bytes.hex().upper() if param_bytes else ""
+    return (
+        f"Input/Output Control - Common ID {cid}, "
+        f"{control_text}"
+        + (f", Data={params}" if params else "")
+    )
+
+def _describe_security_access_response(d):
+    if len(d) <= 3:
+        return None
+    # Security Access Key Sent (SID = 0x67, sub = 0x02)
+    if d[2] == 0x02:
+        return "OK - Key Accepted"
+    # Security Access Seed Response (SID = 0x67, sub = 0x01)
+    elif d[2] == 0x01:
+        return f"OK - Seed: {_hex(d[3:3 + (d[0] - 2)])}"
+    return None
+
+def _describe_memory_read_response(d):
+    raw_bytes = d[2:2 + (d[0] - 1)]
+    ascii_str = ''.join(chr(b) if 0x20 <= b <= 0x7E else '.' for b in raw_bytes)
+    return f"OK - Memory Read = {_hex(raw_bytes)} (\"{ascii_str}\")"
+
+def _describe_memory_write_response(d):
+    if len(d) < 6:
+        return None
+    addr = (d[2] << 24) | (d[3] << 16) | (d[4] << 8) | d[5]
+    return f"OK - Memory Written at 0x{addr:08X}"
+
+
+SERVICES = {s.sid: s for s in (
+    Service(0x10, "startDiagnosticSession",
+            lambda session_id: [0x02, 0x10, session_id],
+            1, _decode_session,
+            lambda d: f"Start Diagnostic Session - {GDSSession.to_str(d[2])}", 3,
+            None),
+    Service(0x11, "ECUReset",
+            lambda: [0x02, 0x11, 0x01],
+            0, _decode_generic, None, 0, None),
+    Service(0x14, "clearDiagnosticInformation",
+            lambda group=0xFF00: [0x03, 0x14] + _u16(group),
+            2, _decode_generic, None, 0, None),
+    Service(0x18, "readDiagnosticTroubleCodesByStatus",
+            lambda status=0x00, group=0xFF00: [0x04, 0x18, status] + _u16(group),
+            0, _decode_dtcs, None, 0, None),
+    Service(0x21, "readDataByLocalIdentifier",
+            lambda local_id: [0x02, 0x21, local_id],
+            1, _decode_local_id,
+            lambda d: f"Read Local ID 0x{d[2]:02X}", 3,
+            lambda d: f"OK - {_hex(d[3:3 + (d[0] - 2)])}" if len(d) > 3 else None),
+    Service(0x22, "readDataByCommonIdentifier",
+            lambda did: [0x03, 0x22] + _u16(did),
+            2, _decode_did,
+            lambda d: f"Read Common ID 0x{d[2]:02X}{d[3]:02X}", 4,
+            lambda d: f"OK - DID {d[2]:02X}{d[3]:02X} = {_hex(d[4:4 + (d[0] - 3)])}" if len(d) > 4 else None),
+    Service(0x23, "readMemoryByAddress",
+            lambda address, length: [0x07, 0x23] + _u32(address) + _u16(length),
+            0, _decode_memory,
+            lambda d: f"Read Memory 0x{(d[2] << 24) | (d[3] << 16) | (d[4] << 8) | d[5]:08X} ({(d[6] << 8) | d[7]} bytes)", 8,
+            _describe_memory_read_response),
+    Service(0x27, "securityAccess",
+            lambda subfunction, key_bytes=(): [0x02 + len(key_bytes), 0x27, subfunction] + list(key_bytes),
+            1, _decode_security_access, None, 0,
+            _describe_security_access_response),
+    Service(0x2E, "writeDataByCommonIdentifier",
+            lambda did, value_bytes: [3 + len(value_bytes), 0x2E] + _u16(did) + list(value_bytes),
+            2, _decode_did,
+            lambda d: f"Write Common ID 0x{d[2]:02X}{d[3]:02X}", 4,
+            None),
+    Service(0x2F, "inputOutputControlByCommonIdentifier",
+            lambda did, control_type, control_data: [4 + len(control_data), 0x2F] + _u16(did) + [control_type] + list(control_data),
+            2, _decode_did,
+            _describe_io_control, 5,
+            None),
+    Service(0x34, "requestDownload",
+            lambda address, size: [0x09, 0x34] + _u32(address) + [0x00] + _u24(size),  # 0x00 = no compression or encryption
+            0, _decode_generic, None, 0, None),
+    Service(0x35, "requestUpload",
+            lambda address, size: [0x09, 0x35] + _u32(address) + [0x00] + _u24(size),
+            0, _decode_generic, None, 0, None),
+    Service(0x36, "transferData",
+            lambda block_number: [0x02, 0x36, block_number],
+            1, _decode_transfer, None, 0, None),
+    Service(0x37, "requestTransferExit",
+            lambda: [0x01, 0x37],
+            0, _decode_generic, None, 0, None),
+    Service(0x3B, "writeDataByLocalIdentifier",
+            lambda local_id, value_bytes: [2 + len(value_bytes), 0x3B, local_id] + list(value_bytes),
+            1, _decode_local_id,
+            lambda d: f"Write Local ID 0x{d[2]:02X}", 3,
+            None),
+    Service(0x3D, "writeMemoryByAddress",
+            lambda address, values: [0x07 + len(values), 0x3D] + _u32(address) + _u16(len(values)) + list(values),
+            4, _decode_generic,
+            lambda d: f"Write Memory 0x{(d[2] << 24) | (d[3] << 16) | (d[4] << 8) | d[5]:08X} ({(d[6] << 8) | d[7]} bytes)", 8,
+            _describe_memory_write_response),
+    Service(0x3E, "testerPresent",
+            lambda response_required=True: [0x02, 0x3E, 0x01 if response_required else 0x02],
+            0, _decode_generic,
+            lambda d: f"Tester Present - {'Response Required' if d[2] == 0x01 else 'No Response'}", 3,
+            None),
+)}
+
+
+def request(sid, *args):
+    """Builds the request frame for a service, eg. request(0x22, 0xF190)."""
+    return SERVICES[sid].encode(*args)
+
+
+# Single frame requests with a fixed layout and the arguments their templates are built with
+_TEMPLATE_ARGS = {
+    0x10: (GDSSession.DIAGNOSTIC,),
+    0x11: (),
+    0x14: (0xFF00,),
+    0x18: (0x00, 0xFF00),
+    0x21: (0x00,),
+    0x22: (0x0000,),
+    0x23: (0x00000000, 1),
+    0x27: (0x01,),
+    0x2E: (0x0000, ()),
+    0x2F: (0x0000, 0x00, ()),
+    0x36: (0x01,),
+    0x37: (),
+    0x3B: (0x00, ()),
+    0x3E: (True,),
+}
+
+
+def template(sid, *args):
+    """
+    Request frame padded to 8 bytes, for sending the same service repeatedly.
+    Patch fields in place with set_u8 / set_u16 / set_u32 / set_params instead of building a new request each time.
+    """
+    frame = bytearray(8)
+    data = request(sid, *args)
+    frame[:len(data)] = data
+    return frame
+
+
+def request_templates():
+    """New {SID: template} set for every single frame service, see FordGDS.templates."""
+    return {sid: template(sid, *args) for sid, args in _TEMPLATE_ARGS.items()}
+
+
+def set_u8(frame, offset, value):
+    frame[offset] = value & 0xFF
+
+def set_u16(frame, offset, value):
+    frame[offset] = (value >> 8) & 0xFF
+    frame[offset + 1] = value & 0xFF
+
+def set_u32(frame, offset, value):
+    frame[offset] = (value >> 24) & 0xFF
+    frame[offset + 1] = (value >> 16) & 0xFF
+    frame[offset + 2] = (value >> 8) & 0xFF
+    frame[offset + 3] = value & 0xFF
+
+def set_params(frame, offset, values):
+    """Writes variable length parameters from offset, updates the length byte and clears the old padding."""
+    end = offset + len(values)
+    frame[offset:end] = values
+    frame[end:] = bytes(8 - end)
+    frame[0] = end - 1
+
+
+def decode(response, request_frame):
+    """
+    Parses a reassembled response ([length, SID, ...] as returned by FordGDS.receive) to the request
+    it answers. Returns (GDSResult, typed response or None).
+    """
+    if not response:
+        return GDSResult.NO_RESPONSE, None
+    sid = request_frame[1]
+    if response[0] >= 0x03 and response[1] == 0x7F and response[2] == sid:
+        result = GDSResult.from_nrc(response[3])
+        return result, NegativeResponse(sid, response[3], result)
+    if response[1] == sid + 0x40:
+        service = SERVICES[sid]
+        end = 2 + service.echo
+        if response[2:end] == list(request_frame[2:end]):  # request may be a bytearray template
+            return GDSResult.SUCCESS, service.decode(response, response[end:1 + response[0]])
+    return GDSResult.UNEXPECTED_RESPONSE, None
+
+
+def describe_frame(data):
+    """Short description of a single GDS CAN frame for the logger."""
+    pci = data[0] >> 4
+    if pci == 0x1:
+        return f"Multiframe - {((data[0] & 0x0F) << 8) | data[1]} bytes"
+    elif pci == 0x2:
+        return "Multiframe - Consecutive"
+    elif pci == 0x3:
+        return "Multiframe - Flow Control"
+
+    sid = data[1] if len(data) > 1 else None
+
+    if sid == 0x7F and len(data) >= 4:
+        return f"NR - {GDSResult.from_nrc(data[3])}"
+
+    # Request SIDs
+    service = SERVICES.get(sid)
+    if service and service.describe_request and len(data) >= service.min_request_len:
+        return service.describe_request(data)
+
+    # Positive response SIDs
+    req_sid = sid - 0x40 if sid and sid >= 0x40 else None
+    if req_sid in GDS_SERVICE_ID:
+        service = SERVICES.get(req_sid)
+        if service and service.describe_response:
+            text = service.describe_response(data)
+            if text:
+                return text
+        return "OK"
+
+    return GDS_SERVICE_ID.get(sid, "???")
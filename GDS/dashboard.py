@@ -0,0 +1,123 @@
+# Copyright (c) 2025 MR MODULE PTY LTD
+# Licensed under the MIT License
+
+import sys
+import time
+import threading
+
+RESET = "\033[0m"
+CYAN = "\033[96m"
+GREEN = "\033[92m"
+YELLOW = "\033[93m"
+GREY = "\033[90m"
+HOME = "\033[H"
+CLEAR_TO_END = "\033[J"
+CLEAR_LINE = "\033[K"
+
+
+class _Row:
+    __slots__ = ("msg", "data", "count", "changed", "last_count", "rate")
+
+    def __init__(self, msg):
+        self.msg = msg
+        self.data = int.from_bytes(msg.data, 'big')
+        self.count = 1
+        self.changed = 0  # bits that changed since the last refresh
+        self.last_count = 0
+        self.rate = 0.0
+
+
+class BusDashboard:
+    """
+    In-place "sniffer" view of the bus: one row per arbitration ID, redrawn at a
+    fixed refresh rate instead of printing a line per frame.
+    update() only touches counters so it is cheap enough to call for every frame.
+    """
+    def __init__(self, refresh_rate=4.0, tail_lines=12, out=None):
+        self.refresh_interval = 1.0 / refresh_rate
+        self.tail_lines = tail_lines
+        self.out = out or sys.stdout
+        self._rows = {}
+        self._tail = []
+        self._lock = threading.Lock()
+        self._running = False
+        self._thread = None
+        self._last_render = time.time()
+
+    def update(self, msg):
+        row = self._rows.get(msg.arbitration_id)
+        if row is None:
+            with self._lock:
+                self._rows[msg.arbitration_id] = _Row(msg)
+            return
+        data = int.from_bytes(msg.data, 'big')
+        with self._lock:  # render() reads and resets changed
+            row.changed |= data ^ row.data
+            row.data = data
+            row.msg = msg
+            row.count += 1
+
+    def add_line(self, text):
+        # Per-frame GDS output and log() text is shown in a short tail below the table
+        with self._lock:
+            self._tail.append(text)
+            if len(self._tail) > self.tail_lines:
+                del self._tail[0]
+
+    def start(self):
+        if self._running:
+            return
+        self._running = True
+        self.out.write("\033[2J")  # Clear screen once, after that we only redraw in place
+        self._thread = threading.Thread(target=self._render_loop, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._running = False
+        if self._thread:
+            self._thread.join()
+            self._thread = None
+        self.render()
+
+    def _render_loop(self):
+        while self._running:
+            time.sleep(self.refresh_interval)
+            self.render()
+
+    def render(self):
+        from .logger import get_broadcast_description, get_sid_description
+        from .FordGDS import FordGDS
+
+        now = time.time()
+        elapsed = max(now - self._last_render, 1e-6)
+        self._last_render = now
+
+        with self._lock:
+            rows = []
+            for arb_id, row in sorted(self._rows.items()):
+                rows.append((arb_id, row, row.msg, row.count, row.changed))
+                row.changed = 0
+            tail = list(self._tail)
+
+        lines = [f"{GREY}  ID  |   Count |   Rate/s | Data                    | Description{RESET}"]
+        for arb_id, row, msg, count, changed in rows:
+            row.rate = (count - row.last_count) / elapsed
+            row.last_count = count
+
+            length = len(msg.data)
+            data_str = ""
+            for i, byte in enumerate(msg.data):
+                shift = 8 * (length - 1 - i)
+                color = YELLOW if (changed >> shift) & 0xFF else RESET
+                data_str += f"{color}{byte:02X}{RESET} "
+            data_str += "   " * (8 - length)
+
+            is_gds = FordGDS.is_gds_message(msg)
+            desc = get_sid_description(msg) if is_gds else get_broadcast_description(msg)
+            id_color = GREEN if is_gds else CYAN
+            lines.append(f" {id_color}{arb_id:03X}{RESET}  | {count:7d} | {row.rate:8.1f} | {data_str}| {desc or ''}")
+
+        lines.append("")
+        lines.extend(tail)
+        self.out.write(HOME + (CLEAR_LINE + "\n").join(lines) + CLEAR_LINE + "\n" + CLEAR_TO_END)
+        self.out.flush()
@@ -1,6 +1,7 @@
 # Copyright (c) 2025 MR MODULE PTY LTD
 # Licensed under the MIT License
 
+from collections import namedtuple
 from enum import Enum
 
 
@@ -21,6 +22,20 @@ BROADCAST_MODULE_ID = {
     0x553: "IC"
 }
 
+# A signal inside a broadcast frame, bit numbering as in DBC files:
+#   byte_order "little" (Intel):    start_bit is the least significant bit, bit 0 = byte 0 bit 0
+#   byte_order "big" (Motorola):    start_bit is the most significant bit, bit 7 = byte 0 bit 7
+# physical value = raw * scale + offset
+SignalDef = namedtuple("SignalDef", "name start_bit length byte_order signed scale offset unit",
+                       defaults=("little", False, 1.0, 0.0, ""))
+
+# Broadcast ID -> signals, decoded by GDS/signals.py for the logger, dashboard and exports
+BROADCAST_SIGNALS = {
+    # Add signals as they are identified, eg.
+    # 0x201: [SignalDef("engine_speed", 7, 16, "big", scale=0.25, unit="rpm"),
+    #         SignalDef("throttle", 39, 8, "big", scale=0.4, unit="%")],
+}
+
 GDS_MODULE_ID = {
     'PCM': {'req_id': 0x7E0, 'resp_id': 0x7E8},
     'OBD2': {'req_id': 0x7DF, 'resp_id': 0x7E8},
@@ -82,11 +97,12 @@ class GDSResult(Enum):
 
     @classmethod
     def from_nrc(cls, code):
-        for result in cls:
-            if result.value == code:
-                return result
-        return cls.OTHER_NEGATIVE_RESPONSE
-    
+        return _NRC_RESULTS.get(code, cls.OTHER_NEGATIVE_RESPONSE)
+
+# NRC byte -> GDSResult, built once so negative responses are a dict lookup
+_NRC_RESULTS = {result.value: result for result in GDSResult if result.value <= 0xFF}
+
+
 class GDSSession:
     DIAGNOSTIC = 0x81
     PROGRAMMING = 0x85
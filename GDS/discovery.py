@@ -0,0 +1,201 @@
+# Copyright (c) 2025 MR MODULE PTY LTD
+# Licensed under the MIT License
+
+"""
+Finds the diagnostic modules on the bus by sending a harmless request (tester present, or a start of
+the default diagnostic session) to every candidate request ID:
+
+    modules = discover(bus)                 # 0x700 - 0x7FF
+    print_report(modules)
+    merge_modules(modules, {0x7E1: 'TCM'})  # usable with FordGDS.set_module() from here on
+
+    python -m GDS.discovery --interface csscan_serial --channel COM10 --bitrate 500000
+
+The request goes to all candidate IDs back to back and every response seen in one listening window is
+collected, so the first pass takes one window whatever the number of IDs. The answers don't say which
+request they belong to, so each responder is then paired with its request ID:
+
+    1. The Ford convention response = request + 8 is tried first, one window per responder
+    2. Responders that don't follow it are found by splitting the candidate IDs in halves and sending
+       to each half until single IDs are left (log2 windows per responder)
+
+Request IDs found in step 2 are asked once more on their own, one that several modules answer is
+reported as functional and not merged into the module table. A responder paired in step 1 is not
+followed further, so the functional IDs already in GDS_MODULE_ID (0x7DF, OBD2) are also asked on their
+own and reported as functional whoever answers.
+"""
+
+import time
+from collections import namedtuple
+
+import can
+
+from . import codec
+from .definitions import GDS_MODULE_ID, GDSSession
+from .FordGDS import GDS_IDS
+
+DiscoveredModule = namedtuple("DiscoveredModule", "req_id resp_id positive functional name")
+
+
+def tester_present_request():
+    return bytes(codec.template(0x3E, True))
+
+
+def session_request():
+    return bytes(codec.template(0x10, GDSSession.DIAGNOSTIC))
+
+
+def _send_all(bus, ids, frame, responses, sid):
+    messages = [can.Message(arbitration_id=can_id, data=frame, is_extended_id=False) for can_id in ids]
+    for msg in messages:
+        for _ in range(100):
+            try:
+                bus.send(msg)
+                break
+            except can.CanError:  # Transmit buffer full, let the adapter catch up
+                time.sleep(0.001)
+                _collect(bus, responses, sid, 0)
+        _collect(bus, responses, sid, 0)  # Answers to the first IDs arrive while the rest are still sent
+
+
+def _collect(bus, responses, sid, timeout):
+    """Adds {resp_id: positive} for single frame responses to `sid` received within `timeout`."""
+    end = time.time() + max(timeout, 0.005)  # Without a timeout only drain what's queued, for 5 ms at most
+    while True:
+        msg = bus.recv(timeout=max(0.0, end - time.time()) if timeout else 0)
+        if msg is None:
+            return
+        data = msg.data
+        if msg.is_rx and not msg.is_extended_id and len(data) >= 2 and 0 < data[0] <= 7:
+            if data[1] == sid + 0x40:
+                responses[msg.arbitration_id] = True
+            elif data[1] == 0x7F and len(data) >= 3 and data[2] == sid:
+                responses.setdefault(msg.arbitration_id, False)
+        if time.time() >= end:
+            return
+
+
+def probe(bus, ids, frame=None, window=0.1):
+    """Sends `frame` to every ID in `ids`, returns {resp_id: positive} of the answers seen in `window`."""
+    frame = frame or tester_present_request()
+    responses = {}
+    _collect(bus, {}, frame[1], 0)  # Old answers don't belong to this probe
+    _send_all(bus, ids, frame, responses, frame[1])
+    _collect(bus, responses, frame[1], window)
+    return responses
+
+
+def functional_ids():
+    """Request IDs in GDS_MODULE_ID that share their response ID with another module (eg. OBD2 0x7DF)."""
+    resp_ids = [ids['resp_id'] for ids in GDS_MODULE_ID.values()]
+    return {ids['req_id'] for ids in GDS_MODULE_ID.values()
+            if resp_ids.count(ids['resp_id']) > 1 and ids['resp_id'] - 8 != ids['req_id']}
+
+
+def discover(bus, request_ids=range(0x700, 0x800), frame=None, window=0.25, probe_window=0.1):
+    """
+    Returns a DiscoveredModule for every responder. positive is False if the module answered with a
+    negative response, name is the GDS_MODULE_ID entry with the same IDs, if there is one.
+    """
+    frame = frame or tester_present_request()
+    request_ids = list(request_ids)
+    candidates = set(request_ids)
+    responders = probe(bus, request_ids, frame, window)
+    pairs = {}  # resp_id -> set of req_ids
+
+    # 1. Response = request + 8
+    for resp_id in sorted(responders):
+        req_id = resp_id - 8
+        if req_id in candidates and resp_id in probe(bus, [req_id], frame, probe_window):
+            pairs.setdefault(resp_id, set()).add(req_id)
+
+    # 2. Halve the candidates, following only the responders still unpaired
+    groups = [(request_ids, set(responders) - set(pairs))]
+    while groups:
+        ids, pending = groups.pop()
+        if not pending:
+            continue
+        if len(ids) == 1:
+            for resp_id in pending:
+                pairs.setdefault(resp_id, set()).add(ids[0])
+            continue
+        half = len(ids) // 2
+        for group in (ids[:half], ids[half:]):
+            answered = probe(bus, group, frame, probe_window)
+            groups.append((group, pending & set(answered)))
+
+    answered_by = {}
+    for resp_id, req_ids in pairs.items():
+        for req_id in req_ids:
+            answered_by.setdefault(req_id, set()).add(resp_id)
+    # IDs from step 2 were only followed for unpaired responders, ask them alone to see who else answers
+    for req_id, resp_ids in answered_by.items():
+        if any(resp_id - 8 != req_id for resp_id in resp_ids):
+            for resp_id in set(probe(bus, [req_id], frame, probe_window)) & set(responders):
+                resp_ids.add(resp_id)
+                pairs[resp_id].add(req_id)
+    functional = functional_ids() & candidates
+    for req_id in sorted(functional - set(answered_by)):
+        for resp_id in set(probe(bus, [req_id], frame, probe_window)) & set(responders):
+            answered_by.setdefault(req_id, set()).add(resp_id)
+            pairs.setdefault(resp_id, set()).add(req_id)
+    known = {(ids['req_id'], ids['resp_id']): name for name, ids in GDS_MODULE_ID.items()}
+    modules = []
+    for resp_id, positive in sorted(responders.items()):
+        for req_id in sorted(pairs.get(resp_id, ())):
+            is_functional = len(answered_by[req_id]) > 1 or req_id in functional
+            modules.append(DiscoveredModule(req_id, resp_id, positive, is_functional, known.get((req_id, resp_id))))
+    return modules
+
+
+def merge_modules(modules, names=None):
+    """
+    Adds discovered physical request/response pairs missing from GDS_MODULE_ID, named from
+    `names` ({req_id: name}) or "MOD_7xx". Returns the names added.
+    """
+    names = names or {}
+    known = {(ids['req_id'], ids['resp_id']) for ids in GDS_MODULE_ID.values()}
+    added = []
+    for module in modules:
+        if module.functional or (module.req_id, module.resp_id) in known:
+            continue
+        name = names.get(module.req_id, f"MOD_{module.req_id:03X}")
+        GDS_MODULE_ID[name] = {'req_id': module.req_id, 'resp_id': module.resp_id}
+        GDS_IDS.update((module.req_id, module.resp_id))  # In place, FordGDS.is_gds_message uses this set
+        known.add((module.req_id, module.resp_id))
+        added.append(name)
+    return added
+
+
+def print_report(modules):
+    print(f"{'Request':>7s} {'Response':>8s}  {'Answer':8s} Module")
+    for m in modules:
+        name = m.name or ("functional" if m.functional else "new")
+        print(f"  0x{m.req_id:03X}    0x{m.resp_id:03X}  {'positive' if m.positive else 'negative':8s} {name}")
+    responded = {m.resp_id for m in modules}
+    for name in GDS_MODULE_ID:
+        if GDS_MODULE_ID[name]['resp_id'] not in responded:
+            print(f"  {name} ({GDS_MODULE_ID[name]['req_id']:#05x}) did not answer")
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Find the diagnostic modules on the bus")
+    parser.add_argument("--interface", default="csscan_serial")
+    parser.add_argument("--channel", default="COM10")
+    parser.add_argument("--bitrate", type=int, default=500000)
+    parser.add_argument("--start", type=lambda value: int(value, 0), default=0x700)
+    parser.add_argument("--end", type=lambda value: int(value, 0), default=0x7FF)
+    parser.add_argument("--session", action="store_true", help="send start diagnostic session instead of tester present")
+    parser.add_argument("--window", type=float, default=0.25, help="seconds to listen after the full sweep")
+    args = parser.parse_args()
+
+    bus = can.interface.Bus(interface=args.interface, channel=args.channel, bitrate=args.bitrate)
+    try:
+        start = time.time()
+        modules = discover(bus, range(args.start, args.end + 1), session_request() if args.session else None, args.window)
+        print_report(modules)
+        print(f"{len(modules)} request / response pairs in {time.time() - start:.1f} s")
+    finally:
+        bus.shutdown()
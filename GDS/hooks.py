@@ -0,0 +1,28 @@
+# Copyright (c) 2025 MR MODULE PTY LTD
+# Licensed under the MIT License
+
+class GDSObserver:
+    """
+    Base class for FordGDS subscribers (see FordGDS.add_observer). Override only the events you need.
+    With no observers registered, FordGDS skips all of this with a single attribute check per event.
+    """
+    def on_frame_tx(self, core, msg):
+        """A frame was sent on core.req_id. msg is reused for the next frame, copy it to keep it."""
+
+    def on_frame_rx(self, core, msg):
+        """A frame was received on core.resp_id."""
+
+    def on_request_start(self, core, sid, data):
+        """send() was called with a new request. data is the [length, SID, ...] list or template passed to send()."""
+
+    def on_response(self, core, response):
+        """receive() finished. response is the reassembled [length, SID, ...] list, or None on timeout."""
+
+    def on_request_complete(self, core, sid, result):
+        """A service call returned its GDSResult."""
+
+    def on_isotp_error(self, core, error, text):
+        """ISO-TP transport error, error is a short code ("sequence", "flow_control_timeout")."""
+
+    def on_close(self, core):
+        """FordGDS.close() was called."""
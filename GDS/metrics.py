@@ -0,0 +1,204 @@
+# Copyright (c) 2025 MR MODULE PTY LTD
+# Licensed under the MIT License
+
+import json
+import time
+from bisect import bisect_left
+
+from .hooks import GDSObserver
+
+# Upper bounds in seconds, the last bucket (+Inf) is implicit
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+
+
+class Histogram:
+    __slots__ = ("counts", "sum", "count")
+
+    def __init__(self):
+        self.counts = [0] * (len(LATENCY_BUCKETS) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect_left(LATENCY_BUCKETS, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def snapshot(self):
+        return {
+            "buckets": dict(zip([str(b) for b in LATENCY_BUCKETS] + ["+Inf"], self.counts)),
+            "sum": self.sum,
+            "count": self.count,
+        }
+
+
+class _RequestStats:
+    __slots__ = ("count", "first_frame", "complete", "outcomes", "timeouts", "isotp_errors")
+
+    def __init__(self):
+        self.count = 0
+        self.first_frame = Histogram()  # send -> first response frame
+        self.complete = Histogram()  # send -> complete (reassembled) response
+        self.outcomes = {}  # GDSResult name -> count
+        self.timeouts = 0
+        self.isotp_errors = {}  # error code -> count
+
+
+class GDSMetrics(GDSObserver):
+    """
+    Request latency and outcome metrics per module and SID, plus frame/byte counters per module.
+    Subscribed with FordGDS.enable_metrics(), FordGDS does no metrics work while it is disabled.
+    """
+    def __init__(self):
+        self.requests = {}  # (module, sid) -> _RequestStats
+        self.frames = {}  # (module, direction) -> [frames, bytes]
+        self._in_flight = {}  # FordGDS instance -> [module, sid, start time, first frame seen, ISO-TP error seen]
+
+    # FordGDS events
+
+    def on_request_start(self, core, sid, data):
+        self.request_start(core.module, sid)
+        self._in_flight[core] = [core.module, sid, time.perf_counter(), False, False]
+
+    def on_frame_tx(self, core, msg):
+        self.frame(core.module, "tx", len(msg.data))
+
+    def on_frame_rx(self, core, msg):
+        self.frame(core.module, "rx", len(msg.data))
+        request = self._in_flight.get(core)
+        if request is not None and not request[3]:
+            request[3] = True
+            self.first_frame(request[0], request[1], time.perf_counter() - request[2])
+
+    def on_response(self, core, response):
+        request = self._in_flight.get(core)
+        if request is None:
+            return
+        if response is None:
+            if not request[4]:  # Failed on an ISO-TP error, already counted in isotp_errors
+                self.timeout(request[0], request[1])
+        else:
+            self.request_complete(request[0], request[1], time.perf_counter() - request[2])
+
+    def on_request_complete(self, core, sid, result):
+        self._in_flight.pop(core, None)
+        if result is not None:
+            self.outcome(core.module, sid, result)
+
+    def on_isotp_error(self, core, error, text):
+        request = self._in_flight.get(core)
+        if request is not None:
+            request[4] = True
+        self.isotp_error(core.module, request[1] if request else None, error)
+
+    # Recording
+
+    def _stats(self, module, sid):
+        stats = self.requests.get((module, sid))
+        if stats is None:
+            stats = self.requests[(module, sid)] = _RequestStats()
+        return stats
+
+    def request_start(self, module, sid):
+        self._stats(module, sid).count += 1
+
+    def first_frame(self, module, sid, seconds):
+        self._stats(module, sid).first_frame.observe(seconds)
+
+    def request_complete(self, module, sid, seconds):
+        self._stats(module, sid).complete.observe(seconds)
+
+    def outcome(self, module, sid, result):
+        outcomes = self._stats(module, sid).outcomes
+        outcomes[result.name] = outcomes.get(result.name, 0) + 1
+
+    def timeout(self, module, sid):
+        self._stats(module, sid).timeouts += 1
+
+    def isotp_error(self, module, sid, error):
+        errors = self._stats(module, sid).isotp_errors
+        errors[error] = errors.get(error, 0) + 1
+
+    def frame(self, module, direction, length):
+        counters = self.frames.get((module, direction))
+        if counters is None:
+            counters = self.frames[(module, direction)] = [0, 0]
+        counters[0] += 1
+        counters[1] += length
+
+    def reset(self):
+        self.requests.clear()
+        self.frames.clear()
+
+    @staticmethod
+    def _sid_str(sid):
+        return "none" if sid is None else f"0x{sid:02X}"
+
+    def snapshot(self):
+        requests = {}
+        for (module, sid), stats in sorted(self.requests.items(), key=lambda item: (str(item[0][0]), item[0][1] or 0)):
+            requests.setdefault(str(module), {})[self._sid_str(sid)] = {
+                "count": stats.count,
+                "first_frame_latency": stats.first_frame.snapshot(),
+                "complete_latency": stats.complete.snapshot(),
+                "outcomes": dict(stats.outcomes),
+                "timeouts": stats.timeouts,
+                "isotp_errors": dict(stats.isotp_errors),
+            }
+        frames = {}
+        for (module, direction), (count, length) in self.frames.items():
+            frames.setdefault(str(module), {})[direction] = {"frames": count, "bytes": length}
+        return {"requests": requests, "frames": frames}
+
+    def to_json(self, path):
+        with open(path, "w") as f:
+            json.dump(self.snapshot(), f, indent=2)
+
+    def to_prometheus(self):
+        """Prometheus text exposition format."""
+        lines = []
+
+        def metric(name, kind, help_text):
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+
+        items = sorted(self.requests.items(), key=lambda item: (str(item[0][0]), item[0][1] or 0))
+
+        metric("fordgds_requests_total", "counter", "Requests sent")
+        for (module, sid), stats in items:
+            lines.append(f'fordgds_requests_total{{module="{module}",sid="{self._sid_str(sid)}"}} {stats.count}')
+
+        metric("fordgds_request_latency_seconds", "histogram", "Time from request sent to first / complete response")
+        for (module, sid), stats in items:
+            for stage, hist in (("first_frame", stats.first_frame), ("complete", stats.complete)):
+                labels = f'module="{module}",sid="{self._sid_str(sid)}",stage="{stage}"'
+                cumulative = 0
+                for bound, count in zip([str(b) for b in LATENCY_BUCKETS] + ["+Inf"], hist.counts):
+                    cumulative += count
+                    lines.append(f'fordgds_request_latency_seconds_bucket{{{labels},le="{bound}"}} {cumulative}')
+                lines.append(f"fordgds_request_latency_seconds_sum{{{labels}}} {hist.sum}")
+                lines.append(f"fordgds_request_latency_seconds_count{{{labels}}} {hist.count}")
+
+        metric("fordgds_responses_total", "counter", "Request outcomes by GDSResult")
+        for (module, sid), stats in items:
+            for result, count in sorted(stats.outcomes.items()):
+                lines.append(f'fordgds_responses_total{{module="{module}",sid="{self._sid_str(sid)}",result="{result}"}} {count}')
+
+        metric("fordgds_timeouts_total", "counter", "Requests with no complete response before the timeout")
+        for (module, sid), stats in items:
+            lines.append(f'fordgds_timeouts_total{{module="{module}",sid="{self._sid_str(sid)}"}} {stats.timeouts}')
+
+        metric("fordgds_isotp_errors_total", "counter", "ISO-TP errors, eg. consecutive frames out of sequence")
+        for (module, sid), stats in items:
+            for error, count in sorted(stats.isotp_errors.items()):
+                lines.append(f'fordgds_isotp_errors_total{{module="{module}",sid="{self._sid_str(sid)}",error="{error}"}} {count}')
+
+        metric("fordgds_frames_total", "counter", "CAN frames sent / received")
+        for (module, direction), (count, _) in sorted(self.frames.items(), key=lambda item: (str(item[0][0]), item[0][1])):
+            lines.append(f'fordgds_frames_total{{module="{module}",direction="{direction}"}} {count}')
+
+        metric("fordgds_bytes_total", "counter", "CAN data bytes sent / received")
+        for (module, direction), (_, length) in sorted(self.frames.items(), key=lambda item: (str(item[0][0]), item[0][1])):
+            lines.append(f'fordgds_bytes_total{{module="{module}",direction="{direction}"}} {length}')
+
+        return "\n".join(lines) + "\n"
@@ -0,0 +1,133 @@
+# Copyright (c) 2025 MR MODULE PTY LTD
+# Licensed under the MIT License
+
+"""
+Replays recorded logs onto a python-can virtual bus so the monitor, change filter, decoder and
+logger can be run and benchmarked without hardware. Virtual bus channels only exist within one
+process, so start a LogReplayer from the script that consumes it and listen with:
+
+    bus = can.Bus(interface='virtual', channel='replay')
+
+Logger/ring buffer CSVs are parsed directly, other formats (.asc, .blf, .trc, ...) are read
+with can.LogReader.
+
+The command line form reports the raw replay rate:
+
+    python -m GDS.replay logs/log_2025-04-18_17-18-00.csv [--fast] [--speed 2] [--loop]
+"""
+
+import csv
+import os
+import time
+import threading
+
+import can
+
+
+def _parse_timestamp(text):
+    # Logger timestamps are local time of day: HH:MM:SS.mmm
+    hours, minutes, seconds = text.split(':')
+    return int(hours) * 3600 + int(minutes) * 60 + float(seconds)
+
+
+def read_log_csv(path):
+    """
+    Yields can.Message for each frame in a logger CSV. Timestamps are seconds since midnight,
+    kept increasing across midnight. Rows with direction "TX" are marked is_rx=False.
+    """
+    day_offset = 0.0
+    last = None
+    with open(path, newline="") as f:
+        reader = csv.reader(f)
+        next(reader, None)  # header
+        for row in reader:
+            if len(row) < 11:
+                continue
+            t = _parse_timestamp(row[0])
+            if last is not None and t + day_offset < last - 43200:
+                day_offset += 86400.0
+            last = t = t + day_offset
+            data = bytes(int(b, 16) for b in row[3:11] if b)
+            yield can.Message(timestamp=t, arbitration_id=int(row[2], 16), data=data,
+                              is_extended_id=False, is_rx=row[1].strip() != "TX")
+
+
+def read_log(path):
+    if os.path.splitext(path)[1].lower() == ".csv":
+        return read_log_csv(path)
+    return iter(can.LogReader(path))
+
+
+class LogReplayer:
+    """
+    Sends the frames of a log on a virtual bus channel, either with the original timing
+    (scaled by `speed`) or as fast as possible (realtime=False).
+    """
+    def __init__(self, path, channel="replay", realtime=True, speed=1.0, loop=False, bus=None):
+        self.path = path
+        self.realtime = realtime
+        self.speed = speed
+        self.loop = loop
+        self.bus = bus or can.Bus(interface="virtual", channel=channel)
+        self.frames_sent = 0
+        self.running = False
+        self._thread = None
+
+    def run(self):
+        self.running = True
+        while self.running:
+            first_log_time = None
+            start = time.perf_counter()
+            for msg in read_log(self.path):
+                if not self.running:
+                    break
+                if self.realtime:
+                    if first_log_time is None:
+                        first_log_time = msg.timestamp
+                    delay = (msg.timestamp - first_log_time) / self.speed - (time.perf_counter() - start)
+                    if delay > 0:
+                        time.sleep(delay)
+                self.bus.send(msg)
+                self.frames_sent += 1
+            if not self.loop:
+                break
+        self.running = False
+
+    def start(self):
+        self._thread = threading.Thread(target=self.run, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self.running = False
+        self.join()
+
+    def join(self, timeout=None):
+        if self._thread:
+            self._thread.join(timeout)
+
+    def close(self):
+        self.stop()
+        self.bus.shutdown()
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Replay a recorded log onto a virtual CAN bus")
+    parser.add_argument("path")
+    parser.add_argument("--channel", default="replay")
+    parser.add_argument("--fast", action="store_true", help="send as fast as possible instead of original timing")
+    parser.add_argument("--speed", type=float, default=1.0)
+    parser.add_argument("--loop", action="store_true")
+    args = parser.parse_args()
+
+    replayer = LogReplayer(args.path, channel=args.channel, realtime=not args.fast, speed=args.speed, loop=args.loop)
+    start = time.perf_counter()
+    try:
+        replayer.run()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        elapsed = time.perf_counter() - start
+        print(f"Replayed {replayer.frames_sent} frames in {elapsed:.2f} s ({replayer.frames_sent / max(elapsed, 1e-9):.0f} frames/s)")
+        replayer.bus.shutdown()
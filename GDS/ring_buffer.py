@@ -0,0 +1,196 @@
+# Copyright (c) 2025 MR MODULE PTY LTD
+# Licensed under the MIT License
+
+import csv
+import os
+import queue
+import time
+import threading
+from array import array
+from bisect import bisect_left, bisect_right
+
+import can
+
+from .hooks import GDSObserver
+
+
+class FrameRingBuffer:
+    """
+    Always-on, fixed memory capture of raw frames (before any change filtering).
+    Frames are stored in flat arrays rather than as can.Message objects. trigger() dumps the
+    frames from `pre_trigger` seconds before the event to `post_trigger` seconds after it
+    to a CSV in the same format as the logger, so dumps can be viewed or replayed like any log.
+    Capacity must cover pre_trigger + post_trigger seconds of bus traffic.
+    Triggers with overlapping windows are merged into one dump, and dumps are written on a worker
+    thread so append() never waits on file writes.
+    """
+    def __init__(self, capacity=65536, pre_trigger=5.0, post_trigger=2.0, log_dir="logs"):
+        self.capacity = capacity
+        self.pre_trigger = pre_trigger
+        self.post_trigger = post_trigger
+        self.log_dir = log_dir
+
+        self.timestamps = array('d', bytes(8 * capacity))
+        self.ids = array('I', bytes(4 * capacity))
+        self.lengths = bytearray(capacity)
+        self.tx = bytearray(capacity)  # 1 = frame we sent
+        self.data = bytearray(8 * capacity)
+        self.index = 0  # next slot to write
+        self.count = 0  # number of valid slots
+
+        self._pending = []  # [dump_after, start, end, labels]
+        self._lock = threading.Lock()
+        self._dump_count = 0
+        self.dumps = []  # (path, labels) of every dump queued
+        self._queue = queue.Queue()  # (path, snapshot) for the writer thread
+        self._writer = None
+
+    def append(self, msg, tx=False):
+        i = self.index
+        t = time.time()  # Same clock as trigger(), interface timestamps aren't always wall clock
+        self.timestamps[i] = t
+        self.ids[i] = msg.arbitration_id
+        length = min(len(msg.data), 8)
+        self.lengths[i] = length
+        self.tx[i] = tx
+        self.data[i * 8:i * 8 + length] = msg.data[:length]
+        self.index = (i + 1) % self.capacity
+        if self.count < self.capacity:
+            self.count += 1
+
+        if self._pending and t >= self._pending[0][0]:
+            self._dump_due(t)
+
+    def trigger(self, label="trigger", pre_trigger=None, post_trigger=None):
+        """
+        Schedules a dump around now. Safe to call from other threads (eg. EEPROM monitor callbacks).
+        A window overlapping one still pending is merged into it, the dump keeps all the labels.
+        """
+        now = time.time()
+        pre = self.pre_trigger if pre_trigger is None else pre_trigger
+        post = self.post_trigger if post_trigger is None else post_trigger
+        with self._lock:
+            window = [now + post, now - pre, now + post, [label]]
+            for pending in [p for p in self._pending if p[1] <= window[2] and window[1] <= p[2]]:
+                self._pending.remove(pending)
+                window[1] = min(window[1], pending[1])
+                window[2] = max(window[2], pending[2])
+                window[3] = pending[3] + window[3]
+            window[0] = window[2]
+            self._pending.append(window)
+            self._pending.sort(key=lambda p: p[0])
+
+    def flush(self):
+        # Dump any pending triggers now, even if their post-trigger window hasn't elapsed, and wait for the writes
+        self._dump_due(float('inf'))
+        self._queue.join()
+
+    def _dump_due(self, now):
+        with self._lock:
+            due = [p for p in self._pending if p[0] <= now]
+            self._pending = [p for p in self._pending if p[0] > now]
+            # Only the copy happens here, on the receive loop. Writing the CSV is left to the writer thread
+            jobs = [(self._dump_filename(labels, start), labels, self._snapshot(start, end))
+                    for _, start, end, labels in due]
+            if jobs and self._writer is None:
+                self._writer = threading.Thread(target=self._write_loop, daemon=True)
+                self._writer.start()
+        for path, labels, snapshot in jobs:
+            self.dumps.append((path, labels))
+            self._queue.put((path, snapshot))
+
+    def observer(self):
+        """GDSObserver that adds the frames FordGDS sends and receives itself, which the caller's recv() loop never sees."""
+        return RingBufferObserver(self)
+
+    def _write_loop(self):
+        while True:
+            path, snapshot = self._queue.get()
+            try:
+                os.makedirs(self.log_dir, exist_ok=True)
+                self._write(path, snapshot)
+            except Exception as e:  # Keep the writer alive for the next dumps (and flush())
+                print(f"Ring buffer: failed to write {path}: {e!r}")
+            finally:
+                self._queue.task_done()
+
+    def _dump_filename(self, labels, start):
+        datestamp = time.strftime('%Y-%m-%d_%H-%M-%S', time.localtime(start)) + f".{int(start * 1000) % 1000:03d}"
+        self._dump_count += 1
+        label = labels[0] if len(labels) == 1 else f"{labels[0]}+{len(labels) - 1}"
+        return os.path.join(self.log_dir, f"trigger_{datestamp}_{self._dump_count}_{label}.csv")
+
+    def _snapshot(self, start=None, end=None):
+        """Copies of the (timestamps, ids, lengths, data) arrays oldest first, limited to a time window."""
+        first = (self.index - self.count) % self.capacity
+        last = first + self.count
+        if last <= self.capacity:
+            spans = [(first, last)]
+        else:
+            spans = [(first, self.capacity), (0, last - self.capacity)]
+        timestamps = array('d')
+        for a, b in spans:
+            timestamps += self.timestamps[a:b]
+        lo = 0 if start is None else bisect_left(timestamps, start)
+        hi = len(timestamps) if end is None else bisect_right(timestamps, end)
+        ids, lengths, tx, data = array('I'), bytearray(), bytearray(), bytearray()
+        for a, b in spans:
+            ids += self.ids[a:b]
+            lengths += self.lengths[a:b]
+            tx += self.tx[a:b]
+            data += self.data[a * 8:b * 8]
+        return timestamps[lo:hi], ids[lo:hi], lengths[lo:hi], tx[lo:hi], data[lo * 8:hi * 8]
+
+    def frames(self, start=None, end=None):
+        """Yields (timestamp, arbitration_id, data) oldest first, optionally limited to a time window."""
+        first = (self.index - self.count) % self.capacity
+        for n in range(self.count):
+            i = (first + n) % self.capacity
+            t = self.timestamps[i]
+            if start is not None and t < start:
+                continue
+            if end is not None and t > end:
+                break
+            yield t, self.ids[i], bytes(self.data[i * 8:i * 8 + self.lengths[i]])
+
+    def dump(self, path, start=None, end=None):
+        return self._write(path, self._snapshot(start, end))
+
+    def _write(self, path, snapshot):
+        from .logger import get_sid_description, get_broadcast_description
+        from .FordGDS import FordGDS
+
+        timestamps, ids, lengths, tx, data = snapshot
+        descriptions = {}  # (id, data) -> description, a window repeats the same frames many times
+        with open(path, "w", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(["Timestamp", "Direction", "ID", "Byte0", "Byte1", "Byte2", "Byte3", "Byte4", "Byte5", "Byte6", "Byte7", "Description"])
+            for i, t in enumerate(timestamps):
+                can_id = ids[i]
+                frame = bytes(data[i * 8:i * 8 + lengths[i]])
+                key = (can_id, frame)
+                if key in descriptions:
+                    desc = descriptions[key]
+                else:
+                    msg = can.Message(timestamp=t, arbitration_id=can_id, data=frame, is_extended_id=False)
+                    desc = get_sid_description(msg) if FordGDS.is_gds_message(msg) else get_broadcast_description(msg)
+                    descriptions[key] = desc
+                timestamp = time.strftime('%H:%M:%S', time.localtime(t)) + f".{int(t * 1000) % 1000:03d}"
+                row = [timestamp, "TX" if tx[i] else "  ", f"{can_id:03X}"]
+                row.extend(f"{b:02X}" for b in frame)
+                row += [""] * (8 - len(frame))
+                row.append(desc)
+                writer.writerow(row)
+        return path
+
+
+class RingBufferObserver(GDSObserver):
+    """Feeds a FrameRingBuffer with the request / response frames of a FordGDS (add_observer)."""
+    def __init__(self, ring_buffer):
+        self.ring_buffer = ring_buffer
+
+    def on_frame_tx(self, core, msg):
+        self.ring_buffer.append(msg, tx=True)  # Copied, msg is reused for the next frame
+
+    def on_frame_rx(self, core, msg):
+        self.ring_buffer.append(msg)
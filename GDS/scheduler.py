@@ -0,0 +1,146 @@
+# Copyright (c) 2025 MR MODULE PTY LTD
+# Licensed under the MIT License
+
+"""
+Transmit scheduler shared by the FordGDS instances of one process, so keepalives, periodic polling
+and scanners don't get in the way of interactive diagnostics:
+
+    scheduler = TxScheduler(bitrate=500000, background_load=0.2)
+    gds = FordGDS(bus_a, scheduler=scheduler)                                         # PRIORITY_INTERACTIVE
+    poller = FordGDS(bus_b, log=False, scheduler=scheduler, priority=PRIORITY_POLL)
+
+- Transactions: every request/response exchange holds its module's lock from the first frame sent
+  until the result is returned, so no other user can put a frame between a first frame and its
+  consecutive frames, or take the response.
+- Priority: while a foreground (flow control / interactive) transaction is running or waiting,
+  poll and background transactions don't start. Among waiters the lowest priority number goes first.
+- Bus load: poll and background frames are paced by a token bucket to `background_load` of the
+  bitrate. Foreground frames and flow control are never delayed.
+
+Each FordGDS needs its own receive path (eg. one BrokerBus or virtual bus instance each), python-can
+buses hand every received frame to only one reader.
+"""
+
+import threading
+import time
+
+PRIORITY_FLOW_CONTROL = 0  # ISO-TP flow control replies
+PRIORITY_INTERACTIVE = 1   # foreground diagnostics
+PRIORITY_POLL = 2          # periodic DID / memory polling, keepalives
+PRIORITY_BACKGROUND = 3    # scanners, bulk reads
+
+PRIORITY_NAMES = {
+    PRIORITY_FLOW_CONTROL: "flow_control",
+    PRIORITY_INTERACTIVE: "interactive",
+    PRIORITY_POLL: "poll",
+    PRIORITY_BACKGROUND: "background",
+}
+
+
+def frame_bits(dlc):
+    """Approximate bits on the wire for a standard (11-bit) data frame, including stuffing and interframe space."""
+    bits = 47 + 8 * dlc
+    return bits + (34 + 8 * dlc) // 5  # average case bit stuffing
+
+
+class _Transaction:
+    __slots__ = ("scheduler", "module", "priority")
+
+    def __init__(self, scheduler, module, priority):
+        self.scheduler = scheduler
+        self.module = module
+        self.priority = priority
+
+    def __enter__(self):
+        self.scheduler.acquire(self.module, self.priority)
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.scheduler.release(self.module, self.priority)
+
+
+class TxScheduler:
+    def __init__(self, bitrate=500000, background_load=0.2, burst_frames=16):
+        if background_load <= 0:
+            # Poll / background frames already wait for foreground transactions, the budget only paces them
+            raise ValueError("Scheduler: background_load must be greater than 0")
+        self.bitrate = bitrate
+        self.background_load = background_load
+        self._cond = threading.Condition()
+        self._owners = {}  # module -> [thread id, depth]
+        self._waiting = [0] * len(PRIORITY_NAMES)  # waiting transactions per priority
+        self._foreground = 0  # running foreground transactions
+        self._bucket_lock = threading.Lock()
+        self._capacity = burst_frames * frame_bits(8)
+        self._tokens = self._capacity
+        self._last_refill = time.perf_counter()
+        self.frames = [0] * len(PRIORITY_NAMES)  # frames sent per priority
+        self.throttled = 0.0  # seconds background frames waited for the load budget
+
+    def transaction(self, module, priority=PRIORITY_INTERACTIVE):
+        """Context manager holding module's transaction lock, re-entrant within a thread."""
+        return _Transaction(self, module, priority)
+
+    def _blocked(self, module, priority, thread):
+        owner = self._owners.get(module)
+        if owner is not None and owner[0] != thread:
+            return True
+        if priority >= PRIORITY_POLL and self._foreground:
+            return True
+        return any(self._waiting[p] for p in range(priority))
+
+    def acquire(self, module, priority=PRIORITY_INTERACTIVE):
+        thread = threading.get_ident()
+        with self._cond:
+            owner = self._owners.get(module)
+            if owner is not None and owner[0] == thread:
+                owner[1] += 1
+                return
+            self._waiting[priority] += 1
+            try:
+                while self._blocked(module, priority, thread):
+                    self._cond.wait()
+            finally:
+                self._waiting[priority] -= 1
+            self._owners[module] = [thread, 1]
+            if priority <= PRIORITY_INTERACTIVE:
+                self._foreground += 1
+
+    def release(self, module, priority=PRIORITY_INTERACTIVE):
+        with self._cond:
+            owner = self._owners[module]
+            owner[1] -= 1
+            if owner[1]:
+                return
+            del self._owners[module]
+            if priority <= PRIORITY_INTERACTIVE:
+                self._foreground -= 1
+            self._cond.notify_all()
+
+    def _consume(self, bits):
+        # Token bucket in bits, refilled at background_load * bitrate
+        rate = self.background_load * self.bitrate
+        with self._bucket_lock:
+            while True:
+                now = time.perf_counter()
+                self._tokens = min(self._capacity, self._tokens + (now - self._last_refill) * rate)
+                self._last_refill = now
+                if self._tokens >= bits:
+                    self._tokens -= bits
+                    return
+                wait = (bits - self._tokens) / rate
+                self.throttled += wait
+                time.sleep(wait)
+
+    def send(self, bus, msg, priority=PRIORITY_INTERACTIVE):
+        if priority >= PRIORITY_POLL:
+            self._consume(frame_bits(len(msg.data)))
+        bus.send(msg)
+        self.frames[priority] += 1
+
+    def stats(self):
+        return {
+            "frames": {PRIORITY_NAMES[p]: count for p, count in enumerate(self.frames)},
+            "throttled_seconds": self.throttled,
+            "busy_modules": sorted(str(module) for module in self._owners),
+        }
@@ -0,0 +1,177 @@
+# Copyright (c) 2025 MR MODULE PTY LTD
+# Licensed under the MIT License
+
+"""
+Decodes broadcast frames into physical values using the SignalDef table in definitions.py
+(BROADCAST_SIGNALS). Each ID's signals are compiled once into a single function that unpacks the
+whole frame, so decoding keeps up with the bus:
+
+    decoder = BroadcastDecoder()
+    decoder.decode_dict(msg)    # {"engine_speed": 750.0, ...} or None for IDs without signals
+    describe(msg)               # "engine_speed=750 rpm, ..." used by the logger and dashboard
+
+Whole captures can be decoded into arrays (NumPy when installed, array('d') otherwise):
+
+    series = decoder.decode_batch(read_log("logs/capture.csv"))    # {name: (times, values)}
+
+or from the command line, written as Timestamp,Signal,Value rows:
+
+    python -m GDS.signals logs/capture.csv --output logs/capture.signals.csv
+"""
+
+from array import array
+
+from .definitions import BROADCAST_SIGNALS
+
+_PADDING = bytes(8)
+
+
+def _placement(sig):
+    """(source, shift, mask) of a signal: source is the frame read as a little or big endian 64-bit int."""
+    mask = (1 << sig.length) - 1
+    if sig.byte_order == "little":
+        shift = sig.start_bit
+        source = "le"
+    elif sig.byte_order == "big":
+        msb = (sig.start_bit // 8) * 8 + (7 - sig.start_bit % 8)  # bit position counted from byte 0 bit 7
+        shift = 63 - (msb + sig.length - 1)
+        source = "be"
+    else:
+        raise ValueError(f"Signals: {sig.name} byte_order must be 'little' or 'big'")
+    if shift < 0 or shift + sig.length > 64:
+        raise ValueError(f"Signals: {sig.name} does not fit in an 8 byte frame")
+    return source, shift, mask
+
+
+def compile_decoder(can_id, signals):
+    """Builds decode(data) -> tuple of physical values in the order of `signals`."""
+    lines = ["def decode(data):"]
+    placements = [_placement(sig) for sig in signals]
+    if any(source == "le" for source, _, _ in placements):
+        lines.append("    le = int.from_bytes(data, 'little')")
+    if any(source == "be" for source, _, _ in placements):
+        lines.append("    be = int.from_bytes(data, 'big') << (64 - 8 * len(data))")
+    values = []
+    for i, (sig, (source, shift, mask)) in enumerate(zip(signals, placements)):
+        expr = f"(({source} >> {shift}) & {mask:#x})"
+        if sig.signed:
+            lines.append(f"    r{i} = {expr}")
+            lines.append(f"    if r{i} & {1 << (sig.length - 1):#x}: r{i} -= {1 << sig.length:#x}")
+            expr = f"r{i}"
+        if sig.scale != 1 or sig.offset != 0:
+            expr = f"{expr} * {sig.scale!r} + {sig.offset!r}"
+        values.append(expr)
+    lines.append(f"    return ({', '.join(values)},)")
+    namespace = {}
+    exec(compile("\n".join(lines), f"<signals 0x{can_id:03X}>", "exec"), namespace)
+    return namespace["decode"]
+
+
+class BroadcastDecoder:
+    def __init__(self, signals=None):
+        self.signals = BROADCAST_SIGNALS if signals is None else signals
+        self._decoders = {}  # can_id -> (SignalDef tuple, decode function)
+        for can_id, defs in self.signals.items():
+            if defs:
+                self._decoders[can_id] = (tuple(defs), compile_decoder(can_id, defs))
+
+    def __contains__(self, can_id):
+        return can_id in self._decoders
+
+    def decode(self, msg):
+        """Tuple of physical values in table order, or None if the ID has no signals."""
+        entry = self._decoders.get(msg.arbitration_id)
+        if entry is None:
+            return None
+        return entry[1](msg.data)
+
+    def decode_dict(self, msg):
+        entry = self._decoders.get(msg.arbitration_id)
+        if entry is None:
+            return None
+        return {sig.name: value for sig, value in zip(entry[0], entry[1](msg.data))}
+
+    def describe(self, msg):
+        entry = self._decoders.get(msg.arbitration_id)
+        if entry is None:
+            return None
+        return ", ".join(f"{sig.name}={value:g}{(' ' + sig.unit) if sig.unit else ''}"
+                         for sig, value in zip(entry[0], entry[1](msg.data)))
+
+    def decode_batch(self, frames):
+        """
+        Decodes every frame with known signals, returns {signal name: (times, values)}.
+        Uses NumPy arrays when NumPy is installed, otherwise array('d') via the compiled decoders.
+        """
+        grouped = {}  # can_id -> (times, data padded to 8 bytes per frame)
+        decoders = self._decoders
+        for msg in frames:
+            can_id = msg.arbitration_id
+            if can_id in decoders:
+                group = grouped.get(can_id)
+                if group is None:
+                    group = grouped[can_id] = (array('d'), bytearray())
+                group[0].append(msg.timestamp)
+                buffer = group[1]
+                data = msg.data
+                length = len(data)
+                if length == 8:
+                    buffer += data
+                else:
+                    buffer += data[:8]
+                    buffer += _PADDING[length:]
+        try:
+            import numpy as np
+        except ImportError:
+            np = None
+        series = {}
+        for can_id, (times, data) in grouped.items():
+            defs, decode = self._decoders[can_id]
+            if np is None:
+                columns = [array('d') for _ in defs]
+                for i in range(0, len(data), 8):
+                    for column, value in zip(columns, decode(data[i:i + 8])):
+                        column.append(value)
+                for sig, column in zip(defs, columns):
+                    series[sig.name] = (times, column)
+                continue
+            rows = np.frombuffer(bytes(data), dtype=np.uint8).reshape(-1, 8)
+            words = {"le": rows.view("<u8").ravel(), "be": rows.view(">u8").ravel().astype(np.uint64)}
+            np_times = np.frombuffer(times, dtype=np.float64)
+            for sig in defs:
+                source, shift, mask = _placement(sig)
+                raw = (words[source] >> np.uint64(shift)) & np.uint64(mask)
+                if sig.signed:
+                    raw = raw.astype(np.int64)
+                    raw = np.where(raw & (1 << (sig.length - 1)), raw - (1 << sig.length), raw)
+                series[sig.name] = (np_times, raw * sig.scale + sig.offset)
+        return series
+
+
+_default = BroadcastDecoder()
+
+
+def describe(msg):
+    """Decoded signal text for a broadcast frame using BROADCAST_SIGNALS, or None."""
+    return _default.describe(msg)
+
+
+if __name__ == "__main__":
+    import argparse
+    import csv
+
+    from .replay import read_log
+
+    parser = argparse.ArgumentParser(description="Decode broadcast signals from a recorded log")
+    parser.add_argument("path")
+    parser.add_argument("--output", help="CSV to write (default: <log>.signals.csv)")
+    args = parser.parse_args()
+
+    output = args.output or args.path.rsplit(".", 1)[0] + ".signals.csv"
+    series = _default.decode_batch(read_log(args.path))
+    rows = sorted((t, name, v) for name, (times, values) in series.items() for t, v in zip(times, values))
+    with open(output, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["Timestamp", "Signal", "Value"])
+        writer.writerows((f"{t:.3f}", name, f"{v:g}") for t, name, v in rows)
+    print(f"{len(rows)} samples of {len(series)} signals written to {output}")
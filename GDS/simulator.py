@@ -0,0 +1,373 @@
+# Copyright (c) 2025 MR MODULE PTY LTD
+# Licensed under the MIT License
+
+"""
+Simulated ECU for testing and benchmarking without a vehicle.
+
+The ECU attaches to a python-can virtual bus and answers on a GDS_MODULE_ID request/response
+pair with ISO-TP segmentation. Everything in GDS/services.py is implemented. Response latency,
+STmin, block size and NRC behaviour are configurable so throughput measurements are repeatable:
+
+    ecu = VirtualECU(module='PCM', channel='gds', dids={0x0200: [0x12, 0x34]})
+    ecu.start()
+    gds = FordGDS(can.Bus(interface='virtual', channel='gds'))
+    gds.set_module('PCM')
+"""
+
+import time
+import threading
+
+import can
+
+from .definitions import GDS_MODULE_ID, GDSSession
+
+NRC_GENERAL_REJECT = 0x10
+NRC_SERVICE_NOT_SUPPORTED = 0x11
+NRC_INVALID_FORMAT = 0x12
+NRC_CONDITIONS_NOT_CORRECT = 0x22
+NRC_REQUEST_SEQUENCE_ERROR = 0x24
+NRC_REQUEST_OUT_OF_RANGE = 0x31
+NRC_SECURITY_ACCESS_DENIED = 0x33
+NRC_INVALID_KEY = 0x35
+
+MAX_RESPONSE_LENGTH = 0xFFF  # 12-bit ISO-TP first frame length
+
+# Services that are refused outside of these sessions unless overridden with `session_services`
+DEFAULT_SESSION_SERVICES = {
+    0x11: {GDSSession.PROGRAMMING, GDSSession.ADJUSTMENT},
+    0x34: {GDSSession.PROGRAMMING},
+    0x35: {GDSSession.PROGRAMMING},
+    0x36: {GDSSession.PROGRAMMING},
+    0x37: {GDSSession.PROGRAMMING},
+}
+
+
+def default_key(seed):
+    # Stand-in algorithm, the real one is module specific
+    return [b ^ 0xFF for b in seed]
+
+
+class VirtualECU:
+    """
+    dids / local_ids    - {id: list of bytes} answered by 0x22/0x21 and written by 0x2E/0x3B
+    protected_dids      - DIDs that can only be written after security access
+    memory              - bytearray answered by 0x23/0x3D/0x35/0x36, starting at memory_base
+    dtcs                - list of (dtc, status) reported by 0x18 and cleared by 0x14
+    latency             - seconds between a complete request and the response
+    stmin / block_size  - flow control values sent for segmented requests
+    nrc_overrides       - {sid: nrc} to force negative responses
+    """
+    def __init__(self, bus=None, module='PCM', channel='gds', latency=0.0, stmin=0x00, block_size=0x00,
+                 dids=None, local_ids=None, protected_dids=None, memory=None, memory_base=0x00000000,
+                 dtcs=None, seed=(0x11, 0x22, 0x33), key_function=default_key, nrc_overrides=None,
+                 session_services=None, transfer_block_size=0x80):
+        self.bus = bus or can.Bus(interface='virtual', channel=channel)
+        self.req_id = GDS_MODULE_ID[module]['req_id']
+        self.resp_id = GDS_MODULE_ID[module]['resp_id']
+        self.latency = latency
+        self.stmin = stmin
+        self.block_size = block_size
+        self.dids = dict(dids or {})
+        self.local_ids = dict(local_ids or {})
+        self.protected_dids = set(protected_dids or ())
+        self.memory = memory if memory is not None else bytearray(0x100000)
+        self.memory_base = memory_base
+        self.dtcs = list(dtcs or [])
+        self.seed = list(seed)
+        self.key_function = key_function
+        self.nrc_overrides = dict(nrc_overrides or {})
+        self.session_services = DEFAULT_SESSION_SERVICES if session_services is None else session_services
+        self.transfer_block_size = transfer_block_size
+
+        self.session = GDSSession.DIAGNOSTIC
+        self.unlocked = False
+        self._seed_sent = False
+        self._transfer = None  # ('upload' | 'download', next address, end address, next block)
+
+        self.requests = 0
+        self.running = False
+        self._thread = None
+
+        self._handlers = {
+            0x10: self._start_session,
+            0x11: self._ecu_reset,
+            0x14: self._clear_dtc,
+            0x18: self._read_dtc_by_status,
+            0x21: self._read_local_id,
+            0x22: self._read_did,
+            0x23: self._read_memory,
+            0x27: self._security_access,
+            0x2E: self._write_did,
+            0x2F: self._io_control,
+            0x34: self._request_download,
+            0x35: self._request_upload,
+            0x36: self._transfer_data,
+            0x37: self._transfer_exit,
+            0x3B: self._write_local_id,
+            0x3D: self._write_memory,
+            0x3E: self._tester_present,
+        }
+
+    def start(self):
+        self.running = True
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self.running = False
+        if self._thread:
+            self._thread.join()
+            self._thread = None
+        self.bus.shutdown()
+
+    # ISO-TP transport
+
+    def _run(self):
+        while self.running:
+            msg = self.bus.recv(timeout=0.05)
+            if msg is None or msg.arbitration_id != self.req_id or not msg.data:
+                continue
+            payload = self._receive_request(msg)
+            if payload:
+                self.requests += 1
+                response = self.handle(payload)
+                if response:
+                    if self.latency:
+                        time.sleep(self.latency)
+                    self._send_response(response)
+
+    def _recv_request_frame(self, timeout=1.0):
+        end = time.time() + timeout
+        while time.time() < end:
+            msg = self.bus.recv(timeout=0.05)
+            if msg and msg.arbitration_id == self.req_id:
+                return msg.data
+        return None
+
+    def _receive_request(self, msg):
+        data = msg.data
+        pci = data[0] >> 4
+        if pci == 0x0:
+            return list(data[1:1 + (data[0] & 0x0F)])
+        if pci != 0x1:
+            return None  # Stray consecutive / flow control frame
+
+        total_len = ((data[0] & 0x0F) << 8) | data[1]
+        payload = list(data[2:])
+        seq = 1
+        while len(payload) < total_len:
+            self._send_frame([0x30, self.block_size, self.stmin])
+            for _ in range(self.block_size or 0xFFFF):
+                frame = self._recv_request_frame()
+                if frame is None or frame[0] >> 4 != 0x2 or (frame[0] & 0x0F) != seq:
+                    return None  # Timed out or out of sequence, drop the request
+                seq = (seq + 1) % 0x10
+                payload += frame[1:]
+                if len(payload) >= total_len:
+                    break
+        return payload[:total_len]
+
+    def _send_frame(self, data):
+        self.bus.send(can.Message(arbitration_id=self.resp_id, data=data + [0x00] * (8 - len(data)), is_extended_id=False))
+
+    def _wait_flow_control(self):
+        while True:
+            frame = self._recv_request_frame()
+            if frame is None:
+                return None
+            if frame[0] == 0x30:
+                return frame
+            # 0x31 = wait, keep waiting for the next flow control frame
+
+    def _send_response(self, payload):
+        if len(payload) <= 7:
+            self._send_frame([len(payload)] + payload)
+            return
+
+        total_len = len(payload)
+        self._send_frame([0x10 | ((total_len >> 8) & 0x0F), total_len & 0xFF] + payload[:6])
+        remaining = payload[6:]
+        seq = 1
+        while remaining:
+            flow = self._wait_flow_control()
+            if flow is None:
+                return
+            block_size, stmin_raw = flow[1], flow[2]
+            if stmin_raw <= 0x7F:
+                stmin = stmin_raw / 1000.0
+            elif 0xF1 <= stmin_raw <= 0xF9:
+                stmin = (stmin_raw - 0xF0) / 10000.0
+            else:
+                stmin = 0
+            for _ in range(block_size or 0xFFFF):
+                if not remaining:
+                    break
+                self._send_frame([0x20 | seq] + remaining[:7])
+                remaining = remaining[7:]
+                seq = (seq + 1) % 0x10
+                if stmin:
+                    time.sleep(stmin)
+
+    # Services
+
+    def handle(self, payload):
+        """Returns the response payload (starting with the response SID) for a request payload, or None."""
+        sid = payload[0]
+        if sid in self.nrc_overrides:
+            return self._negative(sid, self.nrc_overrides[sid])
+        handler = self._handlers.get(sid)
+        if handler is None:
+            return self._negative(sid, NRC_SERVICE_NOT_SUPPORTED)
+        allowed = self.session_services.get(sid)
+        if allowed is not None and self.session not in allowed:
+            return self._negative(sid, NRC_CONDITIONS_NOT_CORRECT)
+        try:
+            return handler(payload)
+        except IndexError:
+            return self._negative(sid, NRC_INVALID_FORMAT)
+
+    @staticmethod
+    def _negative(sid, nrc):
+        return [0x7F, sid, nrc]
+
+    def _memory_range(self, address, size):
+        offset = address - self.memory_base
+        if offset < 0 or size < 1 or offset + size > len(self.memory):
+            return None
+        return offset
+
+    def _start_session(self, payload):  # 0x10
+        session = payload[1]
+        if session not in (GDSSession.DIAGNOSTIC, GDSSession.PROGRAMMING, GDSSession.ADJUSTMENT):
+            return self._negative(0x10, NRC_INVALID_FORMAT)
+        self.session = session
+        return [0x50, session]
+
+    def _ecu_reset(self, payload):  # 0x11
+        self.session = GDSSession.DIAGNOSTIC
+        self.unlocked = False
+        self._seed_sent = False
+        self._transfer = None
+        return [0x51]
+
+    def _clear_dtc(self, payload):  # 0x14
+        self.dtcs.clear()
+        return [0x54, payload[1], payload[2]]
+
+    def _read_dtc_by_status(self, payload):  # 0x18
+        response = [0x58, len(self.dtcs)]
+        for dtc, status in self.dtcs:
+            response += [(dtc >> 8) & 0xFF, dtc & 0xFF, status]
+        return response
+
+    def _read_local_id(self, payload):  # 0x21
+        local_id = payload[1]
+        if local_id not in self.local_ids:
+            return self._negative(0x21, NRC_REQUEST_OUT_OF_RANGE)
+        return [0x61, local_id] + list(self.local_ids[local_id])
+
+    def _write_local_id(self, payload):  # 0x3B
+        local_id = payload[1]
+        if local_id not in self.local_ids:
+            return self._negative(0x3B, NRC_REQUEST_OUT_OF_RANGE)
+        self.local_ids[local_id] = payload[2:]
+        return [0x7B, local_id]
+
+    def _read_did(self, payload):  # 0x22
+        did = (payload[1] << 8) | payload[2]
+        if did not in self.dids:
+            return self._negative(0x22, NRC_REQUEST_OUT_OF_RANGE)
+        return [0x62, payload[1], payload[2]] + list(self.dids[did])
+
+    def _write_did(self, payload):  # 0x2E
+        did = (payload[1] << 8) | payload[2]
+        if did not in self.dids:
+            return self._negative(0x2E, NRC_REQUEST_OUT_OF_RANGE)
+        if did in self.protected_dids and not self.unlocked:
+            return self._negative(0x2E, NRC_SECURITY_ACCESS_DENIED)
+        self.dids[did] = payload[3:]
+        return [0x6E, payload[1], payload[2]]
+
+    def _io_control(self, payload):  # 0x2F
+        did = (payload[1] << 8) | payload[2]
+        if did not in self.dids:
+            return self._negative(0x2F, NRC_REQUEST_OUT_OF_RANGE)
+        return [0x6F, payload[1], payload[2], payload[3]] + list(self.dids[did])
+
+    def _read_memory(self, payload):  # 0x23
+        address = int.from_bytes(bytes(payload[1:5]), 'big')
+        size = (payload[5] << 8) | payload[6]
+        offset = self._memory_range(address, size)
+        if offset is None or size + 1 > MAX_RESPONSE_LENGTH:
+            return self._negative(0x23, NRC_REQUEST_OUT_OF_RANGE)
+        return [0x63] + list(self.memory[offset:offset + size])
+
+    def _write_memory(self, payload):  # 0x3D
+        address = int.from_bytes(bytes(payload[1:5]), 'big')
+        size = (payload[5] << 8) | payload[6]
+        values = payload[7:7 + size]
+        offset = self._memory_range(address, size)
+        if offset is None or len(values) != size:
+            return self._negative(0x3D, NRC_REQUEST_OUT_OF_RANGE)
+        self.memory[offset:offset + size] = bytes(values)
+        return [0x7D] + payload[1:5]
+
+    def _security_access(self, payload):  # 0x27
+        if payload[1] == 0x01:
+            self._seed_sent = not self.unlocked
+            return [0x67, 0x01] + ([0x00] * len(self.seed) if self.unlocked else self.seed)
+        if payload[1] == 0x02:
+            if not self._seed_sent:
+                return self._negative(0x27, NRC_REQUEST_SEQUENCE_ERROR)
+            self._seed_sent = False
+            if list(payload[2:]) != list(self.key_function(self.seed)):
+                return self._negative(0x27, NRC_INVALID_KEY)
+            self.unlocked = True
+            return [0x67, 0x02]
+        return self._negative(0x27, NRC_INVALID_FORMAT)
+
+    def _tester_present(self, payload):  # 0x3E
+        if len(payload) > 1 and payload[1] == 0x02:
+            return None  # No response required
+        return [0x7E]
+
+    def _request_transfer(self, sid, direction, payload):
+        if not self.unlocked:
+            return self._negative(sid, NRC_SECURITY_ACCESS_DENIED)
+        address = int.from_bytes(bytes(payload[1:5]), 'big')
+        size = int.from_bytes(bytes(payload[6:9]), 'big')
+        offset = self._memory_range(address, size)
+        if offset is None:
+            return self._negative(sid, NRC_REQUEST_OUT_OF_RANGE)
+        if direction == 'upload' and self.transfer_block_size + 2 > MAX_RESPONSE_LENGTH:
+            return self._negative(sid, NRC_REQUEST_OUT_OF_RANGE)  # 0x76 responses wouldn't fit
+        self._transfer = (direction, offset, offset + size, 1)
+        return [sid + 0x40, (self.transfer_block_size >> 8) & 0xFF, self.transfer_block_size & 0xFF]
+
+    def _request_download(self, payload):  # 0x34
+        return self._request_transfer(0x34, 'download', payload)
+
+    def _request_upload(self, payload):  # 0x35
+        return self._request_transfer(0x35, 'upload', payload)
+
+    def _transfer_data(self, payload):  # 0x36
+        if self._transfer is None:
+            return self._negative(0x36, NRC_REQUEST_SEQUENCE_ERROR)
+        direction, offset, end, block = self._transfer
+        block_number = payload[1]
+        if block_number != block & 0xFF:
+            return self._negative(0x36, NRC_REQUEST_SEQUENCE_ERROR)
+        if direction == 'upload':
+            chunk = list(self.memory[offset:min(offset + self.transfer_block_size, end)])
+            self._transfer = (direction, offset + len(chunk), end, block + 1)
+            return [0x76, block_number] + chunk
+        data = payload[2:2 + (end - offset)]
+        self.memory[offset:offset + len(data)] = bytes(data)
+        self._transfer = (direction, offset + len(data), end, block + 1)
+        return [0x76, block_number]
+
+    def _transfer_exit(self, payload):  # 0x37
+        if self._transfer is None:
+            return self._negative(0x37, NRC_REQUEST_SEQUENCE_ERROR)
+        self._transfer = None
+        return [0x77]
@@ -0,0 +1,114 @@
+# Copyright (c) 2025 MR MODULE PTY LTD
+# Licensed under the MIT License
+
+"""
+Self-contained viewer page for large logs.
+
+The logger's CSV is packed into a compact JSON blob (descriptions are stored once in a
+string table) and the page only renders the rows inside the visible window, so captures
+with hundreds of thousands of frames open instantly.
+
+    python -m GDS.viewer logs/log_2025-04-18_17-18-00.csv
+"""
+
+import csv
+import json
+import os
+import sys
+
+from .FordGDS import GDS_IDS
+from .logger import HTML_STYLE
+
+_PAGE = """<!DOCTYPE html>
+<html><head><meta charset="utf-8"><title>%(title)s</title>%(style)s
+<style>
+body{margin:0;font-family:monospace;font-size:13px}
+#bar{padding:4px 8px;border-bottom:1px solid #ccc}
+#v{position:absolute;top:32px;bottom:0;left:0;right:0;overflow-y:auto}
+#s{position:relative}
+#w{position:absolute;left:0;right:0;white-space:pre}
+#w div{height:16px;line-height:16px;padding-left:8px}
+</style></head><body>
+<div id="bar">%(title)s &mdash; <span id="n"></span> frames &nbsp; ID filter: <input id="f" size="12" placeholder="eg. 7E0 7E8"></div>
+<div id="v"><div id="s"><div id="w"></div></div></div>
+<script>
+const LOG = %(data)s;
+const ROW = 16, GDS = new Set(LOG.gds);
+const v = document.getElementById("v"), s = document.getElementById("s"), w = document.getElementById("w");
+let view = LOG.rows.map((_, i) => i);
+
+function roles(id, b) {
+  const n = b.length / 2;
+  if (!GDS.has(id) || n == 0) return "-".repeat(n);
+  const b0 = parseInt(b.substr(0, 2), 16), pci = b0 >> 4;
+  if (pci == 1) return "plsddddd".substr(0, n);
+  if (pci == 2) return "pddddddd".substr(0, n);
+  if (pci == 3) return "pxxxxxxx".substr(0, n);
+  return ("ls" + "d".repeat(Math.max(b0 - 1, 0)) + "xxxxxxxx").substr(0, n);
+}
+
+function line(r) {
+  const id = r[2], b = r[3], rl = roles(id, b);
+  let h = "<i class=t>[" + r[0] + "]</i> <b>" + r[1] + " " + id.toString(16).toUpperCase().padStart(3, "0") + "</b> | ";
+  for (let i = 0; i < rl.length; i++) {
+    const x = b.substr(i * 2, 2);
+    h += (rl[i] == "-" ? x : "<i class=" + rl[i] + ">" + x + "</i>") + " ";
+  }
+  return h + "| " + LOG.desc[r[4]].replace(/&/g, "&amp;").replace(/</g, "&lt;");
+}
+
+function draw() {
+  const first = Math.floor(v.scrollTop / ROW), count = Math.ceil(v.clientHeight / ROW) + 1;
+  let h = "";
+  for (let i = first; i < Math.min(first + count, view.length); i++) h += "<div>" + line(LOG.rows[view[i]]) + "</div>";
+  w.style.top = (first * ROW) + "px";
+  w.innerHTML = h;
+}
+
+function refilter() {
+  const ids = document.getElementById("f").value.split(/[ ,]+/).filter(x => x).map(x => parseInt(x, 16));
+  view = [];
+  for (let i = 0; i < LOG.rows.length; i++) if (!ids.length || ids.includes(LOG.rows[i][2])) view.push(i);
+  document.getElementById("n").textContent = view.length;
+  s.style.height = (view.length * ROW) + "px";
+  draw();
+}
+
+v.addEventListener("scroll", () => requestAnimationFrame(draw));
+window.addEventListener("resize", draw);
+document.getElementById("f").addEventListener("change", refilter);
+refilter();
+</script></body></html>
+"""
+
+
+def pack_log(csv_path):
+    """Reads a logger CSV into the compact structure embedded in the viewer page."""
+    desc_index = {}
+    rows = []
+    with open(csv_path, newline="") as f:
+        reader = csv.reader(f)
+        next(reader, None)  # header
+        for row in reader:
+            if len(row) < 12:
+                continue
+            desc = row[11]
+            idx = desc_index.get(desc)
+            if idx is None:
+                idx = desc_index[desc] = len(desc_index)
+            rows.append([row[0], row[1], int(row[2], 16), "".join(row[3:11]), idx])
+    return {"gds": sorted(GDS_IDS), "desc": list(desc_index), "rows": rows}
+
+
+def export_viewer(csv_path, html_path=None):
+    if html_path is None:
+        html_path = os.path.splitext(csv_path)[0] + ".view.html"
+    data = json.dumps(pack_log(csv_path), separators=(",", ":")).replace("</", "<\\/")
+    with open(html_path, "w", encoding="utf-8") as f:
+        f.write(_PAGE % {"title": os.path.basename(csv_path), "style": HTML_STYLE, "data": data})
+    return html_path
+
+
+if __name__ == "__main__":
+    for path in sys.argv[1:]:
+        print(f"Viewer written to {export_viewer(path)}")
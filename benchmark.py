@@ -0,0 +1,207 @@
+# Copyright (c) 2025 MR MODULE PTY LTD
+# Licensed under the MIT License
+
+"""
+Benchmarks for the FordGDS transport, services and logger hot paths.
+Runs against a python-can virtual bus and the simulated ECU (GDS/simulator.py), so no hardware is needed.
+The EEPROM monitor is measured against the simulated Arduino (virtual_arduino.py) where ptys are available.
+
+    python benchmark.py --output bench.json
+    python benchmark.py --baseline bench.json --threshold 0.15    # exit code 1 on a >15% regression
+
+All results are rates (higher is better) and are written as JSON so runs can be compared.
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+
+import can
+
+from GDS import FordGDS, ChangeFilter, GDSResult, logger
+from GDS.simulator import VirtualECU
+from GDS.replay import read_log
+
+ISOTP_SIZES = [64, 256, 1024, 4094]  # 4094 = largest 0x23 response that fits the 12-bit ISO-TP length with the SID
+SAMPLE_LOG = os.path.join(os.path.dirname(os.path.abspath(__file__)), "logs", "log_2025-04-18_17-18-00.csv")
+
+
+def rate(fn, duration):
+    """Calls fn repeatedly for `duration` seconds, returns calls per second."""
+    fn()  # warm up
+    calls = 0
+    start = time.perf_counter()
+    end = start + duration
+    while time.perf_counter() < end:
+        fn()
+        calls += 1
+    return calls / (time.perf_counter() - start)
+
+
+def bench_transport(duration):
+    results = {}
+    ecu = VirtualECU(channel="bench", dids={0x0200: [0x12, 0x34]}, memory=bytearray(0x10000))
+    ecu.start()
+    gds = FordGDS(can.Bus(interface="virtual", channel="bench"), log=False)  # Logger sinks are measured separately
+    gds.set_module("PCM")
+    out = []
+
+    def round_trip():
+        gds.send([0x02, 0x3E, 0x01])
+        if gds.receive() is None:
+            raise RuntimeError("Benchmark: no response from simulated ECU")
+
+    def checked(name, result, length=None):
+        # A fast negative or truncated response must not count as throughput
+        if result != GDSResult.SUCCESS:
+            raise RuntimeError(f"Benchmark: {name} returned {result}")
+        if length is not None and len(out) != length:
+            raise RuntimeError(f"Benchmark: {name} returned {len(out)} bytes, expected {length}")
+
+    def read_did():
+        checked("read_data_by_identifier", gds.read_data_by_identifier(0x0200, out), 2)
+
+    def read_memory(size):
+        checked(f"read_memory_by_address({size})", gds.read_memory_by_address(0x1000, size, out), size)
+
+    def write_memory(values):
+        checked(f"write_memory_by_address({len(values)})", gds.write_memory_by_address(0x1000, values))
+
+    try:
+        results["single_frame_round_trips_per_s"] = rate(round_trip, duration)
+        results["read_data_by_identifier_per_s"] = rate(read_did, duration)
+        for size in ISOTP_SIZES:
+            results[f"isotp_rx_{size}B_bytes_per_s"] = size * rate(lambda: read_memory(size), duration)
+            values = [0x55] * min(size, 4088)
+            results[f"isotp_tx_{size}B_bytes_per_s"] = len(values) * rate(lambda: write_memory(values), duration)
+    finally:
+        ecu.stop()
+        gds.bus.shutdown()
+    return results
+
+
+def _sample_frames():
+    return [msg for msg in read_log(SAMPLE_LOG)]
+
+
+def bench_logger(duration):
+    results = {}
+    frames = _sample_frames()
+    n = len(frames)
+
+    def frames_rate(fn):
+        index = [0]
+
+        def one():
+            fn(frames[index[0] % n], "  ", "00:00:00.000")
+            index[0] += 1
+        return rate(one, duration)
+
+    with contextlib.redirect_stdout(io.StringIO()) as out:
+        def terminal(msg, direction, timestamp):
+            logger.terminal_message(msg, direction, timestamp)
+            out.seek(0)
+            out.truncate()
+        results["logger_terminal_frames_per_s"] = frames_rate(terminal)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        with open(os.path.join(tmp, "bench.html"), "w") as html_file:
+            logger.begin(html_file)
+            results["logger_html_frames_per_s"] = frames_rate(logger.html_message)
+            results["logger_csv_frames_per_s"] = frames_rate(logger.csv_message)
+            logger.end()
+    return results
+
+
+def bench_change_filter(duration):
+    frames = _sample_frames() * 50
+    batch = ChangeFilter()
+    results = {"change_filter_batch_frames_per_s": len(frames) * rate(lambda: (batch.reset(), batch.filter_batch(frames)), duration)}
+
+    single = ChangeFilter()
+    index = [0]
+
+    def one():
+        single.is_changed(frames[index[0] % len(frames)])
+        index[0] += 1
+    results["change_filter_frames_per_s"] = rate(one, duration)
+    return results
+
+
+def bench_eeprom_monitor(duration):
+    if os.name != "posix":
+        return {}  # The simulated Arduino needs a pty
+    try:
+        from eeprom_monitor import EepromMonitor
+        from virtual_arduino import VirtualArduino
+    except ImportError:
+        return {}  # pyserial not installed
+    arduino = VirtualArduino(baud=None)  # Measures the host side, not the 38400 baud link
+    arduino.start()
+    monitor = EepromMonitor(arduino.port, gui=False)
+    try:
+        return {
+            "eeprom_full_polls_per_s": rate(monitor._poll_full, duration),
+            "eeprom_delta_polls_per_s": rate(monitor._poll_changes, duration),
+        }
+    finally:
+        monitor.stop()
+        arduino.stop()
+
+
+def compare(results, baseline, threshold):
+    """Returns a list of (name, baseline, current) for metrics that dropped more than `threshold`."""
+    regressions = []
+    for name, base in baseline.get("results", {}).items():
+        current = results.get(name)
+        if current is not None and base > 0 and current < base * (1.0 - threshold):
+            regressions.append((name, base, current))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="FordGDS benchmarks")
+    parser.add_argument("--duration", type=float, default=1.0, help="seconds per benchmark")
+    parser.add_argument("--output", help="write results JSON here")
+    parser.add_argument("--baseline", help="results JSON from a previous run to compare against")
+    parser.add_argument("--threshold", type=float, default=0.10, help="allowed fractional drop before failing")
+    args = parser.parse_args()
+
+    results = {}
+    results.update(bench_transport(args.duration))
+    results.update(bench_logger(args.duration))
+    results.update(bench_change_filter(args.duration))
+    results.update(bench_eeprom_monitor(args.duration))
+
+    for name, value in results.items():
+        print(f"{name:40s} {value:14.1f}")
+
+    report = {
+        "timestamp": time.strftime('%Y-%m-%d %H:%M:%S'),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "duration": args.duration,
+        "results": results,
+    }
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.threshold)
+        for name, base, current in regressions:
+            print(f"REGRESSION {name}: {base:.1f} -> {current:.1f} ({(current / base - 1) * 100:+.1f}%)")
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -4,18 +4,22 @@
 import can, time, os, csv
 import msvcrt  # Windows-only
 from datetime import datetime
-from GDS import FordGDS, GDSResult, GDSSession, logger
+from GDS import FordGDS, GDSResult, GDSSession, ChangeFilter, FrameRingBuffer, logger, codec
 from eeprom_monitor import EepromMonitor
 
 # Settings
 can_com_port = 'COM10'
 can_bitrate = 500000
+use_broker = False # True = share the CAN adapter through a running broker (python -m GDS.broker) so a monitor can watch the scan
 eeprom_mon_port = 'COM14'
+eeprom_gui = True # False = run the EEPROM monitor headless (no tkinter window), only the access / modify callbacks
 module_id = 'ACM'
 start_read_id = 0x0000
 start_write_id = 0x0000
 eeprom_activity_pause = 6 # Number of seconds to pause if eeprom activity detected
 max_attempts_each_id = 5 #Max attempts at each ID with no response received
+pre_trigger = 5.0 # Seconds of unfiltered bus traffic saved before EEPROM activity or a positive DID response
+post_trigger = 2.0 # Seconds saved after it
 
 
 # Track last seen data bytes for each CAN ID, only log when they change
@@ -34,31 +38,7 @@ id_masks = {
     0x500: b'\xFF\xFF\xFF\xFF\xFF\xFF\xFF\xFF',
     0x553: b'\xFF\xFF\xFF\xFF\xFF\xFF\xFF\xFF',
 }
-last_seen_data = {}
-
-def is_data_changed(msg):
-    global last_seen_data
-
-    can_id = msg.arbitration_id
-    current_data = msg.data
-    mask = id_masks.get(can_id, b'\xFF' * len(current_data))  # Default: all bits matter
-
-    last_data = last_seen_data.get(can_id)
-    if last_data is None:
-        last_seen_data[can_id] = current_data
-        return True
-    
-    # XOR to find changed bits
-    diff = bytes([a ^ b for a, b in zip(current_data, last_data)])
-
-    # Apply mask — zero out masked bits
-    relevant_change = bytes([d & m for d, m in zip(diff, mask)])
-
-    if all(b == 0 for b in relevant_change):
-        return False
-    
-    last_seen_data[can_id] = current_data
-    return True
+change_filter = ChangeFilter(id_masks)
 
 
 
@@ -72,7 +52,11 @@ csv_headers = [
 # Brute force check of all ID's:
 def brute_force_check():
     # Create CAN bus instance
-    bus = can.interface.Bus(interface='csscan_serial', channel=can_com_port, bitrate=can_bitrate)  # adjust as needed
+    if use_broker:
+        from GDS.broker import BrokerBus
+        bus = BrokerBus()
+    else:
+        bus = can.interface.Bus(interface='csscan_serial', channel=can_com_port, bitrate=can_bitrate)  # adjust as needed
 
     # Start Logging CAN data
     timestamp = datetime.now().strftime('%Y-%m-%d_%H-%M-%S')
@@ -89,8 +73,11 @@ def brute_force_check():
     csv_writer = csv.writer(csv_file)
     csv_writer.writerow(csv_headers)
 
+    # Keep the last few seconds of all traffic, dumped to brute_force_log/trigger_*.csv on events
+    ring_buffer = FrameRingBuffer(pre_trigger=pre_trigger, post_trigger=post_trigger, log_dir=log_dir)
+
     # EEPROM callbacks
-    eeprom_monitor = EepromMonitor(port=eeprom_mon_port)  # Change COM port as needed
+    eeprom_monitor = EepromMonitor(port=eeprom_mon_port, gui=eeprom_gui)  # Change COM port as needed
     eeprom_activity_detected = False # Used to delay DID scanning during EEPROM activity
     eeprom_pause_until = 0  
     def eeprom_access(addr, value):
@@ -98,6 +85,7 @@ def brute_force_check():
         logger.log(f"    EEPROM access: ADR 0x{addr:02X} = 0x{value:02X}")
         csv_writer.writerow(["", "", "", "", "", "Access", f"0x{addr:02X}", f"0x{value:02X}"])
         csv_file.flush()
+        ring_buffer.trigger(f"access_{addr:02X}")
         eeprom_pause_until = time.time() + eeprom_activity_pause
         eeprom_activity_detected = True
 
@@ -106,6 +94,7 @@ def brute_force_check():
         logger.log(f"    EEPROM write: ADR 0x{addr:02X} = 0x{value:02X}")
         csv_writer.writerow(["", "", "", "", "", "Modify", f"0x{addr:02X}", f"0x{value:02X}"])
         csv_file.flush()
+        ring_buffer.trigger(f"modify_{addr:02X}")
         eeprom_pause_until = time.time() + eeprom_activity_pause
         eeprom_activity_detected = True
 
@@ -114,10 +103,11 @@ def brute_force_check():
 
     # Start EEPROM visual debugger to monitor EEPROM state
     eeprom_monitor.start()
-    eeprom_monitor._clear_flags()
+    eeprom_monitor.clear_flags()
 
     # Start GDS Instance
     gds = FordGDS(bus)
+    gds.add_observer(ring_buffer.observer())  # Request / response frames are read inside gds.receive(), not by the loop below
 
     # Set Module
     gds.set_module(module_id)
@@ -125,6 +115,10 @@ def brute_force_check():
     # Init loop values
     read_did = start_read_id
     write_did = start_write_id
+
+    # Probe frames are built once, only the DID is patched for each attempt
+    read_request = codec.template(0x22, read_did)
+    write_request = codec.template(0x2E, write_did, [0x00])
     
     try:
         while True:
@@ -141,8 +135,9 @@ def brute_force_check():
             msg = bus.recv()
             if msg is None:
                 continue
+            ring_buffer.append(msg)
             is_gds = FordGDS.is_gds_message(msg)
-            if is_gds or is_data_changed(msg):
+            if is_gds or change_filter.is_changed(msg):
                 logger.log(msg)
 
             if time.time() < eeprom_pause_until:
@@ -150,14 +145,15 @@ def brute_force_check():
                 time.sleep(1)
                 continue  # Still waiting for EEPROM activity to settle
             elif eeprom_activity_detected:
-                eeprom_monitor._clear_flags()
+                eeprom_monitor.clear_flags()
                 eeprom_activity_detected = False
 
             # Move through CAN ID's and try each of them:
             if read_did <= 0xFFFF:
                 did_high = (read_did >> 8) & 0xFF
                 did_low = read_did & 0xFF
-                gds.send([0x03, 0x22, did_high, did_low])
+                codec.set_u16(read_request, 2, read_did)
+                gds.send(read_request)
 
                 response = gds.receive()
                 if response:
@@ -178,6 +174,7 @@ def brute_force_check():
                             f"{read_did:04X}", "Read", "", hex_out, "", "", "", ""
                         ])
                         csv_file.flush()
+                        ring_buffer.trigger(f"read_{read_did:04X}")
                         time.sleep(2)
                     read_did += 1
                     attempts_on_id = 0
@@ -189,7 +186,8 @@ def brute_force_check():
             elif write_did <= 0xFFFF:
                 did_high = (write_did >> 8) & 0xFF
                 did_low = write_did & 0xFF
-                gds.send([0x04, 0x2E, did_high, did_low, 0x00])
+                codec.set_u16(write_request, 2, write_did)
+                gds.send(write_request)
 
                 response = gds.receive()
                 if response:
@@ -207,6 +205,7 @@ def brute_force_check():
                             f"{write_did:04X}", "Write", "", "", "00", "", "", ""
                         ])
                         csv_file.flush()
+                        ring_buffer.trigger(f"write_{write_did:04X}")
                         time.sleep(2)
                     write_did += 1
                     attempts_on_id = 0
@@ -246,6 +245,10 @@ def brute_force_check():
             csv_file.close()
         except:
             pass
+        try:
+            ring_buffer.flush()
+        except:
+            pass
 
 if __name__ == "__main__":
     brute_force_check()
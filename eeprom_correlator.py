@@ -0,0 +1,280 @@
+# Copyright (c) 2025 MR MODULE PTY LTD
+# Licensed under the MIT License
+
+"""
+Lines up EEPROM activity with the GDS requests sent shortly before it, to find which DID / local ID /
+service writes which EEPROM address.
+
+Offline, from a logger CSV (or any python-can log) and an EEPROM timeline recorded by the monitor:
+
+    python eeprom_correlator.py logs/log_2025-04-18_17-18-00.csv logs/eeprom_2025-04-18_17-18-00.timeline
+
+Online, alongside a scan:
+
+    correlator = LiveCorrelator(window=3.0)
+    gds.add_observer(correlator)
+    correlator.attach(eeprom_monitor)
+    ...
+    correlator.print_report()
+
+Both streams are merged in time order: every EEPROM event is shared between the requests sent in the
+`window` seconds before it, so the cost is linear in the number of frames. More recent requests get a
+larger share, requests the ECU rejected as unsupported / out of range a much smaller one (a 1 kHz scan
+puts hundreds of requests in every window, almost all of them rejected). Per (request, address) pair
+the report gives:
+
+    share       - fraction of the address's events attributed to the request
+    repeat      - fraction of the request's transmissions that were followed by an event at the address
+    confidence  - share * repeat
+"""
+
+import time
+from collections import deque, namedtuple
+
+from GDS import codec
+from GDS.definitions import GDS_MODULE_ID, GDSResult
+from GDS.hooks import GDSObserver
+
+# Request bytes after the SID that identify what was asked for, eg. the DID of 0x22 / 0x2E
+_KEY_BYTES = {0x10: 1, 0x11: 1, 0x21: 1, 0x22: 2, 0x23: 4, 0x27: 1, 0x2E: 2, 0x2F: 2, 0x3B: 1, 0x3D: 4}
+
+# Responses that mean the ECU didn't act on the request, their share of an event is scaled by rejected_weight
+REJECTED_RESULTS = {
+    GDSResult.SERVICE_NOT_SUPPORTED.name,
+    GDSResult.INVALID_FORMAT.name,
+    GDSResult.REQUEST_OUT_OF_RANGE.name,
+}
+
+EepromEvent = namedtuple("EepromEvent", "time kind address old new")  # kind: "access", "modify" or "change"
+
+Correlation = namedtuple("Correlation", "key service module address kind hits requests share repeat confidence "
+                                        "first_time last_value result")
+
+
+class RequestEvent:
+    """One GDS request. result is filled in when its response is seen (None = no response)."""
+    __slots__ = ("time", "module", "sid", "key", "result")
+
+    def __init__(self, timestamp, module, sid, key):
+        self.time = timestamp
+        self.module = module
+        self.sid = sid
+        self.key = key
+        self.result = None
+
+
+def request_key(payload):
+    """'22 F190' style identifier of a request from its [SID, ...] bytes."""
+    sid = payload[0]
+    n = _KEY_BYTES.get(sid, 0)
+    if n and len(payload) > n:
+        return f"{sid:02X} " + "".join(f"{b:02X}" for b in payload[1:1 + n])
+    return f"{sid:02X}"
+
+
+def _result_text(response):
+    if response[0] == 0x7F and len(response) >= 3:
+        return GDSResult.from_nrc(response[2]).name
+    return GDSResult.SUCCESS.name
+
+
+def requests_from_frames(frames):
+    """
+    Yields a RequestEvent for every GDS request frame in a time ordered frame stream (eg. read_log()).
+    Single frames and first frames of segmented requests are used, responses fill in the result.
+    """
+    modules = {ids['req_id']: name for name, ids in reversed(list(GDS_MODULE_ID.items()))}
+    resp_ids = {ids['resp_id'] for ids in GDS_MODULE_ID.values()}
+    waiting = {}  # resp_id -> RequestEvent awaiting its response
+    for msg in frames:
+        can_id = msg.arbitration_id
+        data = msg.data
+        if not data:
+            continue
+        pci = data[0] >> 4
+        if can_id in modules:
+            if pci == 0x0 and len(data) > 1:
+                payload = data[1:1 + (data[0] & 0x0F)]
+            elif pci == 0x1 and len(data) > 2:
+                payload = data[2:]
+            else:
+                continue  # consecutive frames, flow control
+            event = RequestEvent(msg.timestamp, modules[can_id], payload[0], request_key(payload))
+            waiting[GDS_MODULE_ID[event.module]['resp_id']] = event
+            yield event
+        elif can_id in resp_ids and can_id in waiting:
+            if pci == 0x0 and len(data) > 1:
+                payload = data[1:1 + (data[0] & 0x0F)]
+            elif pci == 0x1 and len(data) > 2:
+                payload = data[2:]
+            else:
+                continue
+            if payload[0] == 0x7F and len(payload) >= 3 and payload[2] == 0x78:
+                continue  # response pending, the real one follows
+            waiting.pop(can_id).result = _result_text(payload)
+
+
+def events_from_timeline(timeline, clock="epoch"):
+    """
+    EepromEvents for every value change in an EepromTimeline. clock="local" converts the timestamps to
+    seconds since local midnight, the time base of logger CSVs.
+    """
+    for t, address, old, new in zip(timeline.times, timeline.addresses, timeline.old, timeline.new):
+        if clock == "local":
+            t = seconds_since_midnight(t)
+        yield EepromEvent(t, "change", address, old, new)
+
+
+def seconds_since_midnight(epoch):
+    local = time.localtime(epoch)
+    return local.tm_hour * 3600 + local.tm_min * 60 + local.tm_sec + (epoch % 1.0)
+
+
+class _Pair:
+    __slots__ = ("weight", "hits", "first_time", "last_value", "result", "last_request")
+
+    def __init__(self):
+        self.weight = 0.0
+        self.hits = 0
+        self.first_time = None
+        self.last_value = None
+        self.result = None
+        self.last_request = None
+
+
+def correlate(requests, events, window=3.0, max_candidates=1024, rejected_weight=0.01):
+    """
+    Time-window merge join of two time ordered streams (iterables, consumed once). Returns a list of
+    Correlation sorted by confidence. Each event is shared between at most `max_candidates` of the most
+    recent requests within `window` seconds before it, weighted by 1 - age / window (times
+    rejected_weight for REJECTED_RESULTS).
+    """
+    pending = deque()
+    request_counts = {}
+    event_counts = {}
+    pairs = {}  # (key, module, address, kind) -> _Pair
+    requests = iter(requests)
+    next_request = next(requests, None)
+
+    for event in events:
+        while next_request is not None and next_request.time <= event.time:
+            pending.append(next_request)
+            request_counts[(next_request.key, next_request.module)] = \
+                request_counts.get((next_request.key, next_request.module), 0) + 1
+            next_request = next(requests, None)
+        horizon = event.time - window
+        while pending and pending[0].time < horizon:
+            pending.popleft()
+        event_counts[(event.address, event.kind)] = event_counts.get((event.address, event.kind), 0) + 1
+        if not pending:
+            continue
+        candidates = list(pending)[-max_candidates:] if len(pending) > max_candidates else pending
+        weights = [(1.0 - (event.time - r.time) / window + 1e-6)
+                   * (rejected_weight if r.result in REJECTED_RESULTS else 1.0) for r in candidates]
+        total = sum(weights)
+        for request, weight in zip(candidates, weights):
+            pair_key = (request.key, request.module, event.address, event.kind)
+            pair = pairs.get(pair_key)
+            if pair is None:
+                pair = pairs[pair_key] = _Pair()
+                pair.first_time = event.time
+            pair.weight += weight / total
+            if pair.last_request is not request:  # One hit per transmission, however many events follow it
+                pair.hits += 1
+                pair.last_request = request
+            pair.last_value = event.new
+            pair.result = request.result
+
+    while next_request is not None:  # Remaining requests still count as transmissions
+        request_counts[(next_request.key, next_request.module)] = \
+            request_counts.get((next_request.key, next_request.module), 0) + 1
+        next_request = next(requests, None)
+
+    report = []
+    for (key, module, address, kind), pair in pairs.items():
+        sent = request_counts[(key, module)]
+        share = pair.weight / event_counts[(address, kind)]
+        repeat = min(1.0, pair.hits / sent)
+        service = codec.SERVICES.get(int(key[:2], 16))
+        report.append(Correlation(key, service.name if service else "", module, address, kind, pair.hits, sent,
+                                  share, repeat, share * repeat, pair.first_time, pair.last_value, pair.result))
+    report.sort(key=lambda c: c.confidence, reverse=True)
+    return report
+
+
+def print_report(report, limit=50):
+    print(f"{'Request':14s} {'Module':6s} {'Addr':>4s} {'Kind':6s} {'Hits':>5s} {'Sent':>5s} "
+          f"{'Share':>6s} {'Repeat':>6s} {'Conf':>6s} {'Value':>5s}  Result")
+    for c in report[:limit]:
+        value = f"{c.last_value:02X}" if c.last_value is not None else ""
+        print(f"{c.key:14s} {c.module:6s} {c.address:04X} {c.kind:6s} {c.hits:5d} {c.requests:5d} "
+              f"{c.share:6.2f} {c.repeat:6.2f} {c.confidence:6.2f} {value:>5s}  {c.result or ''}")
+
+
+class LiveCorrelator(GDSObserver):
+    """
+    Collects requests from a FordGDS (add_observer) and events from an EepromMonitor (attach) during a
+    session, report() correlates everything seen so far.
+    """
+    def __init__(self, window=3.0, max_candidates=1024, rejected_weight=0.01):
+        self.window = window
+        self.max_candidates = max_candidates
+        self.rejected_weight = rejected_weight
+        self.requests = []
+        self.events = []
+        self._waiting = {}  # FordGDS instance -> RequestEvent
+
+    def on_request_start(self, core, sid, data):
+        event = RequestEvent(time.time(), core.module, sid, request_key(data[1:1 + data[0]]))
+        self.requests.append(event)
+        self._waiting[core] = event
+
+    def on_response(self, core, response):
+        event = self._waiting.pop(core, None)
+        if event is not None:
+            event.result = _result_text(response[1:]) if response else GDSResult.NO_RESPONSE.name
+
+    def attach(self, monitor):
+        """Records the monitor's new accesses / modifications, keeping any on_poll callback already set."""
+        previous = monitor.on_poll
+
+        def on_poll(accessed, modified):
+            now = time.time()
+            self.events.extend(EepromEvent(now, "access", address, None, value) for address, value in accessed)
+            self.events.extend(EepromEvent(now, "modify", address, None, value) for address, value in modified)
+            if previous:
+                previous(accessed, modified)
+        monitor.on_poll = on_poll
+
+    def report(self):
+        return correlate(list(self.requests), list(self.events), self.window, self.max_candidates, self.rejected_weight)
+
+    def print_report(self, limit=50):
+        print_report(self.report(), limit)
+
+
+if __name__ == "__main__":
+    import argparse
+    import csv
+
+    from GDS.replay import read_log
+    from eeprom_timeline import EepromTimeline
+
+    parser = argparse.ArgumentParser(description="Correlate GDS requests in a log with EEPROM timeline changes")
+    parser.add_argument("log", help="logger CSV or python-can log with the GDS traffic")
+    parser.add_argument("timeline", help="EEPROM timeline recorded by the monitor")
+    parser.add_argument("--window", type=float, default=3.0, help="seconds before an EEPROM change to look back")
+    parser.add_argument("--output", help="CSV to write the full report to")
+    args = parser.parse_args()
+
+    # Logger CSVs only have the time of day, other log formats keep epoch timestamps
+    clock = "local" if args.log.lower().endswith(".csv") else "epoch"
+    report = correlate(requests_from_frames(read_log(args.log)),
+                       events_from_timeline(EepromTimeline.load(args.timeline), clock), args.window)
+    print_report(report)
+    if args.output:
+        with open(args.output, "w", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(Correlation._fields)
+            writer.writerows(report)
+        print(f"{len(report)} rows written to {args.output}")
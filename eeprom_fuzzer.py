@@ -0,0 +1,400 @@
+# Copyright (c) 2025 MR MODULE PTY LTD
+# Licensed under the MIT License
+
+"""
+Coverage-guided fuzzing of the write services 0x2E (DID), 0x2F (I/O control) and 0x3B (local ID).
+
+Instead of sweeping every identifier with one byte of zero, the fuzzer keeps a corpus of inputs that
+found something new and spends most of its requests mutating them:
+
+    - a result the identifier hadn't given before (other than out of range / not supported, eg. an
+      identifier that answers 0x12 Invalid Format exists, the length is wrong)
+    - an EEPROM address accessed or modified for the first time (EepromMonitor.on_poll)
+
+Mutations change the payload length (up to what the service allows in a single frame), the values
+(bit flips, increments, 00 / 01 / 7F / 80 / FF and values seen in the EEPROM) and, for 0x2F, the
+control type, and step to neighbouring identifiers. Inputs that keep finding nothing lose energy and are
+picked less often. A share of the requests (`explore`) keeps sweeping untried identifiers. Without a
+duration or request limit, run() returns once every identifier has been swept.
+
+When EEPROM activity shows up, every input sent in the `window` seconds before it is a suspect. The
+suspects are replayed in halves with the flags cleared in between until one reproduces the activity.
+
+    gds.set_module('PCM')
+    fuzzer = WriteFuzzer(gds, eeprom_monitor, path="fuzz_log/fuzz.csv")
+    fuzzer.run(duration=3600)
+    fuzzer.print_report()
+
+This writes arbitrary values to the module, only run it on one that can be recovered.
+"""
+
+import csv
+import random
+import time
+from collections import deque
+
+from GDS.definitions import GDSResult
+
+# Bytes after the identifier that fit in a single frame
+MAX_DATA = {0x2E: 4, 0x2F: 4, 0x3B: 5}  # 0x2F: control type + up to 3 bytes of control data
+IDENTIFIERS = {0x2E: range(0x10000), 0x2F: range(0x10000), 0x3B: range(0x100)}
+SWEEP_DATA = {0x2E: (0x00,), 0x2F: (0x00,), 0x3B: (0x00,)}  # 0x2F 00 = return control to ECU
+
+CONTROL_TYPES = (0x00, 0x01, 0x02, 0x03, 0x04, 0x05, 0x06, 0x07, 0x08)
+INTERESTING_VALUES = (0x00, 0x01, 0x02, 0x7F, 0x80, 0xFE, 0xFF)
+
+# Results that mean the identifier isn't there, they aren't coverage
+DEAD_RESULTS = {GDSResult.REQUEST_OUT_OF_RANGE, GDSResult.SERVICE_NOT_SUPPORTED}
+
+NEW_RESULT_ENERGY = 4.0
+NEW_ADDRESS_ENERGY = 16.0
+MIN_ENERGY = 0.05
+
+
+class FuzzInput:
+    __slots__ = ("sid", "ident", "data")
+
+    def __init__(self, sid, ident, data):
+        self.sid = sid
+        self.ident = ident
+        self.data = tuple(data)
+
+    def __str__(self):
+        width = 2 if self.sid == 0x3B else 4
+        return f"{self.sid:02X} {self.ident:0{width}X} " + " ".join(f"{b:02X}" for b in self.data)
+
+
+class _Entry:
+    """Corpus entry: an input that found new coverage and how much it is worth mutating further."""
+    __slots__ = ("input", "energy", "runs", "finds")
+
+    def __init__(self, fuzz_input, energy):
+        self.input = fuzz_input
+        self.energy = energy
+        self.runs = 0
+        self.finds = 1
+
+
+class WriteFuzzer:
+    """
+    gds         - FordGDS with the module (and session / security access, if needed) already set up
+    monitor     - started EepromMonitor, or None to use only the responses as coverage
+    services    - any of 0x2E, 0x2F, 0x3B
+    interval    - seconds between requests
+    explore     - share of requests that sweep untried identifiers once the corpus has entries
+    window      - seconds before EEPROM activity in which the responsible input was sent
+    settle      - seconds to wait for EEPROM activity when replaying suspects, a few monitor polls
+    """
+    def __init__(self, gds, monitor=None, services=(0x2E, 0x2F, 0x3B), identifiers=None, path=None,
+                 interval=0.02, explore=0.2, window=2.0, settle=1.0, retries=2, seed=None):
+        self.gds = gds
+        self.monitor = monitor
+        self.services = tuple(services)
+        self.identifiers = {**IDENTIFIERS, **(identifiers or {})}
+        self.path = path
+        self.interval = interval
+        self.explore = explore
+        self.window = window
+        self.settle = settle
+        self.retries = retries
+        self.random = random.Random(seed)
+
+        self.corpus = []
+        self._corpus_index = {}  # (sid, ident, data) -> _Entry
+        self.results = {}  # (sid, ident) -> set of GDSResult seen
+        self.addresses = {}  # (address, "access" | "modify") -> FuzzInput that first reached it
+        self.values = set(INTERESTING_VALUES)  # Dictionary for mutations, grows with EEPROM values seen
+        self.findings = []  # (time, FuzzInput, GDSResult, new addresses)
+        self.unsupported = set()  # Services the module doesn't support, dropped from the sweep
+        self.requests = 0
+        self.elapsed = 0.0
+        self.running = False
+        self.sweep_done = False
+        self._sweep = self._sweep_inputs()
+        self._sent = deque()  # (time, FuzzInput) within the last window
+        self._events = deque()  # (time, address, kind, value) from the monitor thread
+        if path:
+            with open(path, "w", newline="") as f:
+                csv.writer(f).writerow(["Time", "Service", "ID", "Data", "Result", "EEPROM Access", "EEPROM Modify"])
+        if monitor is not None:
+            self._attach(monitor)
+
+    def _attach(self, monitor):
+        previous = monitor.on_poll
+
+        def on_poll(accessed, modified):
+            now = time.time()
+            self._events.extend((now, address, "access", value) for address, value in accessed)
+            self._events.extend((now, address, "modify", value) for address, value in modified)
+            if previous:
+                previous(accessed, modified)
+        monitor.on_poll = on_poll
+
+    def coverage(self):
+        live = sum(len(results - DEAD_RESULTS) for results in self.results.values())
+        return live + len(self.addresses)
+
+    def run(self, duration=None, max_requests=None):
+        """
+        Fuzzes for `duration` seconds and / or `max_requests` requests. With neither, runs until every
+        identifier has been swept once, mutating the corpus in between.
+        """
+        start = time.time()
+        end = start + duration if duration else None
+        self.running = True
+        try:
+            while self.running:
+                if end is not None and time.time() >= end:
+                    break
+                if max_requests is not None and self.requests >= max_requests:
+                    break
+                if self.sweep_done and end is None and max_requests is None:
+                    break
+                parent, fuzz_input = self._next_input()
+                if fuzz_input is None:
+                    break  # Sweep finished and nothing in the corpus to mutate
+                result = self._execute(fuzz_input)
+                found = self._check_result(fuzz_input, result)
+                found = self._check_eeprom() or found
+                if parent is not None:
+                    parent.runs += 1
+                    if found:
+                        parent.finds += 1
+                    else:
+                        parent.energy = max(MIN_ENERGY, parent.energy * 0.9)
+                if self.interval:
+                    time.sleep(self.interval)
+            # Activity still on its way from the last requests
+            if self.monitor is not None and self._sent:
+                time.sleep(self.settle)
+                self._check_eeprom()
+        finally:
+            self.elapsed += time.time() - start
+            self.running = False
+
+    def stop(self):
+        self.running = False
+
+    # Scheduling
+
+    def _sweep_inputs(self):
+        iterators = [(sid, iter(self.identifiers[sid])) for sid in self.services]
+        while iterators:
+            for sid, identifiers in list(iterators):
+                ident = next(identifiers, None)
+                if ident is None or sid in self.unsupported:
+                    iterators.remove((sid, identifiers))
+                    continue
+                if (sid, ident) not in self.results:
+                    yield FuzzInput(sid, ident, SWEEP_DATA[sid])
+
+    def _next_input(self):
+        """(parent corpus entry or None, input to send next)"""
+        if not self.corpus or self.random.random() < self.explore:
+            fuzz_input = next(self._sweep, None)
+            if fuzz_input is None:
+                self.sweep_done = True
+            if fuzz_input is not None or not self.corpus:
+                return None, fuzz_input
+        parent = self.random.choices(self.corpus, weights=[e.energy for e in self.corpus])[0]
+        return parent, self._mutate(parent.input)
+
+    def _mutate(self, fuzz_input):
+        rand = self.random
+        sid, ident, data = fuzz_input.sid, fuzz_input.ident, list(fuzz_input.data)
+        for _ in range(rand.choice((1, 1, 1, 2, 3))):
+            op = rand.randrange(7)
+            if op == 0 and len(data) < MAX_DATA[sid]:  # Grow
+                data.insert(rand.randint(1 if sid == 0x2F else 0, len(data)), rand.choice(tuple(self.values)))
+            elif op == 1 and len(data) > (1 if sid == 0x2F else 0):  # Shrink
+                del data[rand.randrange(1 if sid == 0x2F else 0, len(data))]
+            elif op == 2 and sid == 0x2F:
+                data[0] = rand.choice(CONTROL_TYPES)
+            elif op == 3 and data:
+                i = rand.randrange(len(data))
+                data[i] ^= 1 << rand.randrange(8)
+            elif op == 4 and data:
+                i = rand.randrange(len(data))
+                data[i] = (data[i] + rand.choice((-1, 1))) & 0xFF
+            elif op == 5 and data:
+                data[rand.randrange(len(data))] = rand.choice(tuple(self.values))
+            elif op == 6:  # Neighbouring identifier, related functions are often numbered together
+                identifiers = self.identifiers[sid]
+                ident = min(max(ident + rand.choice((-1, 1)) * rand.randint(1, 16), identifiers[0]), identifiers[-1])
+            elif data:
+                data[rand.randrange(len(data))] = rand.randrange(0x100)
+        if sid == 0x2F and not data:
+            data = [0x00]
+        return FuzzInput(sid, ident, data)
+
+    # Execution and coverage
+
+    def _send(self, fuzz_input):
+        sid, ident, data = fuzz_input.sid, fuzz_input.ident, list(fuzz_input.data)
+        if sid == 0x2E:
+            return self.gds.write_data_by_identifier(ident, data)
+        if sid == 0x2F:
+            return self.gds.input_output_control_by_identifier(ident, data[0], data[1:])
+        return self.gds.write_data_by_local_identifier(ident, data)
+
+    def _execute(self, fuzz_input):
+        for _ in range(1 + self.retries):
+            result = self._send(fuzz_input)
+            self.requests += 1
+            if result != GDSResult.NO_RESPONSE:
+                break
+        now = time.time()
+        self._sent.append((now, fuzz_input))
+        while self._sent and self._sent[0][0] < now - self.window:
+            self._sent.popleft()
+        return result
+
+    def _check_result(self, fuzz_input, result):
+        if result == GDSResult.SERVICE_NOT_SUPPORTED:
+            self.unsupported.add(fuzz_input.sid)
+        seen = self.results.setdefault((fuzz_input.sid, fuzz_input.ident), set())
+        if result in seen:
+            return False
+        seen.add(result)
+        if result in DEAD_RESULTS:
+            return False
+        self._add(fuzz_input, NEW_RESULT_ENERGY)
+        self._record(fuzz_input, result, [])
+        return True
+
+    def _check_eeprom(self):
+        if not self._events:
+            return False
+        events = []
+        while self._events:
+            events.append(self._events.popleft())
+        new = [(address, kind, value) for _, address, kind, value in events if (address, kind) not in self.addresses]
+        if not new:
+            return False
+        suspects = [fuzz_input for t, fuzz_input in self._sent if t >= events[0][0] - self.window]
+        while new:
+            # Several inputs can be behind one poll's activity, find the one behind the first address and
+            # credit it with every other address it reaches on its own
+            address, kind, _ = new[0]
+            if len(suspects) > 1:
+                culprit = self._isolate(suspects, address, kind)
+                reached = self._replay([culprit]) if len(new) > 1 else None
+            else:
+                culprit = suspects[0] if suspects else None
+                reached = None
+            credited = [event for event in new if event is new[0] or reached is None or reached[event[1]] >> event[0] & 1]
+            new = [event for event in new if event not in credited]
+            for address, kind, value in credited:
+                self.addresses[(address, kind)] = culprit
+                self.values.add(value)
+            if culprit is not None:
+                self._add(culprit, NEW_ADDRESS_ENERGY * len(credited))
+                self._record(culprit, None, credited)
+        self._sent.clear()  # Already accounted for
+        return True
+
+    def _isolate(self, suspects, address, kind):
+        """Replays halves of the suspects with the flags cleared until one input reproduces the activity."""
+        while len(suspects) > 1:
+            half = len(suspects) // 2
+            for group in (suspects[half:], suspects[:half]):  # Most recent first
+                if self._replay(group)[kind] >> address & 1:
+                    suspects = group
+                    break
+            else:
+                return suspects[-1]  # Doesn't reproduce (eg. a one-off write), assume the most recent
+        return suspects[0]
+
+    def _replay(self, group):
+        """Sends the inputs again with the flags cleared first, returns the flag maps they set."""
+        self.monitor.clear_flags(wait=True)
+        time.sleep(self.settle)  # Let a poll pick up the cleared flags
+        for fuzz_input in group:
+            self._send(fuzz_input)
+            self.requests += 1
+            if self.interval:
+                time.sleep(self.interval)
+        time.sleep(self.settle)
+        self._events.clear()  # Nothing new can be reported for addresses already flagged once
+        return {"access": self.monitor.accessed_bits, "modify": self.monitor.modified_bits}
+
+    def _add(self, fuzz_input, energy):
+        key = (fuzz_input.sid, fuzz_input.ident, fuzz_input.data)
+        entry = self._corpus_index.get(key)
+        if entry is not None:
+            entry.energy += energy
+            entry.finds += 1
+            return
+        entry = self._corpus_index[key] = _Entry(fuzz_input, energy)
+        self.corpus.append(entry)
+
+    def _record(self, fuzz_input, result, new):
+        now = time.time()
+        self.findings.append((now, fuzz_input, result, new))
+        if not self.path:
+            return
+        accessed = " ".join(f"0x{address:02X}={value:02X}" for address, kind, value in new if kind == "access")
+        modified = " ".join(f"0x{address:02X}={value:02X}" for address, kind, value in new if kind == "modify")
+        width = 2 if fuzz_input.sid == 0x3B else 4
+        with open(self.path, "a", newline="") as f:
+            csv.writer(f).writerow([
+                time.strftime('%H:%M:%S', time.localtime(now)), f"{fuzz_input.sid:02X}",
+                f"{fuzz_input.ident:0{width}X}", " ".join(f"{b:02X}" for b in fuzz_input.data),
+                result.name if result is not None else "", accessed, modified,
+            ])
+
+    def print_report(self, limit=30):
+        print(f"{self.requests} requests in {self.elapsed:.1f} s, coverage {self.coverage()} "
+              f"({len(self.addresses)} EEPROM addresses), corpus {len(self.corpus)}")
+        live = {key: results - DEAD_RESULTS for key, results in self.results.items() if results - DEAD_RESULTS}
+        for (sid, ident), results in sorted(live.items()):
+            width = 2 if sid == 0x3B else 4
+            print(f"  {sid:02X} {ident:0{width}X}: " + ", ".join(sorted(r.name for r in results)))
+        for (address, kind), fuzz_input in sorted(self.addresses.items()):
+            print(f"  EEPROM 0x{address:02X} {kind:6s} <- {fuzz_input if fuzz_input is not None else '?'}")
+        print(f"{'Input':24s} {'Energy':>7s} {'Runs':>6s} {'Finds':>6s}")
+        for entry in sorted(self.corpus, key=lambda e: e.energy, reverse=True)[:limit]:
+            print(f"{str(entry.input):24s} {entry.energy:7.2f} {entry.runs:6d} {entry.finds:6d}")
+
+
+if __name__ == "__main__":
+    import argparse
+    import os
+
+    import can
+
+    from GDS import FordGDS
+    from eeprom_monitor import EepromMonitor
+
+    parser = argparse.ArgumentParser(description="Coverage-guided fuzzing of 0x2E / 0x2F / 0x3B writes")
+    parser.add_argument("module")
+    parser.add_argument("--interface", default="csscan_serial")
+    parser.add_argument("--channel", default="COM10")
+    parser.add_argument("--bitrate", type=int, default=500000)
+    parser.add_argument("--eeprom-port", help="EEPROM monitor serial port (default: responses only)")
+    parser.add_argument("--services", default="2E,2F,3B", help="comma separated SIDs")
+    parser.add_argument("--duration", type=float, help="seconds to run (default: until the sweep is done)")
+    parser.add_argument("--seed", type=int)
+    args = parser.parse_args()
+
+    os.makedirs("fuzz_log", exist_ok=True)
+    path = os.path.join("fuzz_log", f"fuzz_{time.strftime('%Y-%m-%d_%H-%M-%S')}.csv")
+    bus = can.interface.Bus(interface=args.interface, channel=args.channel, bitrate=args.bitrate)
+    gds = FordGDS(bus)
+    gds.set_module(args.module)
+    monitor = None
+    if args.eeprom_port:
+        monitor = EepromMonitor(port=args.eeprom_port, gui=False)
+        monitor.start()
+    fuzzer = WriteFuzzer(gds, monitor, services=[int(s, 16) for s in args.services.split(",")],
+                         path=path, seed=args.seed)
+    try:
+        fuzzer.run(duration=args.duration)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        fuzzer.print_report()
+        print(f"Findings written to {path}")
+        if monitor:
+            monitor.stop()
+        gds.close()
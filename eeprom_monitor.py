@@ -4,110 +4,478 @@
 import serial
 import threading
 import time
-import tkinter as tk
+from collections import deque
+
+tk = None  # tkinter, imported when the GUI starts so the monitor can run headless without it
 
 eeprom_mon_port = 'COM14'
 
+CMD_READ_BYTE = 0x10
 CMD_READ_ALL = 0x11
+CMD_WRITE_BYTE = 0x20
+CMD_WRITE_BLOCK = 0x21
 CMD_GET_ACCESSED = 0x30
 CMD_GET_MODIFIED = 0x31
+CMD_SAVE_DATA = 0x40
+CMD_LOAD_DATA = 0x41
+CMD_SAVE_FLAGS = 0x42
+CMD_LOAD_FLAGS = 0x43
+CMD_GET_CHANGES = 0x50
+CMD_SYNC_RESET = 0x51
 CMD_CLEAR_FLAGS = 0xA1
 CMD_RESET_ALL = 0xA0
 CMD_BOOT_FLAG = 0x0A
 
+# Delta sync (0x50) status bits, must match header.h
+SYNC_MORE = 0x01       # more changed addresses than fit in one response
+SYNC_MISMATCH = 0x02   # generation in the request isn't the Arduino's current one, nothing was returned
+SYNC_ACCESSED = 0x04   # accessed flag map gained bits since the last sync
+SYNC_MODIFIED = 0x08   # modified flag map gained bits since the last sync
+MAX_SYNC_CHANGES = 32  # (address, value) pairs per 0x50 response
+
+# Length byte of each frame the Arduino sends, used to resync on a corrupted stream
+RESPONSE_LENGTHS = {
+    CMD_READ_BYTE: 0x05,
+    CMD_READ_ALL: 0x24,
+    CMD_WRITE_BYTE: 0x05,
+    CMD_WRITE_BLOCK: 0x05,
+    CMD_GET_ACCESSED: 0x23,
+    CMD_GET_MODIFIED: 0x23,
+    CMD_SAVE_DATA: 0x03,
+    CMD_LOAD_DATA: 0x03,
+    CMD_SAVE_FLAGS: 0x03,
+    CMD_LOAD_FLAGS: 0x03,
+    CMD_RESET_ALL: 0x03,
+    CMD_CLEAR_FLAGS: 0x03,
+    CMD_BOOT_FLAG: 0x03,
+    CMD_SYNC_RESET: 0x04,
+}
+
+# Responses carrying a variable number of entries
+VARIABLE_LENGTHS = {
+    CMD_GET_CHANGES: range(0x05, 0x05 + 2 * MAX_SYNC_CHANGES + 1, 2),
+}
+
+# Older firmware seeds the flag map checksums with 0x24 while sending length 0x23
+LEGACY_CHECKSUM_CMDS = (CMD_GET_ACCESSED, CMD_GET_MODIFIED)
+
+
+def make_packet(cmd, payload=()):
+    """[cmd, len, *payload, checksum] where len counts the whole frame and checksum is the byte sum."""
+    packet = bytearray((cmd, len(payload) + 3))
+    packet += bytes(payload)
+    packet.append(sum(packet) & 0xFF)
+    return bytes(packet)
+
+
+def parse_frames(buffer):
+    """
+    Splits complete, checksum-verified frames off the front of `buffer`.
+    Returns (frames, bytes consumed, bad checksums). Unknown or corrupt bytes are skipped one at a time.
+    """
+    frames = []
+    bad = 0
+    pos = 0
+    end = len(buffer)
+    while end - pos >= 2:
+        cmd = buffer[pos]
+        length = buffer[pos + 1]
+        if RESPONSE_LENGTHS.get(cmd) != length and length not in VARIABLE_LENGTHS.get(cmd, ()):
+            pos += 1
+            continue
+        if end - pos < length:
+            break
+        checksum = sum(buffer[pos:pos + length - 1]) & 0xFF
+        received = buffer[pos + length - 1]
+        if received != checksum and not (cmd in LEGACY_CHECKSUM_CMDS and received == (checksum + 1) & 0xFF):
+            bad += 1
+            pos += 1
+            continue
+        frames.append(bytes(buffer[pos:pos + length]))
+        pos += length
+    return frames, pos, bad
+
+
+def iter_bits(value):
+    """Indexes of the set bits of an int, lowest first. Cost scales with the number of set bits, not the width."""
+    while value:
+        low = value & -value
+        yield low.bit_length() - 1
+        value ^= low
+
+
+class _Request:
+    __slots__ = ("deadline", "response", "event")
+
+    def __init__(self, deadline):
+        self.deadline = deadline
+        self.response = None
+        self.event = threading.Event()
+
+    def wait(self):
+        self.event.wait(max(0.0, self.deadline - time.monotonic()))
+        return self.response
+
+
 class EepromMonitor:
-    def __init__(self, port, baud=38400, poll_interval=0.5):
+    """
+    Polls the Arduino EEPROM emulator and reports addresses the ECU reads (on_accessed) or writes (on_modified).
+    With gui=False no window is created and tkinter isn't needed, the same commands are available as methods:
+
+        monitor = EepromMonitor("/dev/ttyUSB0", gui=False)
+        monitor.on_modified = lambda addr, value: print(f"{addr:02X} = {value:02X}")
+        monitor.start()
+        monitor.export_bin("before.bin")
+    """
+    def __init__(self, port, baud=38400, poll_interval=0.5, timeout=0.5, delta_sync=True, fast_poll_interval=0.05,
+                 gui=True, timeline=None):
         self.on_accessed = None
         self.on_modified = None
-        self.accessed_once = [False] * 256
-        self.modified_once = [False] * 256
+        self.on_poll = None  # on_poll(accessed, modified): lists of (address, value) newly flagged by one poll
+        self.on_boot = None  # Called from the reader thread when the Arduino reports a reset
+        # Flag maps as 256-bit ints, bit n = address n. *_once are the addresses already reported to callbacks
+        self.accessed_bits = 0
+        self.modified_bits = 0
+        self.accessed_once = 0
+        self.modified_once = 0
         self.port = port
         self.baud = baud
-        self.poll_interval = poll_interval
-
-        self.ser = serial.Serial(port, baudrate=baud, timeout=1)
+        self.poll_interval = poll_interval  # slowest poll rate, used while the EEPROM is idle
+        self.fast_poll_interval = fast_poll_interval  # poll rate after activity, backs off to poll_interval
+        self.timeout = timeout
+        self.delta_sync = delta_sync  # Use 0x50/0x51, turned off if the firmware doesn't answer them
+        self.checksum_errors = 0
+        self.timeouts = 0
+
+        self.ser = serial.Serial(port, baudrate=baud, timeout=0.1)
         self.ser.reset_input_buffer()  # Clear any incoming serial data
         self.eeprom = [0x00] * 256
         self.accessed = [False] * 256
         self.modified = [False] * 256
+        self.timeline = None  # EepromTimeline recording every value change, set once the first read is done
+        self._generation = None  # Arduino's delta sync generation, None until synced / after a mismatch
+        self._delta_confirmed = False
+        self._flags_stale = True
+        # Addresses whose value or flags changed since a view last redrew them, as a 256-bit int
+        self._dirty = (1 << 256) - 1
+        self._dirty_lock = threading.Lock()
+
+        # Outstanding requests per command, answered in the order they were sent
+        self._pending = {}
+        self._pending_lock = threading.Lock()
 
         self.running = True
-        self.gui_thread = threading.Thread(target=self._start_gui)
+        self.gui = EepromMonitorGUI(self) if gui else None
+        self.gui_thread = threading.Thread(target=self.gui.run) if gui else None
         self.poll_thread = threading.Thread(target=self._poll_loop)
+        self.reader_thread = threading.Thread(target=self._reader_loop, daemon=True)
+        self.reader_thread.start()
 
-        self._read_eeprom()  # Ensure full initialization
+        if not self.delta_sync:
+            self._read_eeprom()  # Ensure full initialization
+        else:
+            self._start_delta_sync()  # Full read too. If the board isn't up yet the poll loop tries again
+        if timeline is not None:
+            self.timeline = timeline
+            timeline.keyframe(time.time(), self.snapshot())
 
     def start(self):
-        self.gui_thread.start()
+        if self.gui_thread:
+            self.gui_thread.start()
         self.poll_thread.start()
 
     def stop(self):
         self.running = False
         if self.ser.is_open:
             self.ser.close()
-        try:
-            if self.root:
-                self.root.after(0, self.root.quit)  # Schedule quit on GUI thread
-        except AttributeError:
-            pass
+        if self.gui:
+            self.gui.close()
+
+    def read_eeprom(self):
+        """Reads all 256 bytes now and returns them, instead of waiting for the next poll."""
+        self._read_eeprom()
+        return bytes(self.eeprom)
+
+    def snapshot(self):
+        """EEPROM contents as last polled."""
+        return bytes(self.eeprom)
+
+    def take_dirty(self):
+        """Addresses whose value or flags changed since the previous call (bit n = address n), for redrawing views."""
+        with self._dirty_lock:
+            dirty, self._dirty = self._dirty, 0
+        return dirty
+
+    def _mark_dirty(self, bits):
+        with self._dirty_lock:
+            self._dirty |= bits
+
+    def write_byte(self, address, value, wait=False):
+        self._update_values([(address, value)])
+        return self._send_command(CMD_WRITE_BYTE, (address, value), wait)
+
+    def write_eeprom(self, data):
+        """Replaces all 256 bytes, returns True if every block was acknowledged."""
+        if len(data) != 256:
+            raise ValueError("EEPROM Monitor: data must be exactly 256 bytes")
+        self._update_values(enumerate(data))
+        # One block at a time, a 36 byte write leaves no room in the Arduino's receive buffer for another
+        return all([self._send_command(CMD_WRITE_BLOCK, [base_addr] + self.eeprom[base_addr:base_addr + 32], True)
+                    for base_addr in range(0, 256, 32)])
+
+    def export_bin(self, path):
+        with open(path, 'wb') as f:
+            f.write(self.snapshot())
+
+    def import_bin(self, path):
+        """Writes a 256 byte .bin to the emulated EEPROM and clears the access / modify flags."""
+        with open(path, 'rb') as f:
+            data = f.read()
+        if len(data) != 256:
+            raise ValueError("EEPROM Monitor: binary file must be exactly 256 bytes")
+        self.clear_flags()
+        return self.write_eeprom(data)
+
+    # Arduino commands, pass wait=True to block until the Arduino acknowledges (returns the response, or None)
+    def save_data(self, wait=False):
+        """Stores the emulated EEPROM in the Arduino's own EEPROM, loaded again at power up."""
+        return self._send_command(CMD_SAVE_DATA, (), wait)
+
+    def load_data(self, wait=False):
+        return self._send_command(CMD_LOAD_DATA, (), wait)
+
+    def save_flags(self, wait=False):
+        return self._send_command(CMD_SAVE_FLAGS, (), wait)
+
+    def load_flags(self, wait=False):
+        return self._send_command(CMD_LOAD_FLAGS, (), wait)
+
+    def reset_data(self, wait=False):
+        """Restores the default EEPROM contents compiled into the sketch and clears the flags."""
+        return self._send_command(CMD_RESET_ALL, (), wait)
+
+    def clear_flags(self, wait=False):
+        return self._send_command(CMD_CLEAR_FLAGS, (), wait)
 
     def _poll_loop(self):
+        interval = self.poll_interval
+        while self.running:
+            if self.delta_sync:
+                active = self._poll_changes()
+            else:
+                self._poll_full()
+                active = False
+            # Poll fast while the ECU is using the EEPROM, back off to poll_interval once it goes quiet
+            interval = self.fast_poll_interval if active else min(self.poll_interval, interval * 2)
+            time.sleep(interval)
+
+    def _poll_full(self):
+        # All ten requests go out back to back (38 bytes, within the Arduino's 64 byte receive buffer).
+        # EEPROM contents are applied first so flag callbacks see the current values.
+        flag_requests = self._request_flags()
+        eeprom_requests = self._request_eeprom()
+        self._apply_eeprom(eeprom_requests)
+        self._apply_flags(flag_requests)
+
+    def _poll_changes(self):
+        """Delta poll: applies the addresses changed since the last sync, returns True if there was any activity."""
+        accessed = modified = self._flags_stale
+        active = False
+        while self.running:
+            if self._generation is None:
+                synced = self._resync() if self._delta_confirmed else self._start_delta_sync()
+                if not synced:
+                    return False
+                accessed = modified = active = True
+                break
+            response = self._wait(self._request(CMD_GET_CHANGES, (self._generation,)))
+            status = response[3] if response else SYNC_MISMATCH
+            if status & SYNC_MISMATCH:
+                self._generation = None  # Lost response or Arduino reset, start again from a full read
+                continue
+            self._generation = response[2]
+            if self._update_values(zip(response[4:-1:2], response[5:-1:2])):
+                active = True
+            accessed |= bool(status & SYNC_ACCESSED)
+            modified |= bool(status & SYNC_MODIFIED)
+            if not status & SYNC_MORE:
+                break
+        if accessed or modified:
+            self._apply_flags(self._request_flags(accessed, modified))
+            active = True
+        return active
+
+    def _disable_delta_sync(self):
+        self.delta_sync = False  # Older firmware, poll everything instead
+        print("EEPROM Monitor: firmware has no delta sync (0x50/0x51), falling back to full reads")
+
+    def _start_delta_sync(self):
+        """
+        First resync. Delta sync is only turned off when the Arduino answers the block reads but not the
+        reset: an Uno reboots into its bootloader when the port is opened, and commands sent before the
+        sketch is running go unanswered. Returns True once synced.
+        """
+        for _ in range(2):  # A reset sent just before the sketch started can be lost while the reads aren't
+            synced = self._resync()
+            if synced is not False:
+                return bool(synced)
+        self._disable_delta_sync()
+        return False
+
+    def _resync(self):
+        """
+        Full read with a fresh generation. The sync reset goes first so anything changed during the
+        read is reported again by the next delta. Returns True when synced, False if the Arduino
+        answered the reads but not the reset, None if it answered nothing (not ready / disconnected).
+        """
+        reset = self._request(CMD_SYNC_RESET)
+        eeprom_requests = self._request_eeprom()
+        response = self._wait(reset)
+        answered = self._apply_eeprom(eeprom_requests)
+        if response is None:
+            return False if answered else None
+        self._generation = response[2]
+        self._delta_confirmed = True
+        self._flags_stale = True
+        return True
+
+    def _reader_loop(self):
+        buffer = bytearray()
         while self.running:
-            self._read_flags()
-            self._read_eeprom()
-            time.sleep(self.poll_interval)
+            try:
+                chunk = self.ser.read(self.ser.in_waiting or 1)
+            except (serial.SerialException, OSError, TypeError, AttributeError):
+                break  # Port closed by stop()
+            if not chunk:
+                continue
+            buffer += chunk
+            frames, consumed, bad = parse_frames(buffer)
+            if consumed:
+                del buffer[:consumed]
+            self.checksum_errors += bad
+            for frame in frames:
+                self._dispatch(frame)
+
+    def _dispatch(self, frame):
+        cmd = frame[0]
+        if cmd == CMD_BOOT_FLAG:
+            self._generation = None  # Contents and generation were reset, resync on the next poll
+            if self.on_boot:
+                self.on_boot()
+            return
+        now = time.monotonic()
+        with self._pending_lock:
+            queue = self._pending.get(cmd)
+            while queue and queue[0].deadline < now:
+                queue.popleft()  # Its requester already gave up
+            request = queue.popleft() if queue else None
+        if request:
+            request.response = frame
+            request.event.set()
+
+    def _request(self, cmd, payload=()):
+        """Sends a command and returns a _Request whose wait() gives the response frame or None on timeout."""
+        request = _Request(time.monotonic() + self.timeout)
+        with self._pending_lock:
+            self._pending.setdefault(cmd, deque()).append(request)
+            self.ser.write(make_packet(cmd, payload))
+        return request
+
+    def _send_command(self, cmd, payload=(), wait=False):
+        """
+        Sends a command, with wait returns its response (None on timeout). Queued for a response either way
+        so a late acknowledgement can't be taken by a later request.
+        """
+        request = self._request(cmd, payload)
+        return self._wait(request) if wait else None
+
+    def _wait(self, request):
+        response = request.wait()
+        if response is None:
+            self.timeouts += 1
+        return response
+
+    def _request_eeprom(self):
+        return [(base_addr, self._request(CMD_READ_ALL, (base_addr,))) for base_addr in range(0, 256, 32)]
+
+    def _apply_eeprom(self, requests):
+        """Stores the blocks that were answered, returns how many were."""
+        answered = 0
+        for base_addr, request in requests:
+            response = self._wait(request)
+            if response and response[2] == base_addr:
+                answered += 1
+                block = response[3:35]
+                if bytes(self.eeprom[base_addr:base_addr + 32]) != block:
+                    self._update_values(enumerate(block, base_addr))
+        return answered
 
     def _read_eeprom(self):
-        for base_addr in range(0, 256, 32):
-            packet = bytes([CMD_READ_ALL, 0x04, base_addr, (CMD_READ_ALL + 0x04 + base_addr) & 0xFF])
-            self.ser.write(packet)
-            response = self._read_response(36, CMD_READ_ALL)
-
-            if response:
-                reported_addr = response[2]
-                if reported_addr == base_addr:
-                    for i in range(32):
-                        self.eeprom[base_addr + i] = response[3 + i]
-            time.sleep(0.01)
+        self._apply_eeprom(self._request_eeprom())
+
+    def _update_values(self, values):
+        """Stores (address, value) pairs, marking them dirty and recording them on the timeline. Returns the number changed."""
+        eeprom = self.eeprom
+        changes = [(address, eeprom[address], value) for address, value in values if eeprom[address] != value]
+        if not changes:
+            return 0
+        changed = 0
+        for address, _, value in changes:
+            eeprom[address] = value
+            changed |= 1 << address
+        self._mark_dirty(changed)
+        if self.timeline is not None:
+            self.timeline.record(time.time(), changes)
+        return len(changes)
+
+    def _request_flags(self, accessed=True, modified=True):
+        self._flags_stale = False
+        return [(self._request(cmd), cmd) for cmd, wanted in
+                [(CMD_GET_ACCESSED, accessed), (CMD_GET_MODIFIED, modified)] if wanted]
+
+    def _apply_flags(self, requests):
+        polled = {CMD_GET_ACCESSED: [], CMD_GET_MODIFIED: []}
+        for request, cmd in requests:
+            response = self._wait(request)
+            if response is None:
+                self._flags_stale = True  # Ask again on the next delta poll
+                continue
+            bits = int.from_bytes(response[2:34], 'little')
+            if cmd == CMD_GET_ACCESSED:
+                previous, once, target, callback = self.accessed_bits, self.accessed_once, self.accessed, self.on_accessed
+            else:
+                previous, once, target, callback = self.modified_bits, self.modified_once, self.modified, self.on_modified
+            for i in iter_bits(bits ^ previous):
+                target[i] = bool(bits >> i & 1)
+            self._mark_dirty(bits ^ previous)
+            new = bits & ~previous & ~once  # Set since the last poll and never reported before
+            if cmd == CMD_GET_ACCESSED:
+                self.accessed_bits, self.accessed_once = bits, once | new
+            else:
+                self.modified_bits, self.modified_once = bits, once | new
+            events = polled[cmd]
+            for i in iter_bits(new):
+                events.append((i, self.eeprom[i]))
+                if callback:
+                    callback(i, self.eeprom[i])
+        if self.on_poll and (polled[CMD_GET_ACCESSED] or polled[CMD_GET_MODIFIED]):
+            self.on_poll(polled[CMD_GET_ACCESSED], polled[CMD_GET_MODIFIED])
 
     def _read_flags(self):
-        for cmd, target in [(CMD_GET_ACCESSED, self.accessed), (CMD_GET_MODIFIED, self.modified)]:
-            packet = bytes([cmd, 0x03, (cmd + 0x03) & 0xFF])
-            self.ser.write(packet)
-            response = self._read_response(35, cmd)
-            if response:
-                flags = response[2:34]
-                for i in range(256):
-                    byte_index = i // 8
-                    bit_index = i % 8
-                    new_state = bool(flags[byte_index] & (1 << bit_index))
-                    if new_state and not target[i]:
-                        if target is self.accessed and not self.accessed_once[i]:
-                            self.accessed_once[i] = True
-                            if self.on_accessed:
-                                self.on_accessed(i, self.eeprom[i])
-                        elif target is self.modified and not self.modified_once[i]:
-                            self.modified_once[i] = True
-                            if self.on_modified:
-                                self.on_modified(i, self.eeprom[i])
-                    target[i] = new_state
-            time.sleep(0.01)
-
-    def _read_response(self, expected_len, expected_cmd):
-        buffer = bytearray()
-        timeout = time.time() + 0.5
-        while time.time() < timeout:
-            if self.ser.in_waiting:
-                buffer += self.ser.read(self.ser.in_waiting)
-                while len(buffer) >= expected_len:
-                    if buffer[0] == expected_cmd and buffer[1] == expected_len:
-                        return buffer[:expected_len]
-                    else:
-                        buffer.pop(0)
-            time.sleep(0.005)
-        return None
-
-    def _start_gui(self):
+        self._apply_flags(self._request_flags())
+
+
+class EepromMonitorGUI:
+    """Tkinter window for an EepromMonitor: hex grid coloured by the accessed / modified flags, click a cell to edit."""
+    def __init__(self, monitor):
+        self.monitor = monitor
+        self.root = None
+        self.cells = []
+
+    def run(self):
+        global tk
+        import tkinter as tk
+
         self.root = tk.Tk()
         self.root.title("EEPROM Monitor")
 
@@ -135,10 +503,10 @@ class EepromMonitor:
         # Add control buttons below the table
         eeprom_frame = tk.LabelFrame(self.root, text="Persistent EEPROM")
         eeprom_frame.grid(row=18, rowspan=2, column=0, columnspan=5, pady=(10, 0), padx=5, sticky="w")
-        tk.Button(eeprom_frame, text="Save Data", command=self._save_data).grid(row=0, column=0, padx=5, pady=5)
-        tk.Button(eeprom_frame, text="Load Data", command=self._load_data).grid(row=1, column=0, padx=5, pady=5)
-        tk.Button(eeprom_frame, text="Save Flags", command=self._save_flags).grid(row=0, column=1, padx=5, pady=5)
-        tk.Button(eeprom_frame, text="Load Flags", command=self._load_flags).grid(row=1, column=1, padx=5, pady=5)
+        tk.Button(eeprom_frame, text="Save Data", command=self.monitor.save_data).grid(row=0, column=0, padx=5, pady=5)
+        tk.Button(eeprom_frame, text="Load Data", command=self.monitor.load_data).grid(row=1, column=0, padx=5, pady=5)
+        tk.Button(eeprom_frame, text="Save Flags", command=self.monitor.save_flags).grid(row=0, column=1, padx=5, pady=5)
+        tk.Button(eeprom_frame, text="Load Flags", command=self.monitor.load_flags).grid(row=1, column=1, padx=5, pady=5)
 
         # Legend label for colors
         legend_frame = tk.Frame(self.root)
@@ -159,8 +527,8 @@ class EepromMonitor:
         # Save / load etc.
         utility_frame = tk.Frame(self.root)
         utility_frame.grid(row=18, rowspan=2, column=12, columnspan=5, pady=(10, 0), padx=5, sticky="e")
-        tk.Button(utility_frame, text="Reset Data", command=self._reset_data).grid(row=0, column=0, padx=5, pady=5)
-        tk.Button(utility_frame, text="Clear Flags", command=self._clear_flags).grid(row=1, column=0, padx=5, pady=5)
+        tk.Button(utility_frame, text="Reset Data", command=self.monitor.reset_data).grid(row=0, column=0, padx=5, pady=5)
+        tk.Button(utility_frame, text="Clear Flags", command=self.monitor.clear_flags).grid(row=1, column=0, padx=5, pady=5)
         tk.Button(utility_frame, text="Save .bin", command=self._export_bin).grid(row=0, column=2, padx=5, pady=5)
         tk.Button(utility_frame, text="Load .bin", command=self._import_bin).grid(row=1, column=2, padx=5, pady=5)
 
@@ -168,70 +536,37 @@ class EepromMonitor:
         self.root.protocol("WM_DELETE_WINDOW", self._on_close)
         self.root.mainloop()
     
-    def _save_data(self):
-        packet = bytes([0x40, 0x03, (0x40 + 0x03) & 0xFF])
-        self.ser.write(packet)
-
-    def _save_flags(self):
-        packet = bytes([0x42, 0x03, (0x42 + 0x03) & 0xFF])
-        self.ser.write(packet)
-
-    def _load_data(self):
-        packet = bytes([0x41, 0x03, (0x41 + 0x03) & 0xFF])
-        self.ser.write(packet)
-
-    def _load_flags(self):
-        packet = bytes([0x43, 0x03, (0x43 + 0x03) & 0xFF])
-        self.ser.write(packet)
-
-    def _reset_data(self):
-        packet = bytes([0xA0, 0x03, (0xA0 + 0x03) & 0xFF])
-        self.ser.write(packet)
-
-    def _clear_flags(self):
-        packet = bytes([0xA1, 0x03, (0xA1 + 0x03) & 0xFF])
-        self.ser.write(packet)
+    def close(self):
+        if self.root:
+            self.root.after(0, self.root.quit)  # Schedule quit on GUI thread
 
     def _export_bin(self):
         from tkinter import filedialog
         file_path = filedialog.asksaveasfilename(defaultextension=".bin", filetypes=[("Binary files", "*.bin")])
         if file_path:
-            with open(file_path, 'wb') as f:
-                f.write(bytes(self.eeprom))
+            self.monitor.export_bin(file_path)
 
     def _import_bin(self):
         from tkinter import filedialog, messagebox
         file_path = filedialog.askopenfilename(filetypes=[("Binary files", "*.bin")])
         if file_path:
             try:
-                with open(file_path, 'rb') as f:
-                    data = f.read()
-                    if len(data) != 256:
-                        messagebox.showerror("Import Error", "Binary file must be exactly 256 bytes.")
-                        return
-                    self.eeprom = list(data)
-                    self._clear_flags()
-                    for base_addr in range(0, 256, 32):
-                        chunk = self.eeprom[base_addr:base_addr + 32]
-                        packet = bytes([0x21, 0x24, base_addr] + chunk + [(0x21 + 0x24 + base_addr + sum(chunk)) & 0xFF])
-                        self.ser.write(packet)
-                        time.sleep(0.01)
-                    self._update_gui()
+                self.monitor.import_bin(file_path)
+                self._draw_dirty()
             except Exception as e:
                 messagebox.showerror("Import Error", f"Failed to import file:{e}")
 
     def _on_close(self):
-        self._save_data()
-        self._save_flags()
-        time.sleep(0.1)  # Give time for serial writes to complete
-        self.stop()
+        self.monitor.save_data()
+        self.monitor.save_flags(wait=True)  # Answered in order, so both saves are done before the port closes
+        self.monitor.stop()
 
     def _edit_cell(self, index):
         label = self.cells[index]
         label.grid_remove()
 
         entry = tk.Entry(self.root, width=4, justify="center")
-        entry.insert(0, f"{self.eeprom[index]:02X}")
+        entry.insert(0, f"{self.monitor.eeprom[index]:02X}")
         entry.icursor(0)
         entry.config(fg="blue")
 
@@ -242,10 +577,10 @@ class EepromMonitor:
         def validate_hex_input(event=None):
             val = entry.get().upper()
             if len(val) == 2 and all(c in '0123456789ABCDEF' for c in val):
-                self.eeprom[index] = int(val, 16)
-                self.modified[index] = True
-                self._send_byte_to_arduino(index)
-                self._update_gui()
+                self.monitor.modified[index] = True
+                self.monitor.modified_bits |= 1 << index  # Shown until the next flag poll, the Arduino only flags I2C writes
+                self.monitor.write_byte(index, int(val, 16))
+                self._draw_dirty()
                 entry.destroy()
                 label.grid()
             elif len(val) > 2:
@@ -282,33 +617,31 @@ class EepromMonitor:
 
         entry.bind("<KeyPress>", lambda e: validate_char(e) or "break")
 
-    def _send_byte_to_arduino(self, index):
-        addr = index
-        val = self.eeprom[index]
-        packet = bytes([0x20, 0x05, addr, val, (0x20 + 0x05 + addr + val) & 0xFF])
-        self.ser.write(packet)
-
-    def _update_gui(self):
-        for i in range(256):
-            val = self.eeprom[i]
-            label = self.cells[i]
-            label.config(text=f"{val:02X}")
-
-            if self.modified[i]:
-                label.config(bg="red", fg="white")
-            elif self.accessed[i]:
-                label.config(bg="#FFD966", fg="black")
+    def _draw_dirty(self):
+        # Only cells the poll thread marked as changed, an idle tick costs one lock and an int swap
+        monitor = self.monitor
+        for i in iter_bits(monitor.take_dirty()):
+            if monitor.modified[i]:
+                bg, fg = "red", "white"
+            elif monitor.accessed[i]:
+                bg, fg = "#FFD966", "black"
             else:
-                label.config(bg="white", fg="black")
+                bg, fg = "white", "black"
+            self.cells[i].config(text=f"{monitor.eeprom[i]:02X}", bg=bg, fg=fg)
 
-        if self.running:
-            self.root.after(int(self.poll_interval * 1000), self._update_gui)
+    def _update_gui(self):
+        self._draw_dirty()
+        monitor = self.monitor
+        if monitor.running:
+            # Redraw at the fast poll rate, changes show up as soon as they're polled
+            self.root.after(int(min(monitor.poll_interval, monitor.fast_poll_interval) * 1000), self._update_gui)
 
 if __name__ == "__main__":
     try:
         monitor = EepromMonitor(port=eeprom_mon_port) 
         monitor.start()
     except serial.SerialException as e:
+        import tkinter as tk
         import tkinter.messagebox as messagebox
         root = tk.Tk()
         root.withdraw()  # Hide the main window
@@ -14,6 +14,9 @@ volatile uint8_t eeprom_data[256] = {0};
 
 uint8_t accessed_flags[32] = {0}; // Set if EEPROM address was read via I2C
 uint8_t modified_flags[32] = {0}; // Set if EEPROM address was written via I2C
+volatile uint8_t dirty_flags[32] = {0}; // Set if EEPROM address changed value since the last delta sync (0x50)
+volatile uint8_t flag_changes = 0;      // SYNC_ACCESSED / SYNC_MODIFIED if a flag map gained bits since the last sync
+uint8_t sync_generation = 0;            // Incremented by every delta sync, the host sends back the one it last saw
 
 bool address_received = false;  // Tracks whether we've received an address byte
 
@@ -29,8 +32,11 @@ void receiveEvent(int howMany) {
   // Remaining bytes are data to write
   while (howMany-- > 0) {
     uint8_t value = Wire.read();
+    uint8_t bit = 1 << (mem_address % 8);
+    if (eeprom_data[mem_address] != value) dirty_flags[mem_address / 8] |= bit;
     eeprom_data[mem_address] = value;
-    modified_flags[mem_address / 8] |= (1 << (mem_address % 8));
+    if (!(modified_flags[mem_address / 8] & bit)) flag_changes |= SYNC_MODIFIED;
+    modified_flags[mem_address / 8] |= bit;
     mem_address++;
   }
 }
@@ -38,7 +44,9 @@ void receiveEvent(int howMany) {
 // Called when master reads data from us
 void requestEvent() {
   uint8_t val = eeprom_data[mem_address];
-  accessed_flags[mem_address / 8] |= (1 << (mem_address % 8));
+  uint8_t bit = 1 << (mem_address % 8);
+  if (!(accessed_flags[mem_address / 8] & bit)) flag_changes |= SYNC_ACCESSED;
+  accessed_flags[mem_address / 8] |= bit;
   Wire.write(val);
   mem_address++;
 }
@@ -47,6 +55,8 @@ void resetEepromState() {
   memcpy((void*)eeprom_data, default_eeprom_data, 256); //Clear eeprom
   memset(accessed_flags, 0, 32); //Clear flags
   memset(modified_flags, 0, 32);
+  memset((void*)dirty_flags, 0xFF, 32); //Host needs every address again
+  flag_changes = SYNC_ACCESSED | SYNC_MODIFIED;
 }
 
 void setup() {
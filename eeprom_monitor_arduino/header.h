@@ -36,11 +36,21 @@
 #define EEPROM_ACCESSED_VALID_FLAG 321
 #define EEPROM_MODIFIED_VALID_FLAG 322
 
+// Delta sync (0x50) status bits, must match eeprom_monitor.py
+#define SYNC_MORE 0x01
+#define SYNC_MISMATCH 0x02
+#define SYNC_ACCESSED 0x04
+#define SYNC_MODIFIED 0x08
+#define MAX_SYNC_CHANGES 32  // (address, value) pairs per 0x50 response
+
 
 extern volatile uint8_t mem_address;
 extern volatile uint8_t eeprom_data[256];
 extern uint8_t accessed_flags[32];
 extern uint8_t modified_flags[32];
+extern volatile uint8_t dirty_flags[32];
+extern volatile uint8_t flag_changes;
+extern uint8_t sync_generation;
 
 extern void processSerialCommands();
 extern void resetEepromState();
@@ -93,7 +93,7 @@ void processSerialCommands() {
             else if (cmd == 0x30 && expected_len == 3) {
                 Serial.write((uint8_t)0x30);
                 Serial.write((uint8_t)0x23);
-                uint8_t sum = 0x30 + 0x24;
+                uint8_t sum = 0x30 + 0x23;
                 for (uint8_t i = 0; i < 32; i++) {
                     Serial.write(accessed_flags[i]);
                     sum += accessed_flags[i];
@@ -105,7 +105,7 @@ void processSerialCommands() {
             else if (cmd == 0x31 && expected_len == 3) {
                 Serial.write((uint8_t)0x31);
                 Serial.write((uint8_t)0x23);
-                uint8_t sum = 0x31 + 0x24;
+                uint8_t sum = 0x31 + 0x23;
                 for (uint8_t i = 0; i < 32; i++) {
                     Serial.write(modified_flags[i]);
                     sum += modified_flags[i];
@@ -129,6 +129,7 @@ void processSerialCommands() {
                 for (uint16_t i = 0; i < 256; i++) {
                     eeprom_data[i] = EEPROM.read(i);
                 }
+                memset((void*)dirty_flags, 0xFF, 32);
                 Serial.write((uint8_t)0x41);
                 Serial.write((uint8_t)0x03);
                 Serial.write((uint8_t)(0x41 + 0x03));
@@ -153,6 +154,7 @@ void processSerialCommands() {
                     accessed_flags[i] = EEPROM.read(256 + i);
                     modified_flags[i] = EEPROM.read(288 + i);
                 }
+                flag_changes = SYNC_ACCESSED | SYNC_MODIFIED;
                 Serial.write((uint8_t)0x43);
                 Serial.write((uint8_t)0x03);
                 Serial.write((uint8_t)(0x43 + 0x03));
@@ -170,10 +172,71 @@ void processSerialCommands() {
             else if (cmd == 0xA1 && expected_len == 3) {
                 memset(accessed_flags, 0, 32);
                 memset(modified_flags, 0, 32);
+                flag_changes = SYNC_ACCESSED | SYNC_MODIFIED;
                 Serial.write((uint8_t)0xA1);
                 Serial.write((uint8_t)0x03);
                 Serial.write((uint8_t)(0xA1 + 0x03));
             }
+
+            // === DELTA SYNC (0x50) ===
+            // Request carries the generation from the host's last sync. Returns the addresses that changed
+            // value since then as (address, value) pairs and clears them, or SYNC_MISMATCH if the host is
+            // out of step (lost response, Arduino reset), in which case the host does a full read + 0x51.
+            else if (cmd == 0x50 && expected_len == 4) {
+                uint8_t status = 0;
+                uint8_t count = 0;
+                uint8_t addrs[MAX_SYNC_CHANGES];
+                uint8_t vals[MAX_SYNC_CHANGES];
+                if (buffer[2] != sync_generation) {
+                    status = SYNC_MISMATCH;
+                } else {
+                    noInterrupts();  // dirty_flags / flag_changes are also written from the I2C callbacks
+                    for (uint8_t i = 0; i < 32 && !(status & SYNC_MORE); i++) {
+                        if (!dirty_flags[i]) continue;
+                        for (uint8_t b = 0; b < 8; b++) {
+                            if (!(dirty_flags[i] & (1 << b))) continue;
+                            if (count == MAX_SYNC_CHANGES) {
+                                status |= SYNC_MORE;
+                                break;
+                            }
+                            addrs[count] = i * 8 + b;
+                            vals[count] = eeprom_data[i * 8 + b];
+                            dirty_flags[i] &= ~(1 << b);
+                            count++;
+                        }
+                    }
+                    status |= flag_changes;
+                    flag_changes = 0;
+                    interrupts();
+                    sync_generation++;
+                }
+                uint8_t len = 5 + 2 * count;
+                uint8_t sum = 0x50 + len + sync_generation + status;
+                Serial.write((uint8_t)0x50);
+                Serial.write(len);
+                Serial.write(sync_generation);
+                Serial.write(status);
+                for (uint8_t i = 0; i < count; i++) {
+                    Serial.write(addrs[i]);
+                    Serial.write(vals[i]);
+                    sum += addrs[i] + vals[i];
+                }
+                Serial.write(sum);
+            }
+
+            // === DELTA SYNC RESET (0x51) ===
+            // Sent by the host before a full read, starts a new generation with nothing dirty
+            else if (cmd == 0x51 && expected_len == 3) {
+                noInterrupts();
+                memset((void*)dirty_flags, 0, 32);
+                flag_changes = 0;
+                interrupts();
+                sync_generation++;
+                Serial.write((uint8_t)0x51);
+                Serial.write((uint8_t)0x04);
+                Serial.write(sync_generation);
+                Serial.write((uint8_t)(0x51 + 0x04 + sync_generation));
+            }
     
             index = 0;
         }
@@ -0,0 +1,220 @@
+# Copyright (c) 2025 MR MODULE PTY LTD
+# Licensed under the MIT License
+
+"""
+History of the emulated 24C02 image over a session, recorded by EepromMonitor:
+
+    timeline = EepromTimeline(generate_timeline_filename())
+    monitor = EepromMonitor(eeprom_mon_port, timeline=timeline)
+    ...
+    timeline.image_at(t)                  # 256 byte image as it was at time t
+    timeline.export_bin("at_t.bin", t)
+    timeline.history(0x20)                # [(timestamp, old, new), ...] for one address
+
+The file is append-only: a header, then change records (all the bytes that changed in one poll) with a
+full keyframe every `keyframe_interval` changed bytes. An image is rebuilt from the last keyframe before
+the requested time (binary search) plus at most `keyframe_interval` changes.
+
+    python eeprom_timeline.py logs/eeprom_2025-04-18_17-18-00.timeline --at 12.5 --output image.bin
+    python eeprom_timeline.py logs/eeprom_2025-04-18_17-18-00.timeline --history 0x20
+"""
+
+import os
+import struct
+import threading
+import time
+from array import array
+from bisect import bisect_right
+
+MAGIC = b"EEPTL\x00\x01\x00"
+
+RECORD_CHANGES = 0x01   # <B d H> then count * (address, old, new)
+RECORD_KEYFRAME = 0x02  # <B d> then the 256 byte image
+
+_CHANGES = struct.Struct("<BdH")
+_KEYFRAME = struct.Struct("<Bd")
+
+
+def generate_timeline_filename(log_dir="logs"):
+    datestamp = time.strftime('%Y-%m-%d_%H-%M-%S')
+    os.makedirs(log_dir, exist_ok=True)
+    return os.path.join(log_dir, f"eeprom_{datestamp}.timeline")
+
+
+class EepromTimeline:
+    def __init__(self, path=None, keyframe_interval=1024):
+        self.path = path
+        self.keyframe_interval = keyframe_interval
+        # One entry per changed byte, in time order
+        self.times = array('d')
+        self.addresses = array('B')
+        self.old = array('B')
+        self.new = array('B')
+        # Keyframes: time, index of the first change after it, image
+        self.keyframe_times = array('d')
+        self.keyframe_index = array('I')
+        self.keyframes = []
+        self._image = None
+        self._since_keyframe = 0
+        self._file = None
+        self._lock = threading.Lock()  # Poll thread and GUI edits both record
+        if path:
+            self._file = open(path, "wb")
+            self._file.write(MAGIC)
+            self._file.flush()
+
+    @classmethod
+    def load(cls, path):
+        """Reads a timeline file (a truncated last record, eg. from a crash, is ignored). Read-only."""
+        timeline = cls()
+        with open(path, "rb") as f:
+            data = f.read()
+        if data[:len(MAGIC)] != MAGIC:
+            raise ValueError(f"EEPROM Timeline: {path} is not a timeline file")
+        pos = len(MAGIC)
+        while pos < len(data):
+            kind = data[pos]
+            if kind == RECORD_CHANGES:
+                if pos + _CHANGES.size > len(data):
+                    break
+                _, timestamp, count = _CHANGES.unpack_from(data, pos)
+                end = pos + _CHANGES.size + 3 * count
+                if end > len(data):
+                    break
+                if timeline._image is None:
+                    raise ValueError(f"EEPROM Timeline: {path} has changes before its first keyframe")
+                body = data[pos + _CHANGES.size:end]
+                timeline._apply(timestamp, zip(body[0::3], body[1::3], body[2::3]))
+            elif kind == RECORD_KEYFRAME:
+                end = pos + _KEYFRAME.size + 256
+                if end > len(data):
+                    break
+                _, timestamp = _KEYFRAME.unpack_from(data, pos)
+                timeline._add_keyframe(timestamp, data[pos + _KEYFRAME.size:end])
+            else:
+                raise ValueError(f"EEPROM Timeline: unknown record 0x{kind:02X} at offset {pos}")
+            pos = end
+        return timeline
+
+    def close(self):
+        if self._file:
+            self._file.close()
+            self._file = None
+
+    def __len__(self):
+        return len(self.times)
+
+    @property
+    def start(self):
+        return self.keyframe_times[0] if self.keyframe_times else None
+
+    @property
+    def end(self):
+        last = [times[-1] for times in (self.times, self.keyframe_times) if times]
+        return max(last) if last else None
+
+    def keyframe(self, timestamp, image):
+        """Records the full image, required before the first change."""
+        image = bytes(image)
+        if len(image) != 256:
+            raise ValueError("EEPROM Timeline: image must be exactly 256 bytes")
+        with self._lock:
+            self._add_keyframe(timestamp, image)
+            if self._file:
+                self._file.write(_KEYFRAME.pack(RECORD_KEYFRAME, timestamp) + image)
+                self._file.flush()
+
+    def record(self, timestamp, changes):
+        """Records the bytes that changed in one poll as (address, old, new)."""
+        if self._image is None:
+            raise ValueError("EEPROM Timeline: a keyframe is needed before the first change")
+        changes = list(changes)
+        if not changes:
+            return
+        with self._lock:
+            self._apply(timestamp, changes)
+            if self._file:
+                body = bytes(value for change in changes for value in change)
+                self._file.write(_CHANGES.pack(RECORD_CHANGES, timestamp, len(changes)) + body)
+                self._file.flush()
+            due = self._since_keyframe >= self.keyframe_interval
+        if due:
+            self.keyframe(timestamp, self._image)
+
+    def _add_keyframe(self, timestamp, image):
+        self.keyframe_times.append(timestamp)
+        self.keyframe_index.append(len(self.times))
+        self.keyframes.append(bytes(image))
+        self._image = bytearray(image)
+        self._since_keyframe = 0
+
+    def _apply(self, timestamp, changes):
+        image = self._image
+        count = 0
+        for address, old, new in changes:
+            self.times.append(timestamp)
+            self.addresses.append(address)
+            self.old.append(old)
+            self.new.append(new)
+            image[address] = new
+            count += 1
+        self._since_keyframe += count
+
+    def image_at(self, timestamp):
+        """The 256 byte image as it was at `timestamp` (changes recorded at exactly that time included)."""
+        k = bisect_right(self.keyframe_times, timestamp) - 1
+        if k < 0:
+            raise ValueError("EEPROM Timeline: no keyframe at or before that time")
+        image = bytearray(self.keyframes[k])
+        end = bisect_right(self.times, timestamp, lo=self.keyframe_index[k])
+        for i in range(self.keyframe_index[k], end):
+            image[self.addresses[i]] = self.new[i]
+        return bytes(image)
+
+    def export_bin(self, path, timestamp):
+        with open(path, "wb") as f:
+            f.write(self.image_at(timestamp))
+
+    def history(self, address):
+        """(timestamp, old, new) of every change to one address."""
+        return [(self.times[i], self.old[i], self.new[i])
+                for i in range(len(self.times)) if self.addresses[i] == address]
+
+    def changed_addresses(self):
+        """{address: number of changes}"""
+        counts = {}
+        for address in self.addresses:
+            counts[address] = counts.get(address, 0) + 1
+        return counts
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Inspect an EEPROM monitor timeline")
+    parser.add_argument("path")
+    parser.add_argument("--at", type=float, help="seconds from the start of the session")
+    parser.add_argument("--output", help=".bin to write the image at --at to (default: print it)")
+    parser.add_argument("--history", type=lambda value: int(value, 0), help="address to list the changes of")
+    args = parser.parse_args()
+
+    timeline = EepromTimeline.load(args.path)
+    if timeline.start is None:
+        raise SystemExit("Empty timeline")
+    print(f"{len(timeline)} changed bytes in {len(timeline.keyframes)} keyframes over {timeline.end - timeline.start:.1f} s")
+
+    if args.history is not None:
+        for timestamp, old, new in timeline.history(args.history):
+            print(f"{timestamp - timeline.start:10.3f}  0x{args.history:02X}: {old:02X} -> {new:02X}")
+    elif args.at is not None:
+        image = timeline.image_at(timeline.start + args.at)
+        if args.output:
+            with open(args.output, "wb") as f:
+                f.write(image)
+            print(f"Image at {args.at:.3f} s written to {args.output}")
+        else:
+            for row in range(0, 256, 16):
+                print(f"{row:02X}: " + " ".join(f"{value:02X}" for value in image[row:row + 16]))
+    else:
+        for address, count in sorted(timeline.changed_addresses().items()):
+            print(f"0x{address:02X}: {count} changes")
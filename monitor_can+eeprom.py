@@ -3,12 +3,20 @@
 
 import can
 import msvcrt  # Windows-only
-from GDS import FordGDS, logger  # You may need to implement this if not already
+from GDS import FordGDS, ChangeFilter, FrameRingBuffer, logger  # You may need to implement this if not already
 from eeprom_monitor import EepromMonitor
+from eeprom_timeline import EepromTimeline, generate_timeline_filename
 
 can_com_port = 'COM10'
 can_bitrate = 500000
+use_broker = False # True = share the CAN adapter through a running broker (python -m GDS.broker) instead of opening it
+replay_file = None # eg. 'logs/log_2025-04-18_17-18-00.csv' to monitor a recorded capture instead of the live bus
 eeprom_mon_port = 'COM14'
+eeprom_gui = True # False = run the EEPROM monitor headless (no tkinter window)
+eeprom_timeline = True # Record every EEPROM value change to logs/eeprom_*.timeline (python eeprom_timeline.py to inspect)
+display_mode = 'dashboard' # 'dashboard' = one row per ID updated in place, 'scroll' = one line per logged frame
+pre_trigger = 5.0 # Seconds of unfiltered bus traffic saved before an EEPROM modify event
+post_trigger = 2.0 # Seconds saved after it
 
 id_masks = {
     0x200: b'\xFF\xFF\xFF\xFF\xFF\xFF\xFF\xFF',
@@ -26,44 +34,34 @@ id_masks = {
     0x553: b'\xFF\xFF\xFF\xFF\xFF\xFF\xFF\xFF',
 }
 
-# Track last seen data bytes for each CAN ID
-last_seen_data = {}
-
-def is_data_changed(msg):
-    global last_seen_data
-
-    can_id = msg.arbitration_id
-    current_data = msg.data
-    mask = id_masks.get(can_id, b'\xFF' * len(current_data))  # Default: all bits matter
-
-    last_data = last_seen_data.get(can_id)
-    if last_data is None:
-        last_seen_data[can_id] = current_data
-        return True
-    
-    # XOR to find changed bits
-    diff = bytes([a ^ b for a, b in zip(current_data, last_data)])
-
-    # Apply mask — zero out masked bits
-    relevant_change = bytes([d & m for d, m in zip(diff, mask)])
-
-    if all(b == 0 for b in relevant_change):
-        return False
-    
-    last_seen_data[can_id] = current_data
-    return True
+change_filter = ChangeFilter(id_masks)  # Only log broadcast frames when the masked bits change
 
 
 def monitor():
     # Create CAN bus instance (adjust channel/interface if needed)
-    bus = can.interface.Bus(interface='csscan_serial', channel=can_com_port, bitrate=can_bitrate)  # adjust as needed
+    if replay_file:
+        from GDS.replay import LogReplayer
+        bus = can.interface.Bus(interface='virtual', channel='replay')
+        replayer = LogReplayer(replay_file, channel='replay')
+        replayer.start()
+    elif use_broker:
+        from GDS.broker import BrokerBus
+        bus = BrokerBus()
+    else:
+        bus = can.interface.Bus(interface='csscan_serial', channel=can_com_port, bitrate=can_bitrate)  # adjust as needed
 
     # Create HTML log file
     logfile = open(logger.generate_log_filename(), "w")
     logger.begin(logfile)
+    logger.set_display_mode(display_mode)
 
     # Start EEPROM visual debugger
-    eeprom_monitor = EepromMonitor(port=eeprom_mon_port)  # Change COM port as needed
+    timeline = EepromTimeline(generate_timeline_filename()) if eeprom_timeline else None
+    eeprom_monitor = EepromMonitor(port=eeprom_mon_port, gui=eeprom_gui, timeline=timeline)  # Change COM port as needed
+
+    # Keep the last few seconds of all traffic, dumped to logs/trigger_*.csv when the EEPROM is modified
+    ring_buffer = FrameRingBuffer(pre_trigger=pre_trigger, post_trigger=post_trigger)
+    eeprom_monitor.on_modified = lambda addr, value: ring_buffer.trigger(f"eeprom_{addr:02X}")
     eeprom_monitor.start()
 
     try:
@@ -78,14 +76,22 @@ def monitor():
             if msg is None:
                 continue
 
+            logger.track(msg)
+            ring_buffer.append(msg)
             is_gds = FordGDS.is_gds_message(msg)
 
-            if is_gds or is_data_changed(msg):
+            if is_gds or change_filter.is_changed(msg):
                 logger.log(msg)
 
     finally:
+        if replay_file:
+            replayer.close()
         bus.shutdown()
         eeprom_monitor.stop()
+        if timeline:
+            timeline.close()
+        ring_buffer.flush()
+        logger.end()
 
 if __name__ == "__main__":
     monitor()
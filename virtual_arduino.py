@@ -0,0 +1,355 @@
+# Copyright (c) 2025 MR MODULE PTY LTD
+# Licensed under the MIT License
+
+"""
+Simulated eeprom_monitor_arduino board for testing and benchmarking eeprom_monitor.py without hardware.
+Linux / macOS only: the board is served on a pseudo-terminal that EepromMonitor opens like a serial port.
+
+Implements the serial protocol of eeprom_monitor_arduino/serial.ino (0x10/0x11 reads, 0x20/0x21 writes,
+0x30/0x31 flag maps, 0x40-0x43 save / load, 0x50/0x51 delta sync, 0xA0/0xA1 reset) and the I2C side the
+ECU would use, so access / modify activity can be scripted:
+
+    arduino = VirtualArduino(baud=38400)
+    arduino.start()
+    monitor = EepromMonitor(arduino.port, gui=False)
+    monitor.start()
+    arduino.i2c_write(0x20, [0x01, 0x02])                        # ECU writes two bytes
+    arduino.play([(0.5, "read", 0x00, 16), (0.1, "write", 0x40, [0xAA])])
+
+or standalone, printing the port to point eeprom_mon_port at:
+
+    python virtual_arduino.py --activity 2
+"""
+
+import os
+import random
+import re
+import select
+import threading
+import time
+import tty
+
+HEADER = os.path.join(os.path.dirname(os.path.abspath(__file__)), "eeprom_monitor_arduino", "header.h")
+
+# Internal EEPROM layout, as in header.h
+DATA_VALID_FLAG = 320
+ACCESSED_VALID_FLAG = 321
+MODIFIED_VALID_FLAG = 322
+FLAG_VALUE = 0xA5
+
+SYNC_MORE = 0x01
+SYNC_MISMATCH = 0x02
+SYNC_ACCESSED = 0x04
+SYNC_MODIFIED = 0x08
+MAX_SYNC_CHANGES = 32
+
+
+def sketch_default_data(path=HEADER):
+    """EEPROM_DATA from the sketch's header.h, what the board restores on 0xA0. 0xFF * 256 if it can't be read."""
+    try:
+        with open(path) as f:
+            block = re.search(r"#define EEPROM_DATA \{(.*?)\}", f.read(), re.S).group(1)
+        data = bytes(int(value, 16) for value in re.findall(r"0x([0-9A-Fa-f]{2})", block))
+        if len(data) == 256:
+            return data
+    except (OSError, AttributeError):
+        pass
+    return bytes([0xFF]) * 256
+
+
+class VirtualArduino:
+    """
+    data            - default 256 byte EEPROM contents restored by 0xA0 (default: EEPROM_DATA from header.h)
+    baud            - line rate to imitate: each command and its response take 10 bits per byte (None = no delay)
+    latency         - extra seconds between a complete command and its response
+    delta_sync      - answer 0x50/0x51, False behaves like firmware without them
+    legacy_checksum - seed the 0x30/0x31 checksums with 0x24 like older firmware
+    """
+    def __init__(self, data=None, baud=38400, latency=0.0, delta_sync=True, legacy_checksum=False):
+        self.default_data = bytes(data) if data is not None else sketch_default_data()
+        if len(self.default_data) != 256:
+            raise ValueError("Virtual Arduino: data must be exactly 256 bytes")
+        self.byte_time = 10.0 / baud if baud else 0.0
+        self.latency = latency
+        self.delta_sync = delta_sync
+        self.legacy_checksum = legacy_checksum
+
+        self.internal = bytearray([0xFF]) * 1024  # ATmega328 EEPROM, 0x40-0x43 save / load here
+        self.lock = threading.Lock()  # Serial commands vs scripted I2C activity, like noInterrupts()
+        self.generation = 0
+        self.mem_address = 0
+        self._reset_state()
+
+        self._master, self._slave = os.openpty()
+        tty.setraw(self._master)
+        tty.setraw(self._slave)
+        self.port = os.ttyname(self._slave)  # Kept open here so the pty survives the monitor reconnecting
+
+        self.commands = 0
+        self.bad_checksums = 0
+        self.running = False
+        self._stopped = threading.Event()
+        self._thread = None
+        self._player = None
+
+    def _reset_state(self):
+        # resetEepromState()
+        self.eeprom = bytearray(self.default_data)
+        self.accessed = bytearray(32)
+        self.modified = bytearray(32)
+        self.dirty = bytearray([0xFF]) * 32
+        self.flag_changes = SYNC_ACCESSED | SYNC_MODIFIED
+
+    def start(self):
+        self.running = True
+        self._stopped.clear()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        self._write(bytes([0x0A, 0x03, 0x0D]))  # Reset notification sent at the end of setup()
+
+    def stop(self):
+        self.running = False
+        self._stopped.set()
+        if self._player:
+            self._player.join()
+            self._player = None
+        if self._thread:
+            self._thread.join()
+            self._thread = None
+        os.close(self._master)
+        os.close(self._slave)
+
+    def reboot(self):
+        """Power cycle: setup() runs again, loading whatever was saved with 0x40 / 0x42."""
+        with self.lock:
+            self._reset_state()
+            self.generation = 0
+            self.mem_address = 0
+            if self.internal[DATA_VALID_FLAG] == FLAG_VALUE:
+                self.eeprom[:] = self.internal[0:256]
+            if self.internal[ACCESSED_VALID_FLAG] == FLAG_VALUE:
+                self.accessed[:] = self.internal[256:288]
+            if self.internal[MODIFIED_VALID_FLAG] == FLAG_VALUE:
+                self.modified[:] = self.internal[288:320]
+        self._write(bytes([0x0A, 0x03, 0x0D]))
+
+    # I2C side (what the ECU does)
+
+    def i2c_write(self, address, data):
+        """receiveEvent(): writes bytes from `address` with the 8-bit pointer wrapping like the 24C02."""
+        with self.lock:
+            self.mem_address = address & 0xFF
+            for value in data:
+                a = self.mem_address
+                bit = 1 << (a % 8)
+                if self.eeprom[a] != value:
+                    self.dirty[a // 8] |= bit
+                self.eeprom[a] = value
+                if not self.modified[a // 8] & bit:
+                    self.flag_changes |= SYNC_MODIFIED
+                self.modified[a // 8] |= bit
+                self.mem_address = (a + 1) & 0xFF
+
+    def i2c_read(self, address, count=1):
+        """Sets the pointer then requestEvent() `count` times, returns the bytes read."""
+        with self.lock:
+            self.mem_address = address & 0xFF
+            values = bytearray()
+            for _ in range(count):
+                a = self.mem_address
+                bit = 1 << (a % 8)
+                if not self.accessed[a // 8] & bit:
+                    self.flag_changes |= SYNC_ACCESSED
+                self.accessed[a // 8] |= bit
+                values.append(self.eeprom[a])
+                self.mem_address = (a + 1) & 0xFF
+        return bytes(values)
+
+    def play(self, script, loop=False):
+        """
+        Runs I2C activity in the background. `script` is a list of steps, each waiting `delay` seconds first:
+            (delay, "read", address, count)
+            (delay, "write", address, [bytes])
+            (delay, "reboot")
+        """
+        def run():
+            while self.running:
+                for step in script:
+                    if self._stopped.wait(step[0]):
+                        return
+                    if step[1] == "read":
+                        self.i2c_read(step[2], step[3])
+                    elif step[1] == "write":
+                        self.i2c_write(step[2], step[3])
+                    elif step[1] == "reboot":
+                        self.reboot()
+                    else:
+                        raise ValueError(f"Virtual Arduino: unknown script step {step!r}")
+                if not loop:
+                    return
+        self._player = threading.Thread(target=run, daemon=True)
+        self._player.start()
+
+    def random_activity(self, rate, write_ratio=0.2, seed=None):
+        """Background ECU activity: `rate` random reads / writes per second, returns the script being played."""
+        rng = random.Random(seed)
+        script = []
+        for _ in range(1000):
+            delay = rng.expovariate(rate)
+            address = rng.randrange(256)
+            if rng.random() < write_ratio:
+                script.append((delay, "write", address, [rng.randrange(256)]))
+            else:
+                script.append((delay, "read", address, rng.randint(1, 16)))
+        self.play(script, loop=True)
+        return script
+
+    # Serial side (processSerialCommands)
+
+    def _write(self, data):
+        try:
+            os.write(self._master, data)
+        except OSError:
+            pass  # Closed by stop()
+
+    def _run(self):
+        buffer = bytearray()
+        expected_len = 0
+        last_byte_time = 0.0
+        while self.running:
+            readable, _, _ = select.select([self._master], [], [], 0.05)
+            if not readable:
+                continue
+            try:
+                received = os.read(self._master, 256)
+            except OSError:
+                continue  # No reader on the slave side yet
+            for b in received:
+                now = time.monotonic()
+                if now - last_byte_time > 0.1:
+                    buffer.clear()
+                last_byte_time = now
+                buffer.append(b)
+                if len(buffer) == 2:
+                    expected_len = buffer[1]
+                    if expected_len < 3 or expected_len > 40:
+                        buffer.clear()  # invalid length
+                        continue
+                if len(buffer) >= 2 and len(buffer) >= expected_len:
+                    frame = bytes(buffer)
+                    buffer.clear()
+                    if sum(frame[:-1]) & 0xFF != frame[-1]:
+                        self.bad_checksums += 1
+                        continue
+                    self.commands += 1
+                    response = self.handle(frame)
+                    delay = self.latency + self.byte_time * (len(frame) + len(response or b""))
+                    if delay:
+                        time.sleep(delay)
+                    if response:
+                        self._write(response)
+
+    @staticmethod
+    def _frame(cmd, body=b"", seed=None):
+        frame = bytearray((cmd, len(body) + 3))
+        frame += body
+        frame.append((sum(frame) if seed is None else seed + sum(body)) & 0xFF)
+        return bytes(frame)
+
+    def handle(self, frame):
+        """Response bytes for one complete, checksum-verified command (None if the firmware wouldn't answer)."""
+        cmd, length = frame[0], frame[1]
+        addr = frame[2] if length > 3 else 0
+        with self.lock:
+            if cmd == 0x10 and length == 4:
+                return self._frame(0x10, bytes([addr, self.eeprom[addr]]))
+            if cmd == 0x11 and length == 4:
+                return self._frame(0x11, bytes([addr]) + bytes(self.eeprom[(addr + i) & 0xFF] for i in range(32)))
+            if cmd == 0x20 and length == 5:
+                self.eeprom[addr] = frame[3]
+                return self._frame(0x20, bytes([addr, 0x00]))
+            if cmd == 0x21 and length == 36:
+                for i in range(32):
+                    self.eeprom[(addr + i) & 0xFF] = frame[3 + i]
+                return self._frame(0x21, bytes([addr, 0x00]))
+            if cmd in (0x30, 0x31) and length == 3:
+                flags = self.accessed if cmd == 0x30 else self.modified
+                return self._frame(cmd, bytes(flags), seed=cmd + 0x24 if self.legacy_checksum else None)
+            if cmd == 0x40 and length == 3:
+                self.internal[0:256] = self.eeprom
+                self.internal[DATA_VALID_FLAG] = FLAG_VALUE
+            elif cmd == 0x41 and length == 3:
+                self.eeprom[:] = self.internal[0:256]
+                self.dirty[:] = bytes([0xFF]) * 32
+            elif cmd == 0x42 and length == 3:
+                self.internal[256:288] = self.accessed
+                self.internal[288:320] = self.modified
+                self.internal[ACCESSED_VALID_FLAG] = FLAG_VALUE
+                self.internal[MODIFIED_VALID_FLAG] = FLAG_VALUE
+            elif cmd == 0x43 and length == 3:
+                self.accessed[:] = self.internal[256:288]
+                self.modified[:] = self.internal[288:320]
+                self.flag_changes = SYNC_ACCESSED | SYNC_MODIFIED
+            elif cmd == 0xA0 and length == 3:
+                self._reset_state()
+            elif cmd == 0xA1 and length == 3:
+                self.accessed[:] = bytes(32)
+                self.modified[:] = bytes(32)
+                self.flag_changes = SYNC_ACCESSED | SYNC_MODIFIED
+            elif cmd == 0x50 and length == 4 and self.delta_sync:
+                return self._delta_sync(frame[2])
+            elif cmd == 0x51 and length == 3 and self.delta_sync:
+                self.dirty[:] = bytes(32)
+                self.flag_changes = 0
+                self.generation = (self.generation + 1) & 0xFF
+                return self._frame(0x51, bytes([self.generation]))
+            else:
+                return None
+            return self._frame(cmd)  # Plain acknowledgement of 0x40-0x43, 0xA0, 0xA1
+
+    def _delta_sync(self, generation):
+        if generation != self.generation:
+            return self._frame(0x50, bytes([self.generation, SYNC_MISMATCH]))
+        status = 0
+        pairs = bytearray()
+        for i in range(32):
+            if not self.dirty[i]:
+                continue
+            for b in range(8):
+                if not self.dirty[i] & (1 << b):
+                    continue
+                if len(pairs) == 2 * MAX_SYNC_CHANGES:
+                    status |= SYNC_MORE
+                    break
+                pairs += bytes([i * 8 + b, self.eeprom[i * 8 + b]])
+                self.dirty[i] &= ~(1 << b)
+            if status & SYNC_MORE:
+                break
+        status |= self.flag_changes
+        self.flag_changes = 0
+        self.generation = (self.generation + 1) & 0xFF
+        return self._frame(0x50, bytes([self.generation, status]) + pairs)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Simulated EEPROM monitor Arduino on a pseudo-terminal")
+    parser.add_argument("--baud", type=int, default=38400, help="line rate to imitate, 0 = no delay")
+    parser.add_argument("--activity", type=float, default=0.0, help="random ECU reads / writes per second")
+    parser.add_argument("--legacy", action="store_true", help="behave like firmware without delta sync")
+    args = parser.parse_args()
+
+    arduino = VirtualArduino(baud=args.baud or None, delta_sync=not args.legacy, legacy_checksum=args.legacy)
+    arduino.start()
+    if args.activity:
+        arduino.random_activity(args.activity)
+    print(f"Virtual Arduino on {arduino.port}, Ctrl+C to stop")
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        arduino.stop()
+        print(f"{arduino.commands} commands, {arduino.bad_checksums} bad checksums")